@@ -106,34 +106,24 @@ def add_demo_users():
         
         print("🔄 Adding demo users to database...")
         
-        # Add each demo user
-        for i, user_data in enumerate(demo_users, 1):
-            try:
-                # Check if user already exists
-                if not db_service.email_exists(user_data["email"]):
-                    # Create user
-                    user_id = auth_service.register_user(
-                        user_data["first_name"],
-                        user_data["last_name"],
-                        user_data["email"],
-                        user_data["phone"],
-                        user_data["password"]
-                    )
-                    
-                    # Update the created_at timestamp
-                    db_service.cursor.execute('''
-                        UPDATE customers 
-                        SET created_at = ? 
-                        WHERE id = ?
-                    ''', (user_data["created_at"].strftime('%Y-%m-%d %H:%M:%S'), user_id))
-                    db_service.conn.commit()
-                    
-                    print(f"✅ Added user {i}: {user_data['first_name']} {user_data['last_name']} ({user_data['email']})")
-                else:
-                    print(f"⚠️  User {i} already exists: {user_data['email']}")
-                    
-            except Exception as e:
-                print(f"❌ Error adding user {i}: {str(e)}")
+        # Add all demo users in one transaction, keeping existing accounts
+        result = db_service.create_customers_bulk([
+            {
+                "first_name": user_data["first_name"],
+                "last_name": user_data["last_name"],
+                "email": user_data["email"],
+                "phone": user_data["phone"],
+                "password_hash": auth_service.hash_password(user_data["password"]),
+                "created_at": user_data["created_at"]
+            }
+            for user_data in demo_users
+        ], on_conflict="ignore")
+        
+        for i, (user_data, user_id) in enumerate(zip(demo_users, result.ids), 1):
+            if user_id is not None:
+                print(f"✅ Added user {i}: {user_data['first_name']} {user_data['last_name']} ({user_data['email']})")
+            else:
+                print(f"⚠️  User {i} already exists: {user_data['email']}")
         
         # Show final statistics
         total_users = db_service.get_customer_count()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script to back up the customers database while the application is running
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from cms.config.settings import AppSettings
+from cms.services.backup.backup_service import BackupService
+
+
+def create_backup_service():
+    """Backup service configured from the application settings"""
+    settings = AppSettings()
+    return BackupService(
+        settings.DATABASE_PATH,
+        settings.BACKUPS_DIR,
+        keep=settings.BACKUP_KEEP,
+        max_age_days=settings.BACKUP_MAX_AGE_DAYS,
+        method=settings.BACKUP_METHOD
+    )
+
+
+def backup_now():
+    """Take a verified backup and apply retention"""
+    try:
+        backup_service = create_backup_service()
+        if not os.path.exists(backup_service.db_path):
+            print(f"❌ Database file '{backup_service.db_path}' not found!")
+            return
+
+        print(f"🔄 Backing up {backup_service.db_path} ({backup_service.method})...")
+        info = backup_service.create_backup()
+        print(f"✅ Backup written to {info.path} ({info.size_bytes / 1024 / 1024:.1f} MB, integrity ok)")
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+
+
+def list_backups(verify=False):
+    """List existing backups, optionally re-checking each one"""
+    backup_service = create_backup_service()
+    backups = backup_service.list_backups()
+    if not backups:
+        print("❌ No backups found.")
+        return
+
+    print(f"\n📦 Backups in {backup_service.backup_dir}:")
+    for info in backups:
+        line = f"   {info.created_at:%Y-%m-%d %H:%M:%S}  {info.size_bytes / 1024 / 1024:8.1f} MB  {os.path.basename(info.path)}"
+        if verify:
+            problem = backup_service.verify_backup(info.path)
+            line += "  ✅ ok" if problem is None else f"  ❌ {problem}"
+        print(line)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "create"
+    if command == "create":
+        backup_now()
+    elif command == "list":
+        list_backups()
+    elif command == "verify":
+        list_backups(verify=True)
+    else:
+        print("Usage: python backup_database.py [create|list|verify]")
+        sys.exit(1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script to find and merge duplicate customers
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from cms.config.settings import AppSettings
+from cms.services.database.sharded_backend import create_storage_backend
+from cms.services.dedupe.dedupe_service import DedupeService
+
+
+def print_progress(progress):
+    """Print running scan totals"""
+    print(f"   {progress.blocks_done:,} blocks scored - "
+          f"{progress.comparisons:,} comparisons, {progress.pairs:,} likely duplicate pairs")
+
+
+def find_duplicates(merge=False, threshold=0.8):
+    """Scan for duplicate customers and optionally merge each cluster into its oldest member"""
+    try:
+        settings = AppSettings()
+        backend = create_storage_backend(settings.DATABASE_PATH, shards=settings.DB_SHARDS,
+                                         storage_profile=settings.storage_profile)
+        dedupe_service = DedupeService(backend, threshold=threshold)
+
+        print(f"🔍 Scanning customers for duplicates (threshold {threshold:.2f})...")
+        result = dedupe_service.find_duplicates(progress_callback=print_progress)
+
+        print("\n📊 Duplicate Scan:")
+        print(f"   Customers Scanned: {result.customers:,}")
+        print(f"   Blocks Compared: {result.blocks:,}")
+        print(f"   Comparisons: {result.comparisons:,}")
+        print(f"   Duplicate Clusters: {len(result.clusters):,}")
+
+        for cluster in result.clusters[:20]:
+            ids = ", ".join(str(customer_id) for customer_id in cluster.customer_ids)
+            print(f"   [{cluster.score:.2f}] IDs {ids}")
+        if len(result.clusters) > 20:
+            print(f"   ... and {len(result.clusters) - 20:,} more")
+
+        if merge and result.clusters:
+            merged = sum(dedupe_service.merge_cluster(cluster) for cluster in result.clusters)
+            print(f"\n🔗 Merged {merged:,} duplicates into the oldest customer of each cluster")
+            print("💡 Merged customers are soft-deleted and can be restored until they are purged")
+
+        print("\n🎉 Duplicate scan completed!")
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ("scan", "merge"):
+        print("Usage: python find_duplicates.py [scan|merge] [threshold]")
+        sys.exit(1)
+    find_duplicates(merge=sys.argv[1] == "merge",
+                    threshold=float(sys.argv[2]) if len(sys.argv) == 3 else 0.8)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script to import customers from a CSV file
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from cms.services.database.database_service import DatabaseService
+from cms.services.importer.import_service import CsvImportService
+
+
+def print_progress(progress):
+    """Print running import totals"""
+    print(f"   {progress.rows_done:,} rows processed - "
+          f"{progress.imported:,} imported, {progress.rejected:,} rejected, "
+          f"{progress.conflicts:,} existing emails updated")
+
+
+def import_customers(csv_path):
+    """Import customers from a CSV file into the database"""
+    try:
+        if not os.path.exists(csv_path):
+            print(f"❌ File not found: {csv_path}")
+            return
+
+        db_service = DatabaseService()
+        import_service = CsvImportService(db_service)
+
+        print(f"🔄 Importing customers from {csv_path}...")
+        result = import_service.import_csv(csv_path, progress_callback=print_progress)
+
+        if result.resumed_from:
+            print(f"↪️  Resumed after {result.resumed_from:,} rows from a previous run")
+
+        print("\n📊 Import Statistics:")
+        print(f"   Rows Processed: {result.rows_done:,}")
+        print(f"   Imported: {result.imported:,}")
+        print(f"   Rejected: {result.rejected:,}")
+        print(f"   Existing Emails Updated: {result.conflicts:,}")
+
+        if result.errors:
+            print("\n⚠️  Rejected rows:")
+            for line, reason in result.errors[:20]:
+                print(f"   Row {line}: {reason}")
+            if result.rejected > 20:
+                print(f"   ... and {result.rejected - 20:,} more")
+        if result.reject_path:
+            print(f"📄 Rejected rows saved to {result.reject_path}")
+
+        print("\n🎉 Import completed!")
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        print("💡 Run the script again to resume from the last saved checkpoint")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python import_customers.py <customers.csv>")
+        sys.exit(1)
+    import_customers(sys.argv[1])
@@ -24,15 +24,76 @@ class AppSettings:
         # Database settings
         self.DATABASE_PATH = "customers.db"
         
+        # SQLite storage profiles. cache_size is in KiB when negative (per
+        # connection), mmap_size in bytes, busy_timeout in milliseconds.
+        #   desktop-safe:  WAL, every commit synced to disk
+        #   throughput:    WAL, commits synced at checkpoints only (a power cut
+        #                  can lose the last commits, never corrupt the file),
+        #                  large cache and memory map
+        #   low-memory:    small cache, no memory map, temp tables on disk
+        #   network-share: WAL needs shared memory, which network file systems
+        #                  do not provide; rollback journal, no mmap, long waits
+        self.STORAGE_PROFILES = {
+            "desktop-safe": {
+                "journal_mode": "WAL", "synchronous": "FULL", "cache_size": -16384,
+                "mmap_size": 64 * 1024 * 1024, "temp_store": "DEFAULT", "busy_timeout": 5000,
+            },
+            "throughput": {
+                "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -65536,
+                "mmap_size": 256 * 1024 * 1024, "temp_store": "MEMORY", "busy_timeout": 5000,
+            },
+            "low-memory": {
+                "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -2048,
+                "mmap_size": 0, "temp_store": "FILE", "busy_timeout": 5000,
+            },
+            "network-share": {
+                "journal_mode": "DELETE", "synchronous": "FULL", "cache_size": -16384,
+                "mmap_size": 0, "temp_store": "MEMORY", "busy_timeout": 30000,
+            },
+        }
+        self.STORAGE_PROFILE = os.environ.get("CMS_STORAGE_PROFILE", "desktop-safe")
+
+        # Number of hash-partitioned database files (1 keeps a single file)
+        self.DB_SHARDS = int(os.environ.get("CMS_DB_SHARDS", "1"))
+        
+        # Reporting replica: exports and reports read a copy refreshed in the background
+        self.REPORTING_REPLICA_ENABLED = os.environ.get("CMS_REPORTING_REPLICA", "0") == "1"
+        self.REPLICA_REFRESH_SECONDS = float(os.environ.get("CMS_REPLICA_REFRESH_SECONDS", "300"))
+        
+        # Deleted customers are kept this long (restorable) before the background purge
+        self.PURGE_RETENTION_DAYS = float(os.environ.get("CMS_PURGE_RETENTION_DAYS", "30"))
+        self.PURGE_INTERVAL_SECONDS = float(os.environ.get("CMS_PURGE_INTERVAL_SECONDS", "3600"))
+        
+        # Database profiling (latency histograms and slow-query log)
+        self.DB_PROFILING_ENABLED = os.environ.get("CMS_DB_PROFILING", "0") == "1"
+        self.SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("CMS_SLOW_QUERY_MS", "100"))
+        
         # File paths
         self.BASE_DIR = Path(__file__).parent.parent.parent.parent
         self.ASSETS_DIR = self.BASE_DIR / "assets"
         self.ICONS_DIR = self.ASSETS_DIR / "icons"
         self.LOGS_DIR = self.BASE_DIR / "logs"
+        self.BACKUPS_DIR = self.BASE_DIR / "backups"
+        
+        # Scheduled online backups ("backup" = throttled page copy, "vacuum" = compacted copy).
+        # Off unless CMS_BACKUPS=1. With sharding each shard file is backed up
+        # on its own schedule, so one backup set is not a consistent snapshot
+        # across shards
+        self.BACKUPS_ENABLED = os.environ.get("CMS_BACKUPS", "0") == "1"
+        self.BACKUP_INTERVAL_HOURS = float(os.environ.get("CMS_BACKUP_INTERVAL_HOURS", "24"))
+        self.BACKUP_KEEP = int(os.environ.get("CMS_BACKUP_KEEP", "7"))
+        self.BACKUP_MAX_AGE_DAYS = float(os.environ.get("CMS_BACKUP_MAX_AGE_DAYS", "30"))
+        self.BACKUP_METHOD = os.environ.get("CMS_BACKUP_METHOD", "backup")
         
         # Credentials file
         self.CREDENTIALS_FILE = "saved_credentials.txt"
         
+        # Incremental (changes-only) exports: one watermark file per consumer.
+        # Pruning the change log is opt-in and never goes past the consumer
+        # that is furthest behind
+        self.CHANGE_EXPORT_STATE_DIR = self.BASE_DIR / "exports"
+        self.CHANGE_LOG_PRUNE_ENABLED = os.environ.get("CMS_PRUNE_CHANGE_LOG", "0") == "1"
+        
         # Create necessary directories
         self._create_directories()
     
@@ -56,7 +117,19 @@ class AppSettings:
             'small_png': self.ICONS_DIR / "app_icon_small.png"
         }
     
+    @property
+    def storage_profile(self):
+        """Settings of the selected storage profile"""
+        if self.STORAGE_PROFILE not in self.STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {self.STORAGE_PROFILE}")
+        return dict(self.STORAGE_PROFILES[self.STORAGE_PROFILE])
+
     @property
     def log_file(self):
         """Get log file path"""
         return self.LOGS_DIR / "cms.log"
+    
+    @property
+    def slow_query_log_file(self):
+        """Get slow-query log file path"""
+        return self.LOGS_DIR / "slow_queries.log"
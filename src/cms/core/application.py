@@ -8,9 +8,15 @@ from tkinter import ttk
 import os
 
 from ..ui.styles import StyleManager
-from ..services.database.database_service import DatabaseService
+from ..services.database.sharded_backend import create_storage_backend, shard_paths
+from ..services.database.instrumentation import QueryProfiler
+from ..services.database.purge import PurgeWorker
+from ..services.database.replica import ReportingReplica
+from ..models.repositories.customer_repository import CustomerRepository
 from ..services.auth.auth_service import AuthService
+from ..services.backup.backup_service import BackupService
 from ..services.email.email_service import EmailService
+from ..services.exporter.export_service import ExportService
 from ..ui.pages.login_page import LoginPage
 from ..ui.pages.register_page import RegisterPage
 from ..ui.pages.dashboard_page import DashboardPage
@@ -30,7 +36,70 @@ class CustomerApp:
         
         # Initialize services
         self.settings = AppSettings()
-        self.database_service = DatabaseService()
+        self.database_service = create_storage_backend(
+            self.settings.DATABASE_PATH,
+            shards=self.settings.DB_SHARDS,
+            storage_profile=self.settings.storage_profile,
+            profiler=QueryProfiler(
+                enabled=self.settings.DB_PROFILING_ENABLED,
+                slow_query_ms=self.settings.SLOW_QUERY_THRESHOLD_MS,
+                log_file=self.settings.slow_query_log_file if self.settings.DB_PROFILING_ENABLED else None
+            )
+        )
+        self.customer_repository = CustomerRepository(self.database_service)
+        
+        # Soft-deleted customers are purged in small chunks in the background
+        self.purge_worker = PurgeWorker(
+            self.database_service,
+            retention_days=self.settings.PURGE_RETENTION_DAYS,
+            interval=self.settings.PURGE_INTERVAL_SECONDS
+        )
+        self.purge_worker.start()
+        
+        # Reports and exports read from the replica when it is enabled
+        # (it copies a single database file, so not with sharding). The
+        # first copy is taken by the background refresher; until it is in,
+        # reports stay on the primary so they never see an empty replica.
+        self.reporting_replica = None
+        self.replica_repository = None
+        if self.settings.REPORTING_REPLICA_ENABLED and self.settings.DB_SHARDS == 1:
+            try:
+                replica = ReportingReplica(
+                    self.settings.DATABASE_PATH,
+                    refresh_interval=self.settings.REPLICA_REFRESH_SECONDS
+                )
+                replica.start()
+                self.reporting_replica = replica
+                self.replica_repository = CustomerRepository(replica.service)
+            except Exception as e:
+                print(f"Reporting from the primary database: {e}")
+        # The change log is read and pruned on the primary: a replica can
+        # lag behind, and pruning must never drop changes not yet read
+        self.export_service = ExportService(self.database_service,
+                                            self.settings.CHANGE_EXPORT_STATE_DIR,
+                                            consumer="app",
+                                            prune_after_export=self.settings.CHANGE_LOG_PRUNE_ENABLED)
+        
+        # Scheduled backups, one series per database file. Shards are copied
+        # independently, not under a shared write barrier, so restoring them
+        # together may mix points in time
+        self.backup_services = []
+        if self.settings.BACKUPS_ENABLED:
+            if self.settings.DB_SHARDS > 1:
+                db_files = shard_paths(self.settings.DATABASE_PATH, self.settings.DB_SHARDS)
+            else:
+                db_files = [self.settings.DATABASE_PATH]
+            for db_file in db_files:
+                backup_service = BackupService(
+                    db_file,
+                    self.settings.BACKUPS_DIR,
+                    keep=self.settings.BACKUP_KEEP,
+                    max_age_days=self.settings.BACKUP_MAX_AGE_DAYS,
+                    interval_hours=self.settings.BACKUP_INTERVAL_HOURS,
+                    method=self.settings.BACKUP_METHOD
+                )
+                backup_service.start()
+                self.backup_services.append(backup_service)
         self.auth_service = AuthService(self.database_service)
         self.email_service = EmailService()
         
@@ -54,9 +123,26 @@ class CustomerApp:
         # Show login page by default
         self.show_login_page()
     
+    @property
+    def reporting_service(self):
+        """Service reports read from: the replica once its first copy is in"""
+        replica = self.reporting_replica
+        if replica is not None and replica.last_refreshed is not None:
+            return replica.service
+        return self.database_service
+
+    @property
+    def reporting_repository(self):
+        """Customer repository over ``reporting_service``"""
+        replica = self.reporting_replica
+        if replica is not None and replica.last_refreshed is not None:
+            return self.replica_repository
+        return self.customer_repository
+
     def setup_window(self):
         """Setup the main window"""
         self.root.title("Enterprise CMS - Professional Customer Management")
+        self.root.protocol("WM_DELETE_WINDOW", self.shutdown)
         self.root.geometry("1000x700")
         self.root.minsize(800, 600)
         self.root.resizable(True, True)
@@ -114,6 +200,17 @@ class CustomerApp:
         self.auth_service.clear_saved_credentials()
         self.show_login_page()
     
+    def shutdown(self):
+        """Stop the background workers, close the databases and the window"""
+        # Workers first: each may be mid-write on the backend closed below
+        self.purge_worker.stop()
+        for backup_service in self.backup_services:
+            backup_service.stop()
+        if self.reporting_replica is not None:
+            self.reporting_replica.close()
+        self.database_service.close()
+        self.root.destroy()
+    
     def run(self):
         """Start the application"""
         self.root.mainloop()
@@ -0,0 +1,54 @@
+"""Customer entity"""
+
+from typing import Optional, Tuple
+
+
+class Customer:
+    """A customer record.
+
+    Slotted so that large result lists carry no per-instance ``__dict__``;
+    built straight from the ``(id, first_name, last_name, email, phone,
+    created_at)`` rows returned by the database service. Rows from status
+    queries carry the status computed by the database as a seventh column.
+    """
+
+    __slots__ = ("id", "first_name", "last_name", "email", "phone", "created_at", "status")
+
+    def __init__(self, id: int, first_name: str, last_name: str, email: str,
+                 phone: str, created_at: Optional[str] = None, status: Optional[str] = None):
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.phone = phone
+        self.created_at = created_at
+        self.status = status
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "Customer":
+        """Build a customer from a database row"""
+        return cls(*row)
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+    @property
+    def created_date(self) -> str:
+        """The ``YYYY-MM-DD`` part of created_at"""
+        return (self.created_at or "")[:10]
+
+    def as_row(self) -> Tuple:
+        """The database row this customer was built from"""
+        return (self.id, self.first_name, self.last_name, self.email, self.phone, self.created_at)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Customer):
+            return NotImplemented
+        return self.as_row() == other.as_row()
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"Customer(id={self.id!r}, name={self.full_name!r}, email={self.email!r})"
@@ -0,0 +1,104 @@
+"""Repository mapping database rows to Customer entities"""
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from ..entities.customer import Customer
+from ...services.database.storage_backend import StorageBackend
+
+
+class CustomerRepository:
+    """Customer-returning view over the database service.
+
+    The service keeps returning plain row tuples (they are what its caches
+    store); the repository maps them to slotted ``Customer`` objects once,
+    at the boundary, so callers use attributes instead of row positions.
+    """
+
+    def __init__(self, database_service: StorageBackend):
+        self.database_service = database_service
+
+    @staticmethod
+    def _map(rows: List[Tuple]) -> List[Customer]:
+        return list(map(Customer.from_row, rows))
+
+    def get_by_id(self, customer_id: int) -> Optional[Customer]:
+        """Get a customer by ID"""
+        row = self.database_service.get_customer_by_id(customer_id)
+        return Customer.from_row(row) if row else None
+
+    def get_by_email(self, email: str) -> Optional[Customer]:
+        """Get a customer by email address"""
+        row = self.database_service.get_customer_by_email(email)
+        return Customer.from_row(row) if row else None
+
+    def get_all(self) -> List[Customer]:
+        """Get all customers, newest first"""
+        return self._map(self.database_service.get_all_customers())
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Customer]:
+        """Stream all customers, newest first"""
+        return map(Customer.from_row, self.database_service.iter_customers(batch_size))
+
+    def get_page(self, after: Optional[Tuple[str, int]] = None, limit: int = 50) -> List[Customer]:
+        """Get one keyset page of customers, newest first"""
+        return self._map(self.database_service.get_customers_page(after, limit))
+
+    def get_page_with_status(self, status: Optional[str] = None,
+                             after: Optional[Tuple[str, int]] = None,
+                             limit: int = 50) -> List[Customer]:
+        """Get one keyset page of customers with ``status`` set, newest first"""
+        return self._map(self.database_service.get_customers_with_status(status, after, limit))
+
+    def load_statuses(self, customers: List[Customer]) -> List[Customer]:
+        """Fill in ``status`` on customers loaded without it"""
+        statuses = self.database_service.get_customer_statuses(customer.id for customer in customers)
+        for customer in customers:
+            customer.status = statuses.get(customer.id, customer.status)
+        return customers
+
+    def get_by_domain(self, domain: str, after: Optional[Tuple[str, int]] = None,
+                      limit: int = 50) -> List[Customer]:
+        """Get one keyset page of the customers at an email domain, newest first"""
+        return self._map(self.database_service.get_customers_by_domain(domain, after, limit))
+
+    def search(self, search_term: str, limit: Optional[int] = None) -> List[Customer]:
+        """Search customers by name or email, best matches first"""
+        return self._map(self.database_service.search_customers(search_term, limit))
+
+    def iter_search(self, search_term: str, batch_size: int = 1000) -> Iterator[Customer]:
+        """Stream every search match, best matches first"""
+        return map(Customer.from_row, self.database_service.iter_search(search_term, batch_size))
+
+    def search_page(self, search_term: str, after: Optional[Tuple[str, int]] = None,
+                    limit: int = 50) -> List[Customer]:
+        """Get one keyset page of search results, newest first"""
+        return self._map(self.database_service.search_customers_page(search_term, after, limit))
+
+    def fuzzy_search(self, search_term: str, limit: int = 10,
+                     max_distance: Optional[int] = None) -> List[Customer]:
+        """Search customers tolerating typos, closest matches first"""
+        return self._map(self.database_service.fuzzy_search_customers(search_term, limit, max_distance))
+
+    @staticmethod
+    def page_cursor(customers: List[Customer]) -> Optional[Tuple[str, int]]:
+        """Build the ``after`` cursor for the page following ``customers``"""
+        if not customers:
+            return None
+        last = customers[-1]
+        return (last.created_at, last.id)
+
+    def update_profile(self, customer: Customer, first_name: str, last_name: str, phone: str) -> bool:
+        """Update a customer's name and phone"""
+        return self.database_service.update_customer_profile(customer.email, first_name, last_name, phone)
+
+    def delete(self, customer: Customer) -> bool:
+        """Soft-delete a customer"""
+        return self.database_service.delete_customer(customer.id)
+
+    def delete_many(self, customers: Iterable[Customer]) -> int:
+        """Soft-delete several customers; returns how many were deleted"""
+        return self.database_service.delete_customers(customer.id for customer in customers)
+
+    def restore(self, customer: Customer) -> bool:
+        """Bring back a soft-deleted customer"""
+        return self.database_service.restore_customer(customer.id)
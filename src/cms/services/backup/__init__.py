@@ -0,0 +1 @@
+# Backup services
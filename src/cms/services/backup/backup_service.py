@@ -0,0 +1,191 @@
+"""Backup service for taking, verifying and rotating database backups"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from ..database.backup import online_backup, open_read_only
+
+
+class BackupInfo(NamedTuple):
+    """A backup file on disk"""
+    path: str
+    created_at: datetime
+    size_bytes: int
+
+
+class BackupService:
+    """Online backups of a live database file.
+
+    ``method`` "backup" copies pages with the backup API in small steps,
+    only ever taking read locks on the database and pausing between steps;
+    "vacuum" writes a compacted copy with ``VACUUM INTO``, which reads the
+    whole database in one read transaction (harmless in WAL mode, but it
+    delays writers for the duration in rollback-journal mode). Every backup
+    is written to a ``.partial`` file, integrity-checked and only then
+    renamed into place, after which old backups are rotated out.
+    """
+
+    METHODS = ("backup", "vacuum")
+
+    # Name timestamps, sortable as text
+    TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+    def __init__(self, db_path: str, backup_dir: str, keep: int = 7,
+                 max_age_days: Optional[float] = None, interval_hours: float = 24.0,
+                 method: str = "backup", pages_per_step: int = 256,
+                 step_sleep: float = 0.01, busy_timeout: int = 5000):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown backup method: {method}")
+        self.db_path = db_path
+        self.backup_dir = Path(backup_dir)
+        self.keep = max(1, keep)
+        self.max_age_days = max_age_days
+        self.interval_hours = interval_hours
+        self.method = method
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.busy_timeout = busy_timeout
+        self.last_error: Optional[str] = None
+
+        stem = Path(db_path).stem
+        self._name_pattern = re.compile(rf"^{re.escape(stem)}-(\d{{8}}-\d{{6}})(?:-(\d+))?\.db$")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _new_backup_path(self) -> Path:
+        """Unused file name for a backup taken now"""
+        stem = Path(self.db_path).stem
+        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        # Numbered after the remaining backups of the same second (the first
+        # may already be rotated out), so the new file always sorts newest
+        taken = [int(match.group(2) or 0) for match in
+                 (self._name_pattern.match(path.name) for path in self.backup_dir.glob(f"{stem}-{timestamp}*.db"))
+                 if match]
+        if not taken:
+            return self.backup_dir / f"{stem}-{timestamp}.db"
+        return self.backup_dir / f"{stem}-{timestamp}-{max(taken) + 1}.db"
+
+    def create_backup(self) -> BackupInfo:
+        """Take, verify and keep a backup now, then apply retention"""
+        try:
+            with self._lock:
+                self.backup_dir.mkdir(parents=True, exist_ok=True)
+                final_path = self._new_backup_path()
+                partial_path = final_path.with_name(final_path.name + ".partial")
+
+                source = open_read_only(self.db_path, self.busy_timeout)
+                try:
+                    if self.method == "vacuum":
+                        source.execute("VACUUM INTO ?", (str(partial_path),))
+                    else:
+                        target = sqlite3.connect(str(partial_path), isolation_level=None)
+                        try:
+                            online_backup(source, target, self.pages_per_step, self.step_sleep)
+                            # A standalone file is easier to move around than WAL + shm
+                            target.execute("PRAGMA journal_mode=DELETE")
+                        finally:
+                            target.close()
+                finally:
+                    source.close()
+
+                problem = self.verify_backup(str(partial_path))
+                if problem:
+                    partial_path.unlink()
+                    raise Exception(f"integrity check failed: {problem}")
+
+                os.replace(partial_path, final_path)
+                self.rotate()
+                self.last_error = None
+                return self._info(final_path)
+        except Exception as e:
+            self.last_error = str(e)
+            raise Exception(f"Failed to create backup: {str(e)}")
+
+    def verify_backup(self, path: str) -> Optional[str]:
+        """Run an integrity check on a backup; returns None if it is sound"""
+        try:
+            conn = open_read_only(path, self.busy_timeout)
+            try:
+                results = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+                if results != ["ok"]:
+                    return "; ".join(results[:5])
+                conn.execute("SELECT COUNT(*) FROM customers").fetchone()
+                return None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            return str(e)
+
+    def _info(self, path: Path) -> BackupInfo:
+        match = self._name_pattern.match(path.name)
+        created_at = datetime.strptime(match.group(1), self.TIMESTAMP_FORMAT)
+        return BackupInfo(str(path), created_at, path.stat().st_size)
+
+    def list_backups(self) -> List[BackupInfo]:
+        """Backups of this database, newest first"""
+        if not self.backup_dir.exists():
+            return []
+        backups = [self._info(path) for path in self.backup_dir.iterdir()
+                   if self._name_pattern.match(path.name)]
+        # Backups taken within the same second are numbered -1, -2, ... after the first
+        def order(info):
+            counter = self._name_pattern.match(Path(info.path).name).group(2)
+            return info.created_at, int(counter or 0)
+
+        return sorted(backups, key=order, reverse=True)
+
+    def rotate(self) -> List[str]:
+        """Delete backups beyond ``keep`` or older than ``max_age_days`` (never the newest)"""
+        removed = []
+        now = datetime.now()
+        for position, info in enumerate(self.list_backups()):
+            too_many = position >= self.keep
+            too_old = (self.max_age_days is not None and position > 0
+                       and (now - info.created_at).total_seconds() > self.max_age_days * 86400)
+            if too_many or too_old:
+                os.remove(info.path)
+                removed.append(info.path)
+
+        # Leftovers from interrupted runs
+        for path in self.backup_dir.glob(f"{Path(self.db_path).stem}-*.db.partial"):
+            if now.timestamp() - path.stat().st_mtime > 3600:
+                path.unlink()
+        return removed
+
+    def seconds_until_due(self) -> float:
+        """Time left before the next scheduled backup (0 when one is due)"""
+        backups = self.list_backups()
+        if not backups:
+            return 0.0
+        elapsed = (datetime.now() - backups[0].created_at).total_seconds()
+        return max(0.0, self.interval_hours * 3600 - elapsed)
+
+    def start(self):
+        """Take backups every ``interval_hours`` in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cms-backup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.seconds_until_due()):
+            try:
+                self.create_backup()
+            except Exception as e:
+                print(f"Error creating backup: {e}")
+                # Retry failed backups after a pause instead of immediately
+                self._stop.wait(min(3600.0, self.interval_hours * 3600))
+
+    def stop(self):
+        """Stop the background schedule"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,292 @@
+"""asyncio facade over the database service"""
+
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .database_service import BulkInsertResult, ChangeBatch, DatabaseService
+from .instrumentation import QueryProfiler
+from .storage_backend import StorageBackend
+
+
+class AsyncDatabaseService:
+    """Awaitable version of DatabaseService for asyncio code.
+
+    The facade owns a storage backend (a DatabaseService unless one is
+    passed in), and with it its own connections, that is only used from two
+    executors: a read executor sized to the read connection pool, so reads
+    run concurrently, and a single-threaded write executor, so writes queue
+    up in order instead of parking read threads on the write lock. The
+    event loop itself never touches sqlite3.
+    """
+
+    def __init__(self, db_path: str = "customers.db", read_pool_size: int = 4,
+                 busy_timeout: int = 5000, cache_size: int = 1024,
+                 query_cache_bytes: int = 8 * 1024 * 1024,
+                 profiler: Optional[QueryProfiler] = None,
+                 service: Optional[StorageBackend] = None,
+                 storage_profile: Optional[Dict[str, Any]] = None):
+        self.service = service or DatabaseService(db_path, read_pool_size, busy_timeout,
+                                                  cache_size, query_cache_bytes, profiler,
+                                                  storage_profile)
+        self._read_executor = ThreadPoolExecutor(max_workers=max(1, read_pool_size),
+                                                 thread_name_prefix="cms-db-read")
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cms-db-write")
+        self._closed = False
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> "AsyncDatabaseService":
+        """Construct the service off the event loop (opening it runs migrations)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(cls, *args, **kwargs))
+
+    async def _read(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a read on the read executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, functools.partial(func, *args, **kwargs))
+
+    async def _write(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a write on the write executor, after every write queued before it"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_executor, functools.partial(func, *args, **kwargs))
+
+    async def _stream(self, rows: Iterator[Tuple], batch_size: int) -> AsyncIterator[Tuple]:
+        """Drain a blocking row iterator one batch per executor call.
+
+        The iterator keeps its pooled read connection until it is exhausted
+        or the async iterator is closed, exactly like the synchronous one.
+        """
+        try:
+            while True:
+                batch = await self._read(lambda: list(itertools.islice(rows, batch_size)))
+                if not batch:
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            close = getattr(rows, "close", None)
+            if close is not None:
+                await self._read(close)
+
+    # Writes
+
+    async def create_customer(self, first_name: str, last_name: str, email: str,
+                              phone: str, password_hash: str) -> int:
+        """Create a new customer"""
+        return await self._write(self.service.create_customer,
+                                 first_name, last_name, email, phone, password_hash)
+
+    async def create_customers_bulk(self, rows: Iterable[Dict[str, Any]],
+                                    on_conflict: str = "fail") -> BulkInsertResult:
+        """Insert many customers in a single transaction"""
+        return await self._write(self.service.create_customers_bulk, list(rows), on_conflict)
+
+    async def update_customer_password(self, email: str, password_hash: str) -> bool:
+        """Update customer password"""
+        return await self._write(self.service.update_customer_password, email, password_hash)
+
+    async def update_customer_profile(self, email: str, first_name: str,
+                                      last_name: str, phone: str) -> bool:
+        """Update customer profile information"""
+        return await self._write(self.service.update_customer_profile,
+                                 email, first_name, last_name, phone)
+
+    async def delete_customer(self, customer_id: int) -> bool:
+        """Soft-delete customer by ID"""
+        return await self._write(self.service.delete_customer, customer_id)
+
+    async def delete_customers(self, customer_ids: Iterable[int]) -> int:
+        """Soft-delete many customers; returns how many were deleted"""
+        return await self._write(self.service.delete_customers, list(customer_ids))
+
+    async def restore_customer(self, customer_id: int) -> bool:
+        """Undo a soft delete that has not been purged yet"""
+        return await self._write(self.service.restore_customer, customer_id)
+
+    async def merge_customers(self, survivor_id: int, duplicate_ids: Iterable[int]) -> int:
+        """Fold duplicate customers into ``survivor_id``; returns how many were merged"""
+        return await self._write(self.service.merge_customers, survivor_id, list(duplicate_ids))
+
+    async def purge_deleted_customers(self, older_than_days: float = 0, chunk_size: int = 500,
+                                      pause: float = 0.05, max_chunks: Optional[int] = None) -> int:
+        """Hard-delete customers soft-deleted more than ``older_than_days`` ago.
+
+        Runs on the default executor rather than the write executor: the
+        purge takes the write lock one chunk at a time, so queued writes
+        interleave with it instead of waiting for the whole purge.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(
+            self.service.purge_deleted_customers, older_than_days, chunk_size, pause, max_chunks))
+
+    # Reads
+
+    async def authenticate_customer(self, email: str, password_hash: str) -> Optional[Tuple]:
+        """Authenticate customer with email and password"""
+        return await self._read(self.service.authenticate_customer, email, password_hash)
+
+    async def get_all_customers(self) -> List[Tuple]:
+        """Get all customers"""
+        return await self._read(self.service.get_all_customers)
+
+    async def iter_customers(self, batch_size: int = 1000) -> AsyncIterator[Tuple]:
+        """Iterate over all customers, newest first, one batch in memory at a time"""
+        stream = self._stream(self.service.iter_customers(batch_size), batch_size)
+        try:
+            async for row in stream:
+                yield row
+        finally:
+            # Closing this iterator early does not close the inner one by itself
+            await stream.aclose()
+
+    async def get_customers_page(self, after: Optional[Tuple[str, int]] = None,
+                                 limit: int = 50) -> List[Tuple]:
+        """Get one page of customers, newest first"""
+        return await self._read(self.service.get_customers_page, after, limit)
+
+    async def get_customers_with_status(self, status: Optional[str] = None,
+                                        after: Optional[Tuple[str, int]] = None,
+                                        limit: int = 50) -> List[Tuple]:
+        """Get one page of customers with their status, newest first"""
+        return await self._read(self.service.get_customers_with_status, status, after, limit)
+
+    async def get_customer_statuses(self, customer_ids: Iterable[int]) -> Dict[int, str]:
+        """Status of each live customer in ``customer_ids``"""
+        return await self._read(self.service.get_customer_statuses, list(customer_ids))
+
+    async def email_exists(self, email: str) -> bool:
+        """Check if email already exists"""
+        return await self._read(self.service.email_exists, email)
+
+    async def get_customer_by_email(self, email: str) -> Optional[Tuple]:
+        """Get customer by email address"""
+        return await self._read(self.service.get_customer_by_email, email)
+
+    async def get_customer_by_id(self, customer_id: int) -> Optional[Tuple]:
+        """Get customer by ID"""
+        return await self._read(self.service.get_customer_by_id, customer_id)
+
+    async def search_customers(self, search_term: str, limit: Optional[int] = None) -> List[Tuple]:
+        """Search customers by name or email, best matches first"""
+        return await self._read(self.service.search_customers, search_term, limit)
+
+    async def search_customers_scored(self, search_term: str,
+                                      limit: Optional[int] = None) -> List[Tuple[float, Tuple]]:
+        """Search customers, returning (rank, row) pairs best first"""
+        return await self._read(self.service.search_customers_scored, search_term, limit)
+
+    async def iter_search(self, search_term: str, batch_size: int = 1000) -> AsyncIterator[Tuple]:
+        """Iterate over every search match, best matches first"""
+        stream = self._stream(self.service.iter_search(search_term, batch_size), batch_size)
+        try:
+            async for row in stream:
+                yield row
+        finally:
+            await stream.aclose()
+
+    async def iter_search_scored(self, search_term: str,
+                                 batch_size: int = 1000) -> AsyncIterator[Tuple[float, Tuple]]:
+        """Iterate over (rank, row) for every search match, best first"""
+        stream = self._stream(self.service.iter_search_scored(search_term, batch_size), batch_size)
+        try:
+            async for match in stream:
+                yield match
+        finally:
+            await stream.aclose()
+
+    async def search_customers_page(self, search_term: str,
+                                    after: Optional[Tuple[str, int]] = None,
+                                    limit: int = 50) -> List[Tuple]:
+        """Get one page of search results, newest first"""
+        return await self._read(self.service.search_customers_page, search_term, after, limit)
+
+    async def fuzzy_search_customers(self, search_term: str, limit: int = 10,
+                                     max_distance: Optional[int] = None) -> List[Tuple]:
+        """Search customers tolerating typos, closest matches first"""
+        return await self._read(self.service.fuzzy_search_customers, search_term, limit, max_distance)
+
+    page_cursor = staticmethod(StorageBackend.page_cursor)
+
+    async def get_customer_count(self) -> int:
+        """Get total number of customers"""
+        return await self._read(self.service.get_customer_count)
+
+    async def get_recent_registrations_count(self, days: int = 7) -> int:
+        """Get count of recent registrations"""
+        return await self._read(self.service.get_recent_registrations_count, days)
+
+    async def get_today_registrations_count(self) -> int:
+        """Get count of today's registrations"""
+        return await self._read(self.service.get_today_registrations_count)
+
+    async def get_email_domain_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(domain, customers) pairs, most common first"""
+        return await self._read(self.service.get_email_domain_counts, limit)
+
+    async def get_email_domain_count(self, domain: str) -> int:
+        """Number of customers with an email address at ``domain``"""
+        return await self._read(self.service.get_email_domain_count, domain)
+
+    async def get_customers_by_domain(self, domain: str, after: Optional[Tuple[str, int]] = None,
+                                      limit: int = 50) -> List[Tuple]:
+        """One keyset page of the customers at ``domain``, newest first"""
+        return await self._read(self.service.get_customers_by_domain, domain, after, limit)
+
+    async def get_registration_trend(self, days: Optional[int] = None,
+                                     granularity: str = "day") -> List[Tuple[str, int]]:
+        """(bucket, registrations) per day or hour, oldest first"""
+        return await self._read(self.service.get_registration_trend, days, granularity)
+
+    async def get_recent_activity(self, limit: int = 5) -> List[Tuple]:
+        """Get recent customer activity"""
+        return await self._read(self.service.get_recent_activity, limit)
+
+    # Change log
+
+    async def get_changes_since(self, watermark: Optional[str] = None, limit: int = 1000) -> ChangeBatch:
+        """Up to ``limit`` logged customer changes after ``watermark``"""
+        return await self._read(self.service.get_changes_since, watermark, limit)
+
+    async def prune_changes(self, watermark: str) -> int:
+        """Drop logged changes up to ``watermark``"""
+        return await self._write(self.service.prune_changes, watermark)
+
+    def oldest_watermark(self, watermarks: Iterable[str]) -> Optional[str]:
+        """The furthest watermark every one of ``watermarks`` has reached"""
+        return self.service.oldest_watermark(watermarks)
+
+    # In-memory statistics, cheap enough to answer on the loop
+
+    async def get_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the customer lookup cache"""
+        return self.service.get_cache_stats()
+
+    async def get_latency_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-method call counts and p50/p95/p99 latencies (when profiling)"""
+        return self.service.get_latency_report()
+
+    async def get_query_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and memory use of the query result cache"""
+        return self.service.get_query_cache_stats()
+
+    async def close(self):
+        """Finish queued work, then close the executors and connections"""
+        if self._closed:
+            return
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self):
+        """Blocking part of close()"""
+        self._write_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+        self.service.close()
+
+    async def __aenter__(self) -> "AsyncDatabaseService":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
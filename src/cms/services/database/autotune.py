@@ -0,0 +1,260 @@
+"""Benchmark of the storage profiles on the local disk"""
+
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from .backup import online_backup, open_read_only
+from .database_service import DatabaseService
+
+
+# File systems on which WAL's shared-memory index does not work reliably
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afpfs", "ncpfs",
+                       "davfs", "fuse.sshfs", "fuse.rclone"}
+
+
+class ProfileBenchmark(NamedTuple):
+    """Timings of the query mix under one storage profile"""
+    profile: str
+    operations: int
+    seconds: float
+    read_ms: float
+    write_ms: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+
+class TuneResult(NamedTuple):
+    """Recommended storage profile and the benchmarks behind it"""
+    recommended: str
+    reason: str
+    benchmarks: List[ProfileBenchmark]
+
+
+def is_network_path(path: str) -> bool:
+    """Whether ``path`` lives on a network file system (UNC share, NFS, SMB, ...)"""
+    path = os.path.abspath(path)
+    if path.startswith("\\\\"):
+        return True
+    if os.name == "nt":
+        import ctypes
+        drive = os.path.splitdrive(path)[0] + "\\"
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+
+    # Longest mount point containing the path decides its file system
+    best, fstype = "", ""
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace("\\040", " ")
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) > len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        return False
+    return fstype in NETWORK_FILESYSTEMS
+
+
+def physical_memory() -> Optional[int]:
+    """Installed memory in bytes, where the platform reports it"""
+    if os.name == "nt":
+        import ctypes
+        from ctypes import wintypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", wintypes.DWORD), ("dwMemoryLoad", wintypes.DWORD),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+        return status.ullTotalPhys
+
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def sample_customers(count: int) -> Iterator[Dict[str, Any]]:
+    """Synthetic customers spread over two years, for benchmarking an empty install"""
+    first_names = ["James", "Maria", "Wei", "Aisha", "Lucas", "Priya", "Olga", "Kenji"]
+    last_names = ["Smith", "Garcia", "Chen", "Khan", "Silva", "Patel", "Ivanova", "Tanaka"]
+    domains = ["gmail.com", "outlook.com", "yahoo.com", "example.com"]
+    start = datetime.now(timezone.utc) - timedelta(days=730)
+    for i in range(count):
+        first, last = first_names[i % 8], last_names[i // 8 % 8]
+        yield {
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first}.{last}.{i}@{domains[i % 4]}".lower(),
+            "phone": f"+1 555 {i % 10_000_000:07d}",
+            "password_hash": "0" * 64,
+            "created_at": start + timedelta(seconds=i * 730 * 86400 // max(count, 1)),
+        }
+
+
+class StorageTuner:
+    """Runs the application's query mix under each storage profile and picks one.
+
+    Every profile is benchmarked on its own copy of the database, taken
+    with the online backup API into a temporary directory next to it so
+    the copy sits on the same disk; an empty or missing database is
+    replaced by ``sample_rows`` synthetic customers. The mix is what the
+    users page and dashboard do: keyset pages, status and search lists,
+    logins, counts and trends, plus single-row writes that each commit
+    (and so sync) on their own.
+    """
+
+    # Below this much memory the large caches of the other profiles do not fit
+    LOW_MEMORY_BYTES = 2 * 1024 ** 3
+
+    # Throughput is only worth its weaker durability when it is this much faster
+    THROUGHPUT_GAIN = 1.25
+
+    def __init__(self, db_path: str, profiles: Dict[str, Dict[str, Any]],
+                 rounds: int = 50, sample_rows: int = 20000):
+        self.db_path = db_path
+        self.profiles = profiles
+        self.rounds = rounds
+        self.sample_rows = sample_rows
+
+    def _has_customers(self) -> bool:
+        """Whether the database exists and holds customers worth copying"""
+        if not os.path.exists(self.db_path):
+            return False
+        conn = open_read_only(self.db_path)
+        try:
+            return conn.execute("SELECT 1 FROM customers LIMIT 1").fetchone() is not None
+        except sqlite3.Error:
+            return False
+        finally:
+            conn.close()
+
+    def _prepare_copy(self, path: str):
+        """Fill ``path`` with a copy of the database, or with sample customers"""
+        if self._has_customers():
+            source = open_read_only(self.db_path)
+            target = sqlite3.connect(path)
+            try:
+                online_backup(source, target)
+            finally:
+                target.close()
+                source.close()
+            return
+
+        service = DatabaseService(path, cache_size=0, query_cache_bytes=0)
+        try:
+            batch = []
+            for row in sample_customers(self.sample_rows):
+                batch.append(row)
+                if len(batch) >= DatabaseService.BULK_BATCH_SIZE:
+                    service.create_customers_bulk(batch, on_conflict="ignore")
+                    batch = []
+            service.create_customers_bulk(batch, on_conflict="ignore")
+            with service.pool.writer() as conn:
+                conn.execute("ANALYZE")
+        finally:
+            service.close()
+
+    def _query_mix(self, service: DatabaseService) -> List[Callable[[], Any]]:
+        """Reads of one round of the mix, based on the customers in the copy"""
+        sample = service.get_customers_page(limit=100)
+        if not sample:
+            return []
+        target = sample[len(sample) // 2]
+        after = (sample[-1][5], sample[-1][0])
+        return [
+            lambda: service.get_customers_page(limit=50),
+            lambda: service.get_customers_page(after=after, limit=50),
+            lambda: service.get_customers_with_status("Active", limit=50),
+            lambda: service.search_customers(target[2], limit=50),
+            lambda: service.get_customer_by_email(target[3]),
+            lambda: service.authenticate_customer(target[3], "0" * 64),
+            service.get_customer_count,
+            lambda: service.get_recent_registrations_count(7),
+            lambda: service.get_registration_trend(30),
+            lambda: service.get_email_domain_counts(5),
+        ]
+
+    def benchmark(self, name: str) -> ProfileBenchmark:
+        """Run the query mix ``rounds`` times under one profile"""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        with tempfile.TemporaryDirectory(prefix=".cms-tune-", dir=directory) as work_dir:
+            path = os.path.join(work_dir, "benchmark.db")
+            self._prepare_copy(path)
+
+            # Caches off: every call has to reach SQLite and the disk
+            service = DatabaseService(path, cache_size=0, query_cache_bytes=0,
+                                      storage_profile=self.profiles[name])
+            try:
+                reads = self._query_mix(service)
+                read_times, write_times = [], []
+                started = time.perf_counter()
+                for round_number in range(self.rounds):
+                    for read in reads:
+                        start = time.perf_counter()
+                        read()
+                        read_times.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    email = f"tune.{round_number}@example.invalid"
+                    customer_id = service.create_customer("Tune", "Bench", email, "+1 555 0000000", "0" * 64)
+                    service.update_customer_profile(email, "Tuned", "Bench", "+1 555 0000001")
+                    service.delete_customer(customer_id)
+                    write_times.append((time.perf_counter() - start) / 3)
+                seconds = time.perf_counter() - started
+            finally:
+                service.close()
+
+        return ProfileBenchmark(name, len(read_times) + 3 * len(write_times), seconds,
+                                statistics.median(read_times) * 1000 if read_times else 0.0,
+                                statistics.median(write_times) * 1000 if write_times else 0.0)
+
+    def tune(self, progress_callback: Optional[Callable[[str], None]] = None) -> TuneResult:
+        """Benchmark the profiles that suit this machine and recommend one"""
+        try:
+            if is_network_path(self.db_path):
+                # WAL on a network share risks corruption, so it is not even tried
+                if progress_callback:
+                    progress_callback("network-share")
+                return TuneResult("network-share", "the database is on a network file system",
+                                  [self.benchmark("network-share")])
+
+            memory = physical_memory()
+            if memory is not None and memory < self.LOW_MEMORY_BYTES:
+                # The other profiles' caches would only push this machine into swap
+                if progress_callback:
+                    progress_callback("low-memory")
+                return TuneResult("low-memory", f"only {memory / 1024 ** 3:.1f} GB of memory is installed",
+                                  [self.benchmark("low-memory")])
+
+            benchmarks = {}
+            for name in ("desktop-safe", "throughput", "low-memory"):
+                if progress_callback:
+                    progress_callback(name)
+                benchmarks[name] = self.benchmark(name)
+            results = list(benchmarks.values())
+
+            safe, fast = benchmarks["desktop-safe"], benchmarks["throughput"]
+            gain = fast.ops_per_second / safe.ops_per_second if safe.ops_per_second else 1.0
+            if gain >= self.THROUGHPUT_GAIN:
+                return TuneResult("throughput", f"{gain:.1f}x the operations per second of desktop-safe "
+                                                f"on this disk", results)
+            return TuneResult("desktop-safe", f"throughput is only {gain:.2f}x as fast here, "
+                                              f"not worth weaker durability", results)
+        except Exception as e:
+            raise Exception(f"Failed to tune storage: {str(e)}")
@@ -0,0 +1,48 @@
+"""Online copies of a live SQLite database"""
+
+import sqlite3
+from pathlib import Path
+
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback when writes keep restarting a backup"""
+
+
+def open_read_only(db_path: str, busy_timeout: int = 5000) -> sqlite3.Connection:
+    """Open a read-only connection to a database file"""
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=busy_timeout / 1000.0,
+                           check_same_thread=False, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+    return conn
+
+
+def online_backup(source: sqlite3.Connection, target: sqlite3.Connection,
+                  pages_per_step: int = 256, step_sleep: float = 0.01,
+                  max_restarts: int = 3) -> int:
+    """Copy ``source`` into ``target`` with the backup API, a few pages at a time.
+
+    Between steps the source is unlocked for ``step_sleep`` seconds, so a
+    rollback-journal writer is never held up for longer than one step. A
+    commit by another connection restarts the copy from the first page;
+    after ``max_restarts`` restarts the rest is copied in a single step,
+    which in WAL mode only pins a read snapshot and never blocks writers.
+    Returns the number of pages in the copy.
+    """
+    state = {"remaining": None, "restarts": 0, "total": 0}
+
+    def progress(status: int, remaining: int, total: int):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise BackupRestarted(f"backup restarted {state['restarts']} times")
+        state["remaining"] = remaining
+        state["total"] = total
+
+    try:
+        source.backup(target, pages=pages_per_step, progress=progress, sleep=step_sleep)
+    except BackupRestarted:
+        source.backup(target, pages=-1)
+        return source.execute("PRAGMA page_count").fetchone()[0]
+    return state["total"] or source.execute("PRAGMA page_count").fetchone()[0]
+
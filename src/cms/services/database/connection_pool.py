@@ -0,0 +1,192 @@
+"""Thread-safe SQLite connection pool used by the database service"""
+
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .instrumentation import ProfiledConnection, QueryProfiler
+
+
+class ConnectionPool:
+    """Pool with one shared write connection and several read connections.
+
+    By default the database runs in WAL mode so readers never block the
+    writer and the writer never blocks readers. Writes are serialized through a lock around
+    a single connection; reads check out a connection from a bounded pool so
+    background threads can query while the UI thread writes.
+
+    ``pragmas`` are per-connection settings (synchronous, cache_size,
+    mmap_size, temp_store) applied to every connection the pool opens.
+    """
+
+    # Per-connection pragmas a pool may be configured with
+    CONNECTION_PRAGMAS = ("synchronous", "cache_size", "mmap_size", "temp_store")
+
+    def __init__(self, db_path: str, read_pool_size: int = 4,
+                 busy_timeout: int = 5000, journal_mode: str = "WAL",
+                 profiler: Optional[QueryProfiler] = None,
+                 pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = db_path
+        self.profiler = profiler
+        self.read_pool_size = max(1, read_pool_size)
+        self.busy_timeout = busy_timeout
+        self.journal_mode = journal_mode
+        self.pragmas = dict(pragmas or {})
+        for name, value in self.pragmas.items():
+            if name not in self.CONNECTION_PRAGMAS:
+                raise ValueError(f"Unsupported connection pragma: {name}")
+            if not re.fullmatch(r"-?\d+|[A-Za-z]+", str(value)):
+                raise ValueError(f"Invalid value for pragma {name}: {value!r}")
+
+        # In-memory databases are private to a connection, so everything
+        # has to go through the writer to see the same data
+        self.shared_cache = db_path == ":memory:" or db_path.startswith("file::memory:")
+
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._writer.execute(f"PRAGMA journal_mode={self.journal_mode}")
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+
+        # Commits made through this pool, plus a probe connection whose
+        # data_version moves whenever any other connection (or process)
+        # commits; together they tell caches when the data changed
+        self.write_generation = 0
+        self._probe_lock = threading.Lock()
+        self._probe: Optional[sqlite3.Connection] = None if self.shared_cache else self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection configured for pooled use"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000.0,
+            check_same_thread=False,
+            isolation_level=None,
+            factory=ProfiledConnection,
+        )
+        conn.profiler = self.profiler
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        """Take an idle read connection, opening a new one if allowed"""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._readers_lock:
+            if len(self._all_readers) < self.read_pool_size:
+                conn = self._connect()
+                conn.execute("PRAGMA query_only=ON")
+                self._all_readers.append(conn)
+                return conn
+
+        try:
+            return self._readers.get(timeout=self.busy_timeout / 1000.0)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a read connection")
+
+    @property
+    def writer_connection(self) -> sqlite3.Connection:
+        """The shared write connection (callers must hold the write lock)"""
+        return self._writer
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Check out a read-only connection for the duration of the block"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        if self.shared_cache:
+            with self._write_lock:
+                yield self._writer
+            return
+
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Run the block inside a write transaction on the write connection.
+
+        Nested use from the same thread joins the outer transaction.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        with self._write_lock:
+            conn = self._writer
+            if conn.in_transaction:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            else:
+                if conn.in_transaction:
+                    conn.commit()
+                self.write_generation += 1
+
+    @contextmanager
+    def locked_writer(self) -> Iterator[sqlite3.Connection]:
+        """Hold the write lock and yield the write connection outside a transaction.
+
+        For operations that manage their own locking, such as restoring a
+        backup into this database.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        with self._write_lock:
+            if self._writer.in_transaction:
+                raise sqlite3.OperationalError("Write connection is inside a transaction")
+            try:
+                yield self._writer
+            finally:
+                self.write_generation += 1
+
+    def change_token(self) -> Tuple[int, int]:
+        """Value that changes whenever committed data may have changed"""
+        if self._probe is None:
+            return (self.write_generation, 0)
+        with self._probe_lock:
+            data_version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+        return (self.write_generation, data_version)
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        if self._closed:
+            return
+        self._closed = True
+
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+
+        with self._probe_lock:
+            if self._probe is not None:
+                self._probe.close()
+
+        with self._write_lock:
+            self._writer.close()
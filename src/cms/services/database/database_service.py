@@ -1,210 +1,936 @@
 """Database service for handling all database operations"""
 
+import re
 import sqlite3
-from typing import List, Tuple, Optional
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
 
+from .connection_pool import ConnectionPool
+from .entity_cache import CustomerCache
+from .fuzzy_search import FuzzySearchEngine
+from .instrumentation import QueryProfiler, profiled_methods
+from .migrations import MigrationRunner
+from .query_cache import QueryCache
+from .storage_backend import StorageBackend
 
-class DatabaseService:
-    """Service for handling database operations"""
-    
-    def __init__(self, db_path: str = "customers.db"):
+
+class BulkInsertResult(NamedTuple):
+    """Outcome of a bulk insert.
+
+    ``ids`` lines up with the input rows (``None`` for skipped rows);
+    ``conflicts`` holds ``(row_index, email)`` for every email clash.
+    """
+    ids: List[Optional[int]]
+    conflicts: List[Tuple[int, str]]
+
+
+class ChangeBatch(NamedTuple):
+    """Customer changes read from the change log.
+
+    Each change is ``(seq, operation, customer_id, first_name, last_name,
+    email, phone, created_at, changed_at)`` with ``operation`` one of
+    "insert", "update" or "delete"; ``watermark`` is the opaque position
+    to pass back to read the changes that follow.
+    """
+    changes: List[Tuple]
+    watermark: str
+
+
+@profiled_methods
+class DatabaseService(StorageBackend):
+    """Service for handling database operations on a single SQLite file"""
+
+    # Rows sent per executemany call during bulk writes
+    BULK_BATCH_SIZE = 5000
+
+    # Seconds a cached result relative to date('now') stays valid
+    CLOCK_QUERY_MAX_AGE = 60
+
+    def __init__(self, db_path: str = "customers.db", read_pool_size: int = 4,
+                 busy_timeout: int = 5000, cache_size: int = 1024,
+                 query_cache_bytes: int = 8 * 1024 * 1024,
+                 profiler: Optional[QueryProfiler] = None,
+                 storage_profile: Optional[Dict[str, Any]] = None):
+        self.profiler = profiler or QueryProfiler(enabled=False)
         self.db_path = db_path
+        self.read_pool_size = read_pool_size
+        # A storage profile (see AppSettings.STORAGE_PROFILES) overrides busy_timeout
+        self.storage_profile = dict(storage_profile or {})
+        self.busy_timeout = self.storage_profile.get("busy_timeout", busy_timeout)
+        self.journal_mode = self.storage_profile.get("journal_mode", "WAL")
+        self.customer_cache = CustomerCache(cache_size)
+        self.query_cache_bytes = query_cache_bytes
+        self.query_cache = None
+        self.pool = None
+        self.migration_runner = None
+        self.fuzzy_search = None
         self.conn = None
         self.cursor = None
         self.init_database()
-    
+
     def init_database(self):
         """Initialize the database and create tables"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.pool = ConnectionPool(self.db_path,
+                                       read_pool_size=self.read_pool_size,
+                                       busy_timeout=self.busy_timeout,
+                                       journal_mode=self.journal_mode,
+                                       profiler=self.profiler,
+                                       pragmas={name: value for name, value in self.storage_profile.items()
+                                                if name in ConnectionPool.CONNECTION_PRAGMAS})
+
+            # Kept for scripts that still talk to the connection directly
+            self.conn = self.pool.writer_connection
             self.cursor = self.conn.cursor()
-            
-            # Create customers table
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS customers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    phone TEXT NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            self.conn.commit()
+
+            # Create or upgrade the schema
+            self.migration_runner = MigrationRunner(self.pool)
+            self.migration_runner.upgrade()
+
+            self.fuzzy_search = FuzzySearchEngine(self.pool)
+            self.query_cache = QueryCache(self.pool, self.query_cache_bytes)
         except Exception as e:
             raise Exception(f"Failed to initialize database: {str(e)}")
-    
-    def create_customer(self, first_name: str, last_name: str, email: str, 
+
+    def _fetchone(self, sql: str, params: Tuple = ()) -> Optional[Tuple]:
+        """Run a read query on a pooled connection and return one row"""
+        with self.pool.reader() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Run a read query on a pooled connection and return all rows"""
+        with self.pool.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _cached_fetchone(self, sql: str, params: Tuple = (),
+                         max_age: Optional[float] = None) -> Optional[Tuple]:
+        """_fetchone through the query result cache"""
+        return self.query_cache.get_or_load(
+            ("one", sql, params), lambda: self._fetchone(sql, params), max_age)
+
+    def _cached_fetchall(self, sql: str, params: Tuple = (),
+                         max_age: Optional[float] = None) -> List[Tuple]:
+        """_fetchall through the query result cache (returns a private copy)"""
+        return list(self.query_cache.get_or_load(
+            ("all", sql, params), lambda: self._fetchall(sql, params), max_age))
+
+    def _iterate(self, sql: str, params: Tuple = (), batch_size: int = 1000) -> Iterator[Tuple]:
+        """Stream query rows in batches from a dedicated cursor.
+
+        The pooled connection stays checked out until the generator is
+        exhausted or closed, and every row comes from one consistent
+        snapshot of the database.
+        """
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        """Run a write statement in its own transaction on the write connection"""
+        with self.pool.writer() as conn:
+            return conn.execute(sql, params)
+
+    def create_customer(self, first_name: str, last_name: str, email: str,
                        phone: str, password_hash: str) -> int:
         """Create a new customer"""
         try:
-            self.cursor.execute('''
-                INSERT INTO customers (first_name, last_name, email, phone, password_hash)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (first_name, last_name, email, phone, password_hash))
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with self.pool.writer() as conn:
+                self._drop_deleted_emails(conn, [email])
+                cursor = conn.execute('''
+                    INSERT INTO customers (first_name, last_name, email, phone, password_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (first_name, last_name, email, phone, password_hash))
+                self.fuzzy_search.index_customer(conn, cursor.lastrowid,
+                                                 first_name, last_name, email)
+            return cursor.lastrowid
         except sqlite3.IntegrityError:
             raise Exception("Email already registered")
         except Exception as e:
             raise Exception(f"Failed to create customer: {str(e)}")
-    
+
+    def create_customers_bulk(self, rows: Iterable[Dict[str, Any]],
+                              on_conflict: str = "fail") -> BulkInsertResult:
+        """Insert many customers in a single transaction.
+
+        Each row is a dict with first_name, last_name, email, phone,
+        password_hash and an optional created_at (datetime or string).
+        ``on_conflict`` decides what happens to rows whose email already
+        exists: "ignore" skips them, "replace" overwrites the existing
+        customer in place and "fail" rolls everything back.
+        """
+        if on_conflict not in self.CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {on_conflict}")
+
+        try:
+            values = [self._bulk_row_values(row) for row in rows]
+            with self.pool.writer() as conn:
+                self._drop_deleted_emails(conn, [v[2] for v in values])
+                existing = self._ids_by_email(conn, [v[2] for v in values])
+
+                conflicts = []
+                seen = set()
+                to_write = []
+                for index, value in enumerate(values):
+                    email = value[2]
+                    if email in existing or email in seen:
+                        conflicts.append((index, email))
+                        if on_conflict != "replace":
+                            continue
+                    seen.add(email)
+                    to_write.append(value)
+
+                if conflicts and on_conflict == "fail":
+                    raise sqlite3.IntegrityError(
+                        f"{len(conflicts)} email(s) already registered, "
+                        f"first: {conflicts[0][1]}"
+                    )
+
+                if on_conflict == "replace":
+                    sql = '''
+                        INSERT INTO customers
+                            (first_name, last_name, email, phone, password_hash, created_at)
+                        VALUES (?1, ?2, ?3, ?4, ?5, COALESCE(?6, CURRENT_TIMESTAMP))
+                        ON CONFLICT (email) DO UPDATE SET
+                            first_name = excluded.first_name,
+                            last_name = excluded.last_name,
+                            phone = excluded.phone,
+                            password_hash = excluded.password_hash,
+                            created_at = COALESCE(?6, customers.created_at)
+                    '''
+                else:
+                    sql = '''
+                        INSERT INTO customers
+                            (first_name, last_name, email, phone, password_hash, created_at)
+                        VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                    '''
+                for start in range(0, len(to_write), self.BULK_BATCH_SIZE):
+                    conn.executemany(sql, to_write[start:start + self.BULK_BATCH_SIZE])
+
+                # executemany does not report row ids, so read them back by email
+                # while the write lock is still held
+                ids_by_email = self._ids_by_email(conn, [v[2] for v in to_write])
+
+                # Later duplicates win under "replace", so index the final version
+                final_rows = {v[2]: v for v in to_write}
+                if on_conflict == "replace":
+                    for email in set(email for _, email in conflicts):
+                        self.fuzzy_search.remove_customer(conn, ids_by_email[email])
+                self.fuzzy_search.index_customers(
+                    conn, [(ids_by_email[email], v[0], v[1], email)
+                           for email, v in final_rows.items()])
+
+            # Replaced customers changed underneath any cached copy
+            if on_conflict == "replace":
+                for _, email in conflicts:
+                    self.customer_cache.invalidate_email(email)
+
+            skipped = set(index for index, _ in conflicts) if on_conflict == "ignore" else set()
+            ids = [None if index in skipped else ids_by_email.get(value[2])
+                   for index, value in enumerate(values)]
+            return BulkInsertResult(ids, conflicts)
+        except sqlite3.IntegrityError as e:
+            raise Exception(f"Email already registered: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to create customers: {str(e)}")
+
+    @staticmethod
+    def _bulk_row_values(row: Dict[str, Any]) -> Tuple:
+        """Turn a bulk insert row into the parameter tuple for the INSERT"""
+        created_at = row.get("created_at")
+        if isinstance(created_at, datetime):
+            created_at = created_at.strftime('%Y-%m-%d %H:%M:%S')
+        return (row["first_name"], row["last_name"], row["email"],
+                row["phone"], row["password_hash"], created_at)
+
+    @staticmethod
+    def _ids_by_email(conn: sqlite3.Connection, emails: List[str]) -> Dict[str, int]:
+        """Look up live customer ids for many emails, chunked under SQLite's variable limit"""
+        ids = {}
+        unique = list(dict.fromkeys(emails))
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for customer_id, email in conn.execute(f'''
+                    SELECT id, email FROM customers
+                    WHERE email IN ({placeholders}) AND deleted_at IS NULL
+                    ''', chunk):
+                ids[email] = customer_id
+        return ids
+
+    @staticmethod
+    def _drop_deleted_emails(conn: sqlite3.Connection, emails: List[str]):
+        """Purge soft-deleted customers whose email is being registered again"""
+        unique = list(dict.fromkeys(emails))
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            conn.execute(f'''
+                DELETE FROM customers
+                WHERE email IN ({placeholders}) AND deleted_at IS NOT NULL
+            ''', chunk)
+
     def authenticate_customer(self, email: str, password_hash: str) -> Optional[Tuple]:
         """Authenticate customer with email and password"""
         try:
-            self.cursor.execute('''
-                SELECT id, first_name, last_name, email 
-                FROM customers 
-                WHERE email = ? AND password_hash = ?
+            return self._fetchone('''
+                SELECT id, first_name, last_name, email
+                FROM customers
+                WHERE email = ? AND password_hash = ? AND deleted_at IS NULL
             ''', (email, password_hash))
-            return self.cursor.fetchone()
         except Exception as e:
             raise Exception(f"Failed to authenticate customer: {str(e)}")
-    
+
     def update_customer_password(self, email: str, password_hash: str) -> bool:
         """Update customer password"""
         try:
-            self.cursor.execute('''
-                UPDATE customers 
-                SET password_hash = ? 
-                WHERE email = ?
+            cursor = self._execute('''
+                UPDATE customers
+                SET password_hash = ?
+                WHERE email = ? AND deleted_at IS NULL
             ''', (password_hash, email))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            self.customer_cache.invalidate_email(email)
+            return cursor.rowcount > 0
         except Exception as e:
             raise Exception(f"Failed to update password: {str(e)}")
-    
+
     def get_all_customers(self) -> List[Tuple]:
         """Get all customers"""
         try:
-            self.cursor.execute('''
-                SELECT id, first_name, last_name, email, phone, created_at 
-                FROM customers 
+            return self._fetchall('''
+                SELECT id, first_name, last_name, email, phone, created_at
+                FROM customers
+                WHERE deleted_at IS NULL
                 ORDER BY created_at DESC
             ''')
-            return self.cursor.fetchall()
         except Exception as e:
             raise Exception(f"Failed to get customers: {str(e)}")
-    
+
+    def iter_customers(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Iterate over all customers, newest first, with flat memory use"""
+        try:
+            yield from self._iterate('''
+                SELECT id, first_name, last_name, email, phone, created_at
+                FROM customers
+                WHERE deleted_at IS NULL
+                ORDER BY created_at DESC, id DESC
+            ''', batch_size=batch_size)
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get customers: {str(e)}")
+
+    def get_customers_page(self, after: Optional[Tuple[str, int]] = None,
+                           limit: int = 50) -> List[Tuple]:
+        """Get one page of customers, newest first.
+
+        ``after`` is the ``(created_at, id)`` of the last row of the previous
+        page; the query seeks straight to it so deep pages cost the same as
+        the first one.
+        """
+        try:
+            if after is None:
+                return self._cached_fetchall('''
+                    SELECT id, first_name, last_name, email, phone, created_at
+                    FROM customers
+                    WHERE deleted_at IS NULL
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                ''', (limit,))
+            return self._cached_fetchall('''
+                SELECT id, first_name, last_name, email, phone, created_at
+                FROM customers
+                WHERE (created_at, id) < (?, ?) AND deleted_at IS NULL
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            ''', (after[0], after[1], limit))
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get customers page: {str(e)}")
+
+    # Customers registered within this many seconds are "New", older ones
+    # "Active". Nothing records customer activity yet, so none is "Inactive".
+    NEW_CUSTOMER_SECONDS = 86400
+    CUSTOMER_STATUSES = ("New", "Active", "Inactive")
+
+    def get_customers_with_status(self, status: Optional[str] = None,
+                                  after: Optional[Tuple[str, int]] = None,
+                                  limit: int = 50) -> List[Tuple]:
+        """Get one page of customers with their status, newest first.
+
+        Rows are ``(id, first_name, last_name, email, phone, created_at,
+        status)``. The status is computed in the query from created_epoch,
+        and a ``status`` filter becomes a range on its index; ``after`` is
+        the same ``(created_at, id)`` cursor as for get_customers_page.
+        """
+        if status is not None and status not in self.CUSTOMER_STATUSES:
+            raise ValueError(f"Unknown customer status: {status}")
+        if status == "Inactive":
+            return []
+
+        new_since = self._new_since_sql()
+        conditions = ["deleted_at IS NULL"]
+        params: List[Any] = []
+        if status == "New":
+            conditions.append(f"created_epoch >= {new_since}")
+        elif status == "Active":
+            conditions.append(f"created_epoch < {new_since}")
+        if after is not None:
+            conditions.append("(created_epoch, id) < (CAST(strftime('%s', ?) AS INTEGER), ?)")
+            params.extend(after)
+        params.append(limit)
+
+        try:
+            return self._cached_fetchall(f'''
+                SELECT id, first_name, last_name, email, phone, created_at,
+                       {self._status_sql()}
+                FROM customers
+                WHERE {" AND ".join(conditions)}
+                ORDER BY created_epoch DESC, id DESC
+                LIMIT ?
+            ''', tuple(params), self.CLOCK_QUERY_MAX_AGE)
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get customers page: {str(e)}")
+
+    def get_customer_statuses(self, customer_ids: Iterable[int]) -> Dict[int, str]:
+        """Status of each live customer in ``customer_ids``, computed in SQL"""
+        unique = list(dict.fromkeys(customer_ids))
+        statuses = {}
+        try:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                statuses.update(self._cached_fetchall(f'''
+                    SELECT id, {self._status_sql()}
+                    FROM customers
+                    WHERE id IN ({placeholders}) AND deleted_at IS NULL
+                ''', tuple(chunk), self.CLOCK_QUERY_MAX_AGE))
+            return statuses
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get customer statuses: {str(e)}")
+
+    def _new_since_sql(self) -> str:
+        """SQL for the earliest created_epoch that still counts as "New"""
+        return f"(CAST(strftime('%s', 'now') AS INTEGER) - {int(self.NEW_CUSTOMER_SECONDS)})"
+
+    def _status_sql(self) -> str:
+        """SQL CASE computing a customer's status from created_epoch"""
+        return f"CASE WHEN created_epoch >= {self._new_since_sql()} THEN 'New' ELSE 'Active' END"
+
     def email_exists(self, email: str) -> bool:
         """Check if email already exists"""
         try:
-            self.cursor.execute("SELECT id FROM customers WHERE email = ?", (email,))
-            return self.cursor.fetchone() is not None
+            if self.customer_cache.get_by_email(email) is not None:
+                return True
+            return self._fetchone(
+                "SELECT id FROM customers WHERE email = ? AND deleted_at IS NULL", (email,)) is not None
         except Exception as e:
             raise Exception(f"Failed to check email existence: {str(e)}")
-    
+
     def get_customer_by_email(self, email: str) -> Optional[Tuple]:
         """Get customer by email address"""
         try:
-            self.cursor.execute('''
+            row = self.customer_cache.get_by_email(email)
+            if row is not None:
+                return row
+
+            generation = self.customer_cache.generation
+            row = self._fetchone('''
                 SELECT id, first_name, last_name, email, phone, created_at
                 FROM customers
-                WHERE email = ?
+                WHERE email = ? AND deleted_at IS NULL
             ''', (email,))
-            return self.cursor.fetchone()
+            if row is not None:
+                self.customer_cache.put(row, generation)
+            return row
         except sqlite3.Error as e:
             raise Exception(f"Failed to get customer: {str(e)}")
 
-    def search_customers(self, search_term: str) -> List[Tuple]:
-        """Search customers by name or email"""
+    @staticmethod
+    def _fts_query(search_term: str) -> str:
+        """Turn free text into an FTS5 query matching every word as a prefix"""
+        words = re.findall(r"\w+", search_term.lower())
+        return " ".join(f'"{word}"*' for word in words)
+
+    def search_customers(self, search_term: str, limit: Optional[int] = None) -> List[Tuple]:
+        """Search customers by name or email, best matches first"""
+        return [row for _, row in self.search_customers_scored(search_term, limit)]
+
+    def search_customers_scored(self, search_term: str,
+                                limit: Optional[int] = None) -> List[Tuple[float, Tuple]]:
+        """Search customers, returning ``(rank, row)`` pairs best first.
+
+        ``rank`` is the FTS5 bm25 score (lower is better), which lets
+        results from several databases be merged into one ranking.
+        """
         try:
-            search_pattern = f"%{search_term}%"
-            self.cursor.execute('''
+            fts_query = self._fts_query(search_term)
+            if not fts_query:
+                if limit is None:
+                    return [(0.0, row) for row in self.get_all_customers()]
+                return [(0.0, row) for row in self.get_customers_page(limit=limit)]
+
+            return [(match[0], match[1:]) for match in self._cached_fetchall('''
+                SELECT customers_fts.rank,
+                       c.id, c.first_name, c.last_name, c.email, c.phone, c.created_at
+                FROM customers_fts
+                JOIN customers c ON c.id = customers_fts.rowid
+                WHERE customers_fts MATCH ? AND c.deleted_at IS NULL
+                ORDER BY customers_fts.rank, c.created_at DESC
+                LIMIT ?
+            ''', (fts_query, -1 if limit is None else limit))]
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to search customers: {str(e)}")
+
+    def iter_search(self, search_term: str, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Iterate over every search match, best matches first"""
+        for _, row in self.iter_search_scored(search_term, batch_size):
+            yield row
+
+    def iter_search_scored(self, search_term: str,
+                           batch_size: int = 1000) -> Iterator[Tuple[float, Tuple]]:
+        """Iterate over ``(rank, row)`` for every search match, best first"""
+        try:
+            fts_query = self._fts_query(search_term)
+            if not fts_query:
+                for row in self.iter_customers(batch_size):
+                    yield 0.0, row
+                return
+
+            for match in self._iterate('''
+                SELECT customers_fts.rank,
+                       c.id, c.first_name, c.last_name, c.email, c.phone, c.created_at
+                FROM customers_fts
+                JOIN customers c ON c.id = customers_fts.rowid
+                WHERE customers_fts MATCH ? AND c.deleted_at IS NULL
+                ORDER BY customers_fts.rank, c.created_at DESC
+            ''', (fts_query,), batch_size):
+                yield match[0], match[1:]
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to search customers: {str(e)}")
+
+    def search_customers_page(self, search_term: str,
+                              after: Optional[Tuple[str, int]] = None,
+                              limit: int = 50) -> List[Tuple]:
+        """Get one page of search results, newest first (see get_customers_page)"""
+        try:
+            fts_query = self._fts_query(search_term)
+            if not fts_query:
+                return self.get_customers_page(after, limit)
+
+            if after is None:
+                return self._cached_fetchall('''
+                    SELECT id, first_name, last_name, email, phone, created_at
+                    FROM customers
+                    WHERE id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)
+                      AND deleted_at IS NULL
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                ''', (fts_query, limit))
+            return self._cached_fetchall('''
                 SELECT id, first_name, last_name, email, phone, created_at
                 FROM customers
-                WHERE first_name LIKE ? OR last_name LIKE ? OR email LIKE ?
-                ORDER BY created_at DESC
-            ''', (search_pattern, search_pattern, search_pattern))
-            return self.cursor.fetchall()
+                WHERE id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)
+                  AND (created_at, id) < (?, ?) AND deleted_at IS NULL
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            ''', (fts_query, after[0], after[1], limit))
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to search customers: {str(e)}")
+
+    def fuzzy_search_customers(self, search_term: str, limit: int = 10,
+                               max_distance: Optional[int] = None) -> List[Tuple]:
+        """Search customers tolerating typos, closest matches first.
+
+        ``max_distance`` is the largest edit distance still considered a
+        match; it defaults to the engine's configured threshold.
+        """
+        try:
+            matches = self.query_cache.get_or_load(
+                ("fuzzy", search_term, limit, max_distance),
+                lambda: self.fuzzy_search.search(search_term, limit, max_distance))
+            if not matches:
+                return []
+
+            ids = [customer_id for customer_id, _, _ in matches]
+            placeholders = ",".join("?" * len(ids))
+            rows = self._fetchall(f'''
+                SELECT id, first_name, last_name, email, phone, created_at
+                FROM customers
+                WHERE id IN ({placeholders}) AND deleted_at IS NULL
+            ''', tuple(ids))
+            by_id = {row[0]: row for row in rows}
+            return [by_id[customer_id] for customer_id in ids if customer_id in by_id]
         except sqlite3.Error as e:
             raise Exception(f"Failed to search customers: {str(e)}")
 
     def get_customer_count(self) -> int:
         """Get total number of customers"""
         try:
-            self.cursor.execute("SELECT COUNT(*) FROM customers")
-            return self.cursor.fetchone()[0]
+            return self._cached_fetchone(
+                "SELECT COALESCE(SUM(registrations), 0) FROM customer_stats")[0]
         except sqlite3.Error as e:
             raise Exception(f"Failed to get customer count: {str(e)}")
 
     def get_recent_registrations_count(self, days: int = 7) -> int:
         """Get count of recent registrations"""
         try:
-            self.cursor.execute('''
-                SELECT COUNT(*) FROM customers 
-                WHERE created_at >= datetime('now', '-{} days')
-            '''.format(days))
-            return self.cursor.fetchone()[0]
+            # Whole days come from the statistics table; only the partial
+            # boundary day is counted from customers, through the index
+            offset = f"-{int(days)} days"
+            return self._cached_fetchone('''
+                SELECT
+                    (SELECT COALESCE(SUM(registrations), 0) FROM customer_stats
+                     WHERE day > date('now', ?))
+                    +
+                    (SELECT COUNT(*) FROM customers
+                     WHERE created_at >= datetime('now', ?)
+                       AND created_at < date('now', ?, '+1 day')
+                       AND deleted_at IS NULL)
+            ''', (offset, offset, offset), self.CLOCK_QUERY_MAX_AGE)[0]
         except sqlite3.Error as e:
             raise Exception(f"Failed to get recent registrations count: {str(e)}")
 
     def get_today_registrations_count(self) -> int:
         """Get count of today's registrations"""
         try:
-            self.cursor.execute('''
-                SELECT COUNT(*) FROM customers 
-                WHERE date(created_at) = date('now')
-            ''')
-            return self.cursor.fetchone()[0]
+            return self._cached_fetchone('''
+                SELECT COALESCE(SUM(registrations), 0) FROM customer_stats
+                WHERE day = date('now')
+            ''', max_age=self.CLOCK_QUERY_MAX_AGE)[0]
         except sqlite3.Error as e:
             raise Exception(f"Failed to get today's registrations count: {str(e)}")
 
+    # Rollup table and bucket format behind each trend granularity
+    TREND_ROLLUPS = {
+        "day": ("customer_stats", "day", "%Y-%m-%d"),
+        "hour": ("customer_stats_hourly", "hour", "%Y-%m-%d %H:00:00"),
+    }
+
+    def get_registration_trend(self, days: Optional[int] = None,
+                               granularity: str = "day") -> List[Tuple[str, int]]:
+        """(bucket, registrations) for the last ``days`` days (all history when None).
+
+        Read from the trigger-maintained rollup tables, never from
+        customers; buckets without registrations are left out.
+        """
+        if granularity not in self.TREND_ROLLUPS:
+            raise ValueError(f"Unknown trend granularity: {granularity}")
+        table, column, bucket_format = self.TREND_ROLLUPS[granularity]
+        try:
+            if days is None:
+                return self._cached_fetchall(f'''
+                    SELECT {column}, registrations FROM {table}
+                    WHERE {column} <> '' AND registrations <> 0
+                    ORDER BY {column}
+                ''')
+            return self._cached_fetchall(f'''
+                SELECT {column}, registrations FROM {table}
+                WHERE {column} >= strftime(?, 'now', ?) AND registrations <> 0
+                ORDER BY {column}
+            ''', (bucket_format, f"-{int(days)} days"), self.CLOCK_QUERY_MAX_AGE)
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get registration trend: {str(e)}")
+
     def get_recent_activity(self, limit: int = 5) -> List[Tuple]:
         """Get recent customer activity"""
         try:
-            self.cursor.execute('''
+            return self._cached_fetchall('''
                 SELECT first_name, last_name, email, created_at
-                FROM customers 
+                FROM customers
+                WHERE deleted_at IS NULL
                 ORDER BY created_at DESC
                 LIMIT ?
             ''', (limit,))
-            return self.cursor.fetchall()
         except sqlite3.Error as e:
             raise Exception(f"Failed to get recent activity: {str(e)}")
 
+    # Email domain analytics
+
+    @staticmethod
+    def normalize_domain(domain: str) -> str:
+        """Domain in the form stored in email_domain ("@Gmail.com " -> "gmail.com")"""
+        return domain.strip().lstrip("@").lower()
+
+    def get_email_domain_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(domain, customers) pairs, most common first (the top ``limit`` when given)"""
+        try:
+            return self._cached_fetchall('''
+                SELECT email_domain, COUNT(*) AS customers
+                FROM customers
+                WHERE deleted_at IS NULL
+                GROUP BY email_domain
+                ORDER BY customers DESC, email_domain
+                LIMIT ?
+            ''', (-1 if limit is None else limit,))
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get email domain counts: {str(e)}")
+
+    def get_email_domain_count(self, domain: str) -> int:
+        """Number of customers with an email address at ``domain``"""
+        try:
+            return self._cached_fetchone('''
+                SELECT COUNT(*) FROM customers
+                WHERE email_domain = ? AND deleted_at IS NULL
+            ''', (self.normalize_domain(domain),))[0]
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get email domain count: {str(e)}")
+
+    def get_customers_by_domain(self, domain: str, after: Optional[Tuple[str, int]] = None,
+                                limit: int = 50) -> List[Tuple]:
+        """One keyset page of the customers at ``domain``, newest first"""
+        domain = self.normalize_domain(domain)
+        try:
+            if after is None:
+                return self._cached_fetchall('''
+                    SELECT id, first_name, last_name, email, phone, created_at
+                    FROM customers
+                    WHERE email_domain = ? AND deleted_at IS NULL
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                ''', (domain, limit))
+            return self._cached_fetchall('''
+                SELECT id, first_name, last_name, email, phone, created_at
+                FROM customers
+                WHERE email_domain = ? AND (created_at, id) < (?, ?) AND deleted_at IS NULL
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            ''', (domain, after[0], after[1], limit))
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get customers by domain: {str(e)}")
+
     def update_customer_profile(self, email: str, first_name: str, last_name: str, phone: str) -> bool:
         """Update customer profile information"""
         try:
-            self.cursor.execute('''
-                UPDATE customers 
-                SET first_name = ?, last_name = ?, phone = ?
-                WHERE email = ?
-            ''', (first_name, last_name, phone, email))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with self.pool.writer() as conn:
+                row = conn.execute('''
+                    UPDATE customers
+                    SET first_name = ?, last_name = ?, phone = ?
+                    WHERE email = ? AND deleted_at IS NULL
+                    RETURNING id, first_name, last_name, email, phone, created_at
+                ''', (first_name, last_name, phone, email)).fetchone()
+                if row is None:
+                    return False
+                self.fuzzy_search.index_customer(conn, row[0], first_name, last_name, email)
+            self.customer_cache.update(row)
+            return True
         except sqlite3.Error as e:
             raise Exception(f"Failed to update profile: {str(e)}")
 
     def get_customer_by_id(self, customer_id: int) -> Optional[Tuple]:
         """Get customer by ID"""
         try:
-            self.cursor.execute('''
+            row = self.customer_cache.get_by_id(customer_id)
+            if row is not None:
+                return row
+
+            generation = self.customer_cache.generation
+            row = self._fetchone('''
                 SELECT id, first_name, last_name, email, phone, created_at
                 FROM customers
-                WHERE id = ?
+                WHERE id = ? AND deleted_at IS NULL
             ''', (customer_id,))
-            return self.cursor.fetchone()
+            if row is not None:
+                self.customer_cache.put(row, generation)
+            return row
         except sqlite3.Error as e:
             raise Exception(f"Failed to get customer: {str(e)}")
 
     def delete_customer(self, customer_id: int) -> bool:
-        """Delete customer by ID"""
+        """Soft-delete customer by ID (the row is removed later by the purge)"""
         try:
-            self.cursor.execute('''
-                DELETE FROM customers 
-                WHERE id = ?
-            ''', (customer_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with self.pool.writer() as conn:
+                cursor = conn.execute('''
+                    UPDATE customers
+                    SET deleted_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND deleted_at IS NULL
+                ''', (customer_id,))
+                if cursor.rowcount:
+                    self.fuzzy_search.remove_customer(conn, customer_id)
+            self.customer_cache.invalidate_id(customer_id)
+            return cursor.rowcount > 0
         except sqlite3.Error as e:
             raise Exception(f"Failed to delete customer: {str(e)}")
 
+    def delete_customers(self, customer_ids: Iterable[int]) -> int:
+        """Soft-delete many customers in one short transaction; returns how many"""
+        try:
+            with self.pool.writer() as conn:
+                deleted = self._soft_delete(conn, customer_ids)
+            for customer_id in deleted:
+                self.customer_cache.invalidate_id(customer_id)
+            return len(deleted)
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to delete customers: {str(e)}")
+
+    def _soft_delete(self, conn: sqlite3.Connection, customer_ids: Iterable[int]) -> List[int]:
+        """Soft-delete live customers inside the caller's transaction; returns their ids"""
+        ids = list(dict.fromkeys(customer_ids))
+        deleted = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            deleted.extend(row[0] for row in conn.execute(f'''
+                UPDATE customers
+                SET deleted_at = CURRENT_TIMESTAMP
+                WHERE id IN ({placeholders}) AND deleted_at IS NULL
+                RETURNING id
+            ''', chunk).fetchall())
+        for customer_id in deleted:
+            self.fuzzy_search.remove_customer(conn, customer_id)
+        return deleted
+
+    def merge_customers(self, survivor_id: int, duplicate_ids: Iterable[int]) -> int:
+        """Fold duplicates into ``survivor_id``; returns how many were merged.
+
+        Duplicates are soft-deleted (so a wrong merge can be restored until
+        the purge) and recorded in customer_merges against the survivor.
+        Nothing is merged if the survivor is not a live customer.
+        """
+        try:
+            with self.pool.writer() as conn:
+                survivor = conn.execute(
+                    "SELECT 1 FROM customers WHERE id = ? AND deleted_at IS NULL", (survivor_id,)).fetchone()
+                if survivor is None:
+                    return 0
+                return self._merge_duplicates(survivor_id, [customer_id for customer_id in duplicate_ids
+                                                            if customer_id != survivor_id])
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to merge customers: {str(e)}")
+
+    def _merge_duplicates(self, survivor_ref: int, duplicate_ids: Iterable[int]) -> int:
+        """Soft-delete duplicates and record the id they were merged into"""
+        with self.pool.writer() as conn:
+            merged = self._soft_delete(conn, duplicate_ids)
+            conn.executemany('''
+                INSERT OR REPLACE INTO customer_merges (duplicate_id, survivor_id)
+                VALUES (?, ?)
+            ''', [(customer_id, survivor_ref) for customer_id in merged])
+        for customer_id in merged:
+            self.customer_cache.invalidate_id(customer_id)
+        return len(merged)
+
+    def restore_customer(self, customer_id: int) -> bool:
+        """Undo a soft delete that has not been purged yet"""
+        try:
+            with self.pool.writer() as conn:
+                row = conn.execute('''
+                    UPDATE customers
+                    SET deleted_at = NULL
+                    WHERE id = ? AND deleted_at IS NOT NULL
+                    RETURNING id, first_name, last_name, email, phone, created_at
+                ''', (customer_id,)).fetchone()
+                if row is None:
+                    return False
+                self.fuzzy_search.index_customer(conn, row[0], row[1], row[2], row[3])
+                conn.execute("DELETE FROM customer_merges WHERE duplicate_id = ?", (customer_id,))
+            self.customer_cache.update(row)
+            return True
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to restore customer: {str(e)}")
+
+    def purge_deleted_customers(self, older_than_days: float = 0, chunk_size: int = 500,
+                                pause: float = 0.05, max_chunks: Optional[int] = None) -> int:
+        """Hard-delete customers soft-deleted more than ``older_than_days`` ago.
+
+        Rows go in rowid order, ``chunk_size`` per transaction, with a pause
+        between chunks so other writers get the lock in between. Returns
+        the number of rows removed.
+        """
+        try:
+            cutoff = f"-{float(older_than_days)} days"
+            purged = 0
+            chunks = 0
+            after = 0
+            while max_chunks is None or chunks < max_chunks:
+                with self.pool.writer() as conn:
+                    first_id, last_id = conn.execute('''
+                        SELECT MIN(id), MAX(id) FROM (
+                            SELECT id FROM customers
+                            WHERE deleted_at IS NOT NULL AND id > ?
+                              AND deleted_at <= datetime('now', ?)
+                            ORDER BY id
+                            LIMIT ?
+                        )
+                    ''', (after, cutoff, chunk_size)).fetchone()
+                    if first_id is None:
+                        break
+                    # The range holds exactly the chunk's rows, since they
+                    # are the lowest eligible ids
+                    purged += conn.execute('''
+                        DELETE FROM customers
+                        WHERE id BETWEEN ? AND ? AND deleted_at IS NOT NULL
+                          AND deleted_at <= datetime('now', ?)
+                    ''', (first_id, last_id, cutoff)).rowcount
+                after = last_id
+                chunks += 1
+                if pause:
+                    time.sleep(pause)
+            return purged
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to purge deleted customers: {str(e)}")
+
+    def get_changes_since(self, watermark: Optional[str] = None, limit: int = 1000) -> ChangeBatch:
+        """Up to ``limit`` logged changes after ``watermark``, oldest first"""
+        after = self._parse_watermark(watermark)
+        try:
+            changes = self._fetchall('''
+                SELECT seq, operation, customer_id, first_name, last_name,
+                       email, phone, created_at, changed_at
+                FROM customer_changes
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?
+            ''', (after, limit))
+            return ChangeBatch(changes, str(changes[-1][0] if changes else after))
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to read customer changes: {str(e)}")
+
+    def prune_changes(self, watermark: str) -> int:
+        """Drop logged changes up to ``watermark`` once every consumer has them"""
+        up_to = self._parse_watermark(watermark)
+        try:
+            with self.pool.writer() as conn:
+                return conn.execute("DELETE FROM customer_changes WHERE seq <= ?", (up_to,)).rowcount
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to prune customer changes: {str(e)}")
+
+    def oldest_watermark(self, watermarks: Iterable[str]) -> Optional[str]:
+        """The furthest watermark every one of ``watermarks`` has reached"""
+        positions = [self._parse_watermark(watermark) for watermark in watermarks]
+        return str(min(positions)) if positions else None
+
+    @staticmethod
+    def _parse_watermark(watermark: Optional[str]) -> int:
+        """Change sequence number behind a watermark (0 for none)"""
+        if not watermark:
+            return 0
+        try:
+            return int(watermark)
+        except ValueError:
+            raise ValueError(f"Invalid change watermark: {watermark!r}")
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the customer lookup cache"""
+        return self.customer_cache.stats()
+
+    def get_latency_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-method call counts and p50/p95/p99 latencies (when profiling)"""
+        return self.profiler.report()
+
+    def get_query_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and memory use of the query result cache"""
+        return self.query_cache.stats()
+
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Close database connections"""
+        if self.pool:
+            self.pool.close()
 
     def __del__(self):
         """Destructor to ensure connection is closed"""
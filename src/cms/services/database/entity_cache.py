@@ -0,0 +1,118 @@
+"""Bounded LRU cache for customer rows looked up by id or email"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class CustomerCache:
+    """Write-through LRU cache of customer rows.
+
+    Rows are the ``(id, first_name, last_name, email, phone, created_at)``
+    tuples returned by the database service, stored once by id with a
+    secondary email index. Every invalidation bumps a generation counter so
+    a lookup that raced with a write never re-inserts the stale row it read.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._rows: "OrderedDict[int, Tuple]" = OrderedDict()
+        self._ids_by_email: Dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Token to pass back to put() for race-free population"""
+        return self._generation
+
+    def get_by_id(self, customer_id: int) -> Optional[Tuple]:
+        """Return the cached row for an id, counting the hit or miss"""
+        with self._lock:
+            row = self._rows.get(customer_id)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(customer_id)
+            self.hits += 1
+            return row
+
+    def get_by_email(self, email: str) -> Optional[Tuple]:
+        """Return the cached row for an email, counting the hit or miss"""
+        with self._lock:
+            customer_id = self._ids_by_email.get(email)
+            if customer_id is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(customer_id)
+            self.hits += 1
+            return self._rows[customer_id]
+
+    def put(self, row: Tuple, generation: Optional[int] = None):
+        """Cache a row unless an invalidation happened since ``generation``"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store(row)
+
+    def _store(self, row: Tuple):
+        """Insert or refresh a row and evict beyond capacity (lock held)"""
+        customer_id, email = row[0], row[3]
+        previous = self._rows.pop(customer_id, None)
+        if previous is not None and previous[3] != email:
+            self._ids_by_email.pop(previous[3], None)
+
+        self._rows[customer_id] = row
+        self._ids_by_email[email] = customer_id
+
+        while len(self._rows) > self.max_entries:
+            _, evicted = self._rows.popitem(last=False)
+            self._ids_by_email.pop(evicted[3], None)
+
+    def update(self, row: Tuple):
+        """Write a freshly committed row through to the cache"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._generation += 1
+            self._store(row)
+
+    def invalidate_id(self, customer_id: int):
+        """Drop a customer by id"""
+        with self._lock:
+            self._generation += 1
+            row = self._rows.pop(customer_id, None)
+            if row is not None:
+                self._ids_by_email.pop(row[3], None)
+
+    def invalidate_email(self, email: str):
+        """Drop a customer by email"""
+        with self._lock:
+            self._generation += 1
+            customer_id = self._ids_by_email.pop(email, None)
+            if customer_id is not None:
+                self._rows.pop(customer_id, None)
+
+    def clear(self):
+        """Drop every cached row"""
+        with self._lock:
+            self._generation += 1
+            self._rows.clear()
+            self._ids_by_email.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._rows),
+                "max_entries": self.max_entries,
+            }
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,156 @@
+"""Typo-tolerant customer search backed by a persisted trigram index"""
+
+import re
+import sqlite3
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .connection_pool import ConnectionPool
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    """Split text into padded, lowercase word trigrams"""
+    trigrams = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            trigrams.add(padded[i:i + 3])
+    return trigrams
+
+
+def customer_trigrams(first_name: str, last_name: str, email: str) -> Set[str]:
+    """Trigrams indexed for one customer (names plus the email local part)"""
+    local_part = email.split("@", 1)[0]
+    return extract_trigrams(f"{first_name} {last_name} {local_part}")
+
+
+def edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Optimal string alignment distance (Levenshtein plus transpositions).
+
+    Stops early and returns ``max_distance + 1`` once the distance is known
+    to exceed ``max_distance``.
+    """
+    if a == b:
+        return 0
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class FuzzySearchEngine:
+    """Ranks customers by similarity to a possibly misspelled query.
+
+    Candidates come from the ``customer_trigrams`` table, so only customers
+    sharing enough trigrams with the query are ever compared; each of those
+    is then scored by edit distance against its name and email fields.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_distance: int = 2,
+                 candidate_limit: int = 200):
+        self.pool = pool
+        self.max_distance = max_distance
+        self.candidate_limit = candidate_limit
+
+    def index_customer(self, conn: sqlite3.Connection, customer_id: int,
+                       first_name: str, last_name: str, email: str):
+        """(Re)index one customer inside the caller's write transaction"""
+        conn.execute("DELETE FROM customer_trigrams WHERE customer_id = ?", (customer_id,))
+        conn.executemany('''
+            INSERT OR IGNORE INTO customer_trigrams (trigram, customer_id)
+            VALUES (?, ?)
+        ''', [(trigram, customer_id)
+              for trigram in customer_trigrams(first_name, last_name, email)])
+
+    def index_customers(self, conn: sqlite3.Connection,
+                        rows: Iterable[Tuple[int, str, str, str]]):
+        """Index many new customers given as (id, first, last, email) rows"""
+        # Inserting in key order keeps B-tree writes local instead of random
+        entries = sorted((trigram, customer_id)
+                         for customer_id, first_name, last_name, email in rows
+                         for trigram in customer_trigrams(first_name, last_name, email))
+        conn.executemany('''
+            INSERT OR IGNORE INTO customer_trigrams (trigram, customer_id)
+            VALUES (?, ?)
+        ''', entries)
+
+    def remove_customer(self, conn: sqlite3.Connection, customer_id: int):
+        """Drop a customer from the index inside the caller's transaction"""
+        conn.execute("DELETE FROM customer_trigrams WHERE customer_id = ?", (customer_id,))
+
+    def rebuild(self, conn: Optional[sqlite3.Connection] = None):
+        """Rebuild the whole index from the customers table"""
+        if conn is None:
+            with self.pool.writer() as conn:
+                self.rebuild(conn)
+            return
+
+        conn.execute("DELETE FROM customer_trigrams")
+        cursor = conn.execute("SELECT id, first_name, last_name, email FROM customers")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            self.index_customers(conn, rows)
+
+    def search(self, query: str, limit: int = 10,
+               max_distance: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """Return up to ``limit`` (customer_id, distance, similarity) matches.
+
+        Results are ordered by edit distance, then by trigram similarity.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+
+        query = " ".join(re.findall(r"\w+", query.lower()))
+        query_trigrams = extract_trigrams(query)
+        if not query_trigrams:
+            return []
+
+        # A single edit (or transposition) breaks at most four trigrams
+        min_shared = max(1, len(query_trigrams) - 4 * max_distance)
+        placeholders = ",".join("?" * len(query_trigrams))
+
+        with self.pool.reader() as conn:
+            candidates = conn.execute(f'''
+                SELECT t.customer_id, COUNT(*) AS shared,
+                       c.first_name, c.last_name, c.email
+                FROM customer_trigrams t
+                JOIN customers c ON c.id = t.customer_id
+                WHERE t.trigram IN ({placeholders})
+                GROUP BY t.customer_id
+                HAVING shared >= ?
+                ORDER BY shared DESC
+                LIMIT ?
+            ''', (*query_trigrams, min_shared, self.candidate_limit)).fetchall()
+
+        matches = []
+        for customer_id, shared, first_name, last_name, email in candidates:
+            distance = self._best_distance(query, first_name, last_name, email, max_distance)
+            if distance > max_distance:
+                continue
+            similarity = shared / len(query_trigrams)
+            matches.append((customer_id, distance, similarity))
+
+        matches.sort(key=lambda match: (match[1], -match[2]))
+        return matches[:limit]
+
+    def _best_distance(self, query: str, first_name: str, last_name: str,
+                       email: str, max_distance: int) -> int:
+        """Smallest edit distance between the query and any searchable field"""
+        first = first_name.lower()
+        last = last_name.lower()
+        fields = (f"{first} {last}", first, last, email.lower().split("@", 1)[0])
+        return min(edit_distance(query, field, max_distance) for field in fields)
@@ -0,0 +1,286 @@
+"""Latency histograms and slow-query logging for the database service"""
+
+import functools
+import inspect
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram with logarithmic buckets (about 5% precision)"""
+
+    # Bucket boundaries grow by this factor, starting at one microsecond
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+
+    def record(self, seconds: float, failed: bool = False):
+        """Add one observation"""
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log(micros, self.GROWTH))
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if failed:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimated latency in seconds below which ``fraction`` of calls fall"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                # Upper edge of the bucket, never above the observed maximum
+                return min(self.GROWTH ** (bucket + 1) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count, error count and p50/p95/p99/max in milliseconds"""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class QueryProfiler:
+    """Collects per-method latencies and logs slow SQL statements.
+
+    While ``enabled`` is false every hook returns after a single attribute
+    check, so the instrumentation can stay compiled in.
+    """
+
+    def __init__(self, enabled: bool = False, slow_query_ms: float = 100.0,
+                 log_file: Optional[Union[str, Path]] = None):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+        self.logger = logging.getLogger("cms.database.slow_queries")
+        self.log_file = Path(log_file) if log_file else None
+        if self.log_file and not any(getattr(handler, "baseFilename", None) == str(self.log_file.resolve())
+                                     for handler in self.logger.handlers):
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.FileHandler(self.log_file, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+
+    def record(self, name: str, seconds: float, failed: bool = False):
+        """Add one method timing"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds, failed)
+
+    def observe_query(self, conn: sqlite3.Connection, sql: str,
+                      params: Any, seconds: float):
+        """Log a statement with its plan if it ran longer than the threshold"""
+        if seconds * 1000 < self.slow_query_ms:
+            return
+
+        try:
+            # A plain cursor keeps the EXPLAIN itself out of the profiler
+            plan = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            plan_text = "; ".join(row[3] for row in plan)
+        except sqlite3.Error:
+            plan_text = "n/a"
+
+        self.logger.warning(
+            "slow query %.1f ms | params %s | plan %s | sql %s",
+            seconds * 1000, params_shape(params), plan_text, " ".join(sql.split())
+        )
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Latency summary for every instrumented method"""
+        with self._lock:
+            return {name: histogram.summary()
+                    for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        """Forget all recorded timings"""
+        with self._lock:
+            self.histograms.clear()
+
+
+def params_shape(params: Any) -> str:
+    """Describe bound parameters by type only, never by value"""
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}"
+                               for key, value in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+    return type(params).__name__
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that reports statement timings to its connection's profiler.
+
+    SQLite does most of a query's work while its rows are stepped, so a
+    statement is timed from execute() through the fetches that read it. It
+    is reported once its rows run out, after fetchone(), or when the cursor
+    runs another statement or is closed.
+    """
+
+    # [sql, parameters, seconds so far] of the statement being read
+    _statement: Optional[list] = None
+
+    def execute(self, sql: str, parameters: Sequence = (), /):
+        profiler = self.connection.profiler
+        if profiler is None or not profiler.enabled:
+            return super().execute(sql, parameters)
+        self._report()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._statement = [sql, parameters, time.perf_counter() - start]
+        if self.description is None:
+            # No rows to read: the statement has already run
+            self._report()
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters, /):
+        profiler = self.connection.profiler
+        if profiler is None or not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        self._report()
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        result = super().executemany(sql, seq_of_parameters)
+        sample = seq_of_parameters[0] if seq_of_parameters else ()
+        profiler.observe_query(self.connection, sql, sample, time.perf_counter() - start)
+        return result
+
+    def fetchone(self):
+        if self._statement is None:
+            return super().fetchone()
+        row = self._timed(super().fetchone)
+        self._report()
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        size = self.arraysize if size is None else size
+        if self._statement is None:
+            return super().fetchmany(size)
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._report()
+        return rows
+
+    def fetchall(self):
+        if self._statement is None:
+            return super().fetchall()
+        rows = self._timed(super().fetchall)
+        self._report()
+        return rows
+
+    def __next__(self):
+        if self._statement is None:
+            return super().__next__()
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._report()
+            raise
+
+    def close(self):
+        self._report()
+        super().close()
+
+    def _timed(self, fetch: Callable, *args):
+        """Run one fetch, adding its time to the current statement"""
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            self._statement[2] += time.perf_counter() - start
+
+    def _report(self):
+        """Hand the current statement's total time to the profiler"""
+        statement = self._statement
+        if statement is not None:
+            self._statement = None
+            self.connection.profiler.observe_query(self.connection, *statement)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose statements are timed when profiling is enabled"""
+
+    profiler: Optional[QueryProfiler] = None
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Sequence = (), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def profiled_methods(cls):
+    """Class decorator timing every public method through ``self.profiler``"""
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attribute):
+            continue
+        setattr(cls, name, _profiled(attribute))
+    return cls
+
+
+def _profiled(func: Callable) -> Callable:
+    """Wrap one method (generators are timed until they are exhausted)"""
+    name = func.__name__
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(self, *args, **kwargs):
+            profiler = self.profiler
+            if not profiler.enabled:
+                yield from func(self, *args, **kwargs)
+                return
+            start = time.perf_counter()
+            failed = True
+            try:
+                yield from func(self, *args, **kwargs)
+                failed = False
+            except GeneratorExit:
+                # Closing a stream early is not a failure
+                failed = False
+                raise
+            finally:
+                profiler.record(name, time.perf_counter() - start, failed)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if not profiler.enabled:
+            return func(self, *args, **kwargs)
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = func(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            profiler.record(name, time.perf_counter() - start, failed)
+    return wrapper
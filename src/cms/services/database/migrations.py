@@ -0,0 +1,480 @@
+"""Versioned schema migrations for the customers database"""
+
+import sqlite3
+from typing import Callable, List, Optional, Sequence, Union
+
+from .connection_pool import ConnectionPool
+from .fuzzy_search import FuzzySearchEngine
+
+
+# A migration step is either a SQL statement or a callable taking the connection
+MigrationStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+class Migration:
+    """A numbered, ordered change to the database schema"""
+
+    def __init__(self, version: int, description: str, steps: Sequence[MigrationStep]):
+        self.version = version
+        self.description = description
+        self.steps = list(steps)
+
+    def apply(self, conn: sqlite3.Connection):
+        """Run every step of the migration on the given connection"""
+        for step in self.steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+
+
+def rebuild_customers_with_email_domain(conn: sqlite3.Connection):
+    """Rebuild customers with a stored email_domain generated column.
+
+    ALTER TABLE can only add virtual generated columns, so the table is
+    copied. Ids and the AUTOINCREMENT counter are kept, so the FTS and
+    trigram indexes stay valid and purged ids are never reused, and every
+    index and trigger on the table is recreated from its stored definition.
+    """
+    dependents = conn.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = 'customers' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''').fetchall()
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'customers'").fetchone()
+
+    conn.execute('''
+        CREATE TABLE customers_rebuild (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            deleted_at TIMESTAMP,
+            email_domain TEXT GENERATED ALWAYS AS (lower(substr(email, instr(email, '@') + 1))) STORED
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO customers_rebuild
+            (id, first_name, last_name, email, phone, password_hash, created_at, deleted_at)
+        SELECT id, first_name, last_name, email, phone, password_hash, created_at, deleted_at
+        FROM customers
+    ''')
+    conn.execute("DROP TABLE customers")
+    conn.execute("ALTER TABLE customers_rebuild RENAME TO customers")
+    for (sql,) in dependents:
+        conn.execute(sql)
+    if sequence is not None:
+        conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'customers'", sequence)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create customers table", [
+        '''
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    Migration(2, "Index customers by creation time", [
+        # Serves the newest-first listings, keyset paging, the recent
+        # activity feed and the date-range dashboard counters
+        '''
+        CREATE INDEX IF NOT EXISTS idx_customers_created_at_id
+        ON customers (created_at, id)
+        ''',
+        "ANALYZE customers",
+    ]),
+    Migration(3, "Add full-text search index over customer names and emails", [
+        # External-content table: the text lives in customers only once
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+            first_name, last_name, email,
+            content='customers', content_rowid='id',
+            prefix='2 3'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN
+            INSERT INTO customers_fts (rowid, first_name, last_name, email)
+            VALUES (new.id, new.first_name, new.last_name, new.email);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN
+            INSERT INTO customers_fts (customers_fts, rowid, first_name, last_name, email)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customers_fts_au
+        AFTER UPDATE OF first_name, last_name, email ON customers BEGIN
+            INSERT INTO customers_fts (customers_fts, rowid, first_name, last_name, email)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+            INSERT INTO customers_fts (rowid, first_name, last_name, email)
+            VALUES (new.id, new.first_name, new.last_name, new.email);
+        END
+        ''',
+        "INSERT INTO customers_fts (customers_fts) VALUES ('rebuild')",
+    ]),
+    Migration(4, "Add trigram index for fuzzy customer search", [
+        '''
+        CREATE TABLE IF NOT EXISTS customer_trigrams (
+            trigram TEXT NOT NULL,
+            customer_id INTEGER NOT NULL,
+            PRIMARY KEY (trigram, customer_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_customer_trigrams_customer
+        ON customer_trigrams (customer_id)
+        ''',
+        lambda conn: FuzzySearchEngine(None).rebuild(conn),
+    ]),
+    Migration(5, "Track resumable import progress", [
+        '''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            imported INTEGER NOT NULL DEFAULT 0,
+            rejected INTEGER NOT NULL DEFAULT 0,
+            conflicts INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    Migration(6, "Add trigger-maintained daily registration statistics", [
+        # One row per registration day; rows with an unparsable created_at
+        # are counted under the empty day so totals stay exact
+        '''
+        CREATE TABLE IF NOT EXISTS customer_stats (
+            day TEXT PRIMARY KEY,
+            registrations INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_stats_ai AFTER INSERT ON customers BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_stats_ad AFTER DELETE ON customers BEGIN
+            UPDATE customer_stats SET registrations = registrations - 1
+            WHERE day = COALESCE(date(old.created_at), '');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_stats_au
+        AFTER UPDATE OF created_at ON customers
+        WHEN COALESCE(date(old.created_at), '') <> COALESCE(date(new.created_at), '') BEGIN
+            UPDATE customer_stats SET registrations = registrations - 1
+            WHERE day = COALESCE(date(old.created_at), '');
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + 1;
+        END
+        ''',
+        '''
+        INSERT OR REPLACE INTO customer_stats (day, registrations)
+        SELECT COALESCE(date(created_at), ''), COUNT(*)
+        FROM customers
+        GROUP BY 1
+        ''',
+    ]),
+    Migration(7, "Soft-delete customers with a deleted_at column", [
+        "ALTER TABLE customers ADD COLUMN deleted_at TIMESTAMP",
+        # Listings only ever read live customers, so their index skips the
+        # deleted ones; the purge walks deleted customers in rowid order
+        "DROP INDEX IF EXISTS idx_customers_created_at_id",
+        '''
+        CREATE INDEX IF NOT EXISTS idx_customers_live_created_at_id
+        ON customers (created_at, id) WHERE deleted_at IS NULL
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_customers_deleted
+        ON customers (id, deleted_at) WHERE deleted_at IS NOT NULL
+        ''',
+        # Statistics count live customers only
+        "DROP TRIGGER IF EXISTS customer_stats_ai",
+        '''
+        CREATE TRIGGER customer_stats_ai AFTER INSERT ON customers
+        WHEN new.deleted_at IS NULL BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + 1;
+        END
+        ''',
+        "DROP TRIGGER IF EXISTS customer_stats_ad",
+        '''
+        CREATE TRIGGER customer_stats_ad AFTER DELETE ON customers
+        WHEN old.deleted_at IS NULL BEGIN
+            UPDATE customer_stats SET registrations = registrations - 1
+            WHERE day = COALESCE(date(old.created_at), '');
+        END
+        ''',
+        "DROP TRIGGER IF EXISTS customer_stats_au",
+        '''
+        CREATE TRIGGER customer_stats_au
+        AFTER UPDATE OF created_at ON customers
+        WHEN old.deleted_at IS NULL AND new.deleted_at IS NULL
+         AND COALESCE(date(old.created_at), '') <> COALESCE(date(new.created_at), '') BEGIN
+            UPDATE customer_stats SET registrations = registrations - 1
+            WHERE day = COALESCE(date(old.created_at), '');
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_stats_soft_delete
+        AFTER UPDATE OF deleted_at ON customers
+        WHEN (old.deleted_at IS NULL) <> (new.deleted_at IS NULL) BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''),
+                    CASE WHEN new.deleted_at IS NULL THEN 1 ELSE -1 END)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + excluded.registrations;
+        END
+        ''',
+        "ANALYZE customers",
+    ]),
+    Migration(8, "Log customer changes for incremental exports", [
+        # seq is AUTOINCREMENT so it never goes backwards, even after the log
+        # is pruned; commits are serialized, so seq order is commit order
+        '''
+        CREATE TABLE IF NOT EXISTS customer_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER NOT NULL,
+            operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete')),
+            first_name TEXT,
+            last_name TEXT,
+            email TEXT,
+            phone TEXT,
+            created_at TIMESTAMP,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_changes_ai AFTER INSERT ON customers
+        WHEN new.deleted_at IS NULL BEGIN
+            INSERT INTO customer_changes (customer_id, operation, first_name, last_name, email, phone, created_at)
+            VALUES (new.id, 'insert', new.first_name, new.last_name, new.email, new.phone, new.created_at);
+        END
+        ''',
+        # Password changes are not exported, and no-op profile saves are skipped
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_changes_au
+        AFTER UPDATE OF first_name, last_name, email, phone, created_at ON customers
+        WHEN old.deleted_at IS NULL AND new.deleted_at IS NULL
+         AND (old.first_name IS NOT new.first_name OR old.last_name IS NOT new.last_name
+              OR old.email IS NOT new.email OR old.phone IS NOT new.phone
+              OR old.created_at IS NOT new.created_at) BEGIN
+            INSERT INTO customer_changes (customer_id, operation, first_name, last_name, email, phone, created_at)
+            VALUES (new.id, 'update', new.first_name, new.last_name, new.email, new.phone, new.created_at);
+        END
+        ''',
+        # A soft delete is a delete downstream; a restore re-inserts the customer
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_changes_soft_delete
+        AFTER UPDATE OF deleted_at ON customers
+        WHEN (old.deleted_at IS NULL) <> (new.deleted_at IS NULL) BEGIN
+            INSERT INTO customer_changes (customer_id, operation, first_name, last_name, email, phone, created_at)
+            VALUES (new.id, CASE WHEN new.deleted_at IS NULL THEN 'insert' ELSE 'delete' END,
+                    new.first_name, new.last_name, new.email, new.phone, new.created_at);
+        END
+        ''',
+        # Purging already soft-deleted rows was logged when they were deleted
+        '''
+        CREATE TRIGGER IF NOT EXISTS customer_changes_ad AFTER DELETE ON customers
+        WHEN old.deleted_at IS NULL BEGIN
+            INSERT INTO customer_changes (customer_id, operation, first_name, last_name, email, phone, created_at)
+            VALUES (old.id, 'delete', old.first_name, old.last_name, old.email, old.phone, old.created_at);
+        END
+        ''',
+        # Existing customers are logged as inserts, so syncing from an empty
+        # watermark starts with a full snapshot
+        '''
+        INSERT INTO customer_changes (customer_id, operation, first_name, last_name, email, phone, created_at)
+        SELECT id, 'insert', first_name, last_name, email, phone, created_at
+        FROM customers
+        WHERE deleted_at IS NULL
+        ORDER BY id
+        ''',
+    ]),
+    Migration(9, "Add hourly registration statistics", [
+        # Same shape as customer_stats, bucketed by hour, for short-range charts
+        '''
+        CREATE TABLE IF NOT EXISTS customer_stats_hourly (
+            hour TEXT PRIMARY KEY,
+            registrations INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        # The statistics triggers now keep both rollups in step
+        "DROP TRIGGER IF EXISTS customer_stats_ai",
+        '''
+        CREATE TRIGGER customer_stats_ai AFTER INSERT ON customers
+        WHEN new.deleted_at IS NULL BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + excluded.registrations;
+            INSERT INTO customer_stats_hourly (hour, registrations)
+            VALUES (COALESCE(strftime('%Y-%m-%d %H:00:00', new.created_at), ''), 1)
+            ON CONFLICT (hour) DO UPDATE SET registrations = registrations + excluded.registrations;
+        END
+        ''',
+        "DROP TRIGGER IF EXISTS customer_stats_ad",
+        '''
+        CREATE TRIGGER customer_stats_ad AFTER DELETE ON customers
+        WHEN old.deleted_at IS NULL BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(old.created_at), ''), -1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + excluded.registrations;
+            INSERT INTO customer_stats_hourly (hour, registrations)
+            VALUES (COALESCE(strftime('%Y-%m-%d %H:00:00', old.created_at), ''), -1)
+            ON CONFLICT (hour) DO UPDATE SET registrations = registrations + excluded.registrations;
+        END
+        ''',
+        "DROP TRIGGER IF EXISTS customer_stats_au",
+        '''
+        CREATE TRIGGER customer_stats_au
+        AFTER UPDATE OF created_at ON customers
+        WHEN old.deleted_at IS NULL AND new.deleted_at IS NULL
+         AND strftime('%Y-%m-%d %H:00:00', old.created_at) IS NOT strftime('%Y-%m-%d %H:00:00', new.created_at) BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(old.created_at), ''), -1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + excluded.registrations;
+            INSERT INTO customer_stats_hourly (hour, registrations)
+            VALUES (COALESCE(strftime('%Y-%m-%d %H:00:00', old.created_at), ''), -1)
+            ON CONFLICT (hour) DO UPDATE SET registrations = registrations + excluded.registrations;
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + excluded.registrations;
+            INSERT INTO customer_stats_hourly (hour, registrations)
+            VALUES (COALESCE(strftime('%Y-%m-%d %H:00:00', new.created_at), ''), 1)
+            ON CONFLICT (hour) DO UPDATE SET registrations = registrations + excluded.registrations;
+        END
+        ''',
+        "DROP TRIGGER IF EXISTS customer_stats_soft_delete",
+        '''
+        CREATE TRIGGER customer_stats_soft_delete
+        AFTER UPDATE OF deleted_at ON customers
+        WHEN (old.deleted_at IS NULL) <> (new.deleted_at IS NULL) BEGIN
+            INSERT INTO customer_stats (day, registrations)
+            VALUES (COALESCE(date(new.created_at), ''), CASE WHEN new.deleted_at IS NULL THEN 1 ELSE -1 END)
+            ON CONFLICT (day) DO UPDATE SET registrations = registrations + excluded.registrations;
+            INSERT INTO customer_stats_hourly (hour, registrations)
+            VALUES (COALESCE(strftime('%Y-%m-%d %H:00:00', new.created_at), ''), CASE WHEN new.deleted_at IS NULL THEN 1 ELSE -1 END)
+            ON CONFLICT (hour) DO UPDATE SET registrations = registrations + excluded.registrations;
+        END
+        ''',
+        '''
+        INSERT OR REPLACE INTO customer_stats_hourly (hour, registrations)
+        SELECT COALESCE(strftime('%Y-%m-%d %H:00:00', created_at), ''), COUNT(*)
+        FROM customers
+        WHERE deleted_at IS NULL
+        GROUP BY 1
+        ''',
+    ]),
+    Migration(10, "Add indexed email_domain generated column", [
+        rebuild_customers_with_email_domain,
+        # Serves per-domain counts, the top-domains aggregate and newest-first
+        # pages of one domain's customers; with deleted_at in the index the
+        # counts never have to read a table row
+        '''
+        CREATE INDEX IF NOT EXISTS idx_customers_live_domain
+        ON customers (email_domain, created_at, id, deleted_at) WHERE deleted_at IS NULL
+        ''',
+        "ANALYZE customers",
+    ]),
+    Migration(11, "Record merged duplicate customers", [
+        # Merged duplicates are soft-deleted; this maps their ids to the
+        # customer they were folded into, and outlives the purge
+        '''
+        CREATE TABLE IF NOT EXISTS customer_merges (
+            duplicate_id INTEGER PRIMARY KEY,
+            survivor_id INTEGER NOT NULL,
+            merged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    Migration(12, "Add indexed created_epoch column", [
+        # Registration time as Unix seconds, so status ranges are integer
+        # comparisons on an index instead of date parsing per row. VIRTUAL
+        # can be added in place; the index stores the computed values.
+        '''
+        ALTER TABLE customers ADD COLUMN created_epoch INTEGER
+        GENERATED ALWAYS AS (CAST(strftime('%s', created_at) AS INTEGER)) VIRTUAL
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_customers_live_created_epoch
+        ON customers (created_epoch, id) WHERE deleted_at IS NULL
+        ''',
+        "ANALYZE customers",
+    ]),
+]
+
+
+class MigrationRunner:
+    """Brings a database up to the latest schema version"""
+
+    def __init__(self, pool: ConnectionPool, migrations: Optional[Sequence[Migration]] = None):
+        self.pool = pool
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS,
+                                 key=lambda m: m.version)
+
+    @property
+    def latest_version(self) -> int:
+        """Highest version known to this build"""
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        """Version currently recorded in the database"""
+        with self.pool.writer() as conn:
+            self._ensure_version_table(conn)
+            row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+            return row[0] or 0
+
+    def upgrade(self) -> List[int]:
+        """Apply every pending migration, each in its own transaction.
+
+        Returns the versions that were applied.
+        """
+        current = self.current_version()
+        if current > self.latest_version:
+            raise Exception(
+                f"Database schema version {current} is newer than this application "
+                f"supports ({self.latest_version})"
+            )
+
+        applied = []
+        for migration in self.migrations:
+            if migration.version <= current:
+                continue
+            with self.pool.writer() as conn:
+                migration.apply(conn)
+                conn.execute('''
+                    INSERT INTO schema_version (version, description)
+                    VALUES (?, ?)
+                ''', (migration.version, migration.description))
+            applied.append(migration.version)
+        return applied
+
+    def _ensure_version_table(self, conn: sqlite3.Connection):
+        """Create the schema_version bookkeeping table if needed"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
@@ -0,0 +1,76 @@
+"""Background removal of soft-deleted customers"""
+
+import threading
+from typing import Optional
+
+from .storage_backend import StorageBackend
+
+
+class PurgeWorker:
+    """Periodically hard-deletes customers soft-deleted over ``retention_days`` ago.
+
+    Each run removes rows in chunks of ``chunk_size``, each in its own
+    short write transaction with ``pause`` seconds in between, so user
+    edits are never queued behind a long delete.
+    """
+
+    # Chunks purged between checks for stop(), so closing the app never
+    # waits for a whole backlog to be purged
+    CHUNKS_PER_CHECK = 20
+
+    def __init__(self, backend: StorageBackend, retention_days: float = 30.0,
+                 interval: float = 3600.0, chunk_size: int = 500, pause: float = 0.05):
+        self.backend = backend
+        self.retention_days = retention_days
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.last_purged = 0
+        self.last_error: Optional[str] = None
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def purge(self) -> int:
+        """Purge expired soft-deleted customers now; returns how many were removed"""
+        try:
+            purged = 0
+            while True:
+                removed = self.backend.purge_deleted_customers(
+                    older_than_days=self.retention_days,
+                    chunk_size=self.chunk_size,
+                    pause=self.pause,
+                    max_chunks=self.CHUNKS_PER_CHECK
+                )
+                purged += removed
+                if removed < self.chunk_size * self.CHUNKS_PER_CHECK or self._stop.is_set():
+                    break
+            self.last_purged = purged
+            self.last_error = None
+            return self.last_purged
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+
+    def start(self):
+        """Purge now and then every ``interval`` seconds in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cms-purge", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.purge()
+            except Exception as e:
+                print(f"Error purging deleted customers: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        """Stop the background purge"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,110 @@
+"""Memory-bounded cache for read query results"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .connection_pool import ConnectionPool
+
+
+def estimate_size(value: Any) -> int:
+    """Rough deep size in bytes of a query result (rows of scalars)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item) if isinstance(item, (list, tuple)) else sys.getsizeof(item)
+    return size
+
+
+class QueryCache:
+    """LRU cache of query results keyed by SQL and parameters.
+
+    Every entry remembers the pool's change token from before it was loaded.
+    Once any commit happens, through this process's pool or from another
+    process (seen through ``PRAGMA data_version``), the token moves and the
+    whole cache is dropped, so a cached result is never older than the data.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_bytes: int = 8 * 1024 * 1024):
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._token: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any],
+                    max_age: Optional[float] = None) -> Any:
+        """Return the cached result for ``key`` or load and cache it.
+
+        ``max_age`` (seconds) bounds entries whose result also depends on the
+        clock, such as counts relative to ``date('now')``.
+        """
+        if not self.enabled:
+            return loader()
+
+        token = self.pool.change_token()
+        now = time.monotonic()
+        with self._lock:
+            if token != self._token:
+                self._drop_all()
+                self._token = token
+
+            entry = self._entries.get(key)
+            if entry is not None and (max_age is None or now - entry[2] <= max_age):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = loader()
+        size = estimate_size(value)
+
+        # Results bigger than a quarter of the budget would just churn the cache
+        if size > self.max_bytes // 4:
+            return value
+
+        with self._lock:
+            if token != self._token:
+                return value
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (value, size, now)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def _drop_all(self):
+        """Forget every entry (lock held)"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._drop_all()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and memory use"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
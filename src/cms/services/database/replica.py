@@ -0,0 +1,105 @@
+"""Read-only reporting replica of the customers database"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .backup import online_backup, open_read_only
+from .database_service import DatabaseService
+
+
+def replica_path_for(db_path: str) -> str:
+    """Default replica file for a database path (customers.db -> customers.replica.db)"""
+    path = Path(db_path)
+    return str(path.with_name(f"{path.stem}.replica{path.suffix}"))
+
+
+class ReportingReplica:
+    """A copy of the primary database that reports and exports read from.
+
+    ``refresh()`` copies the primary into the replica with the online
+    backup API in small page steps, so the live app's writer keeps going
+    while a copy is taken. The copy is written through the replica's own
+    write connection in one transaction; the replica is in WAL mode, so
+    reports already running keep their snapshot and later reads see the
+    new one. ``service`` is a DatabaseService over the replica and must
+    only be used for reads.
+    """
+
+    def __init__(self, primary_path: str, replica_path: Optional[str] = None,
+                 refresh_interval: float = 300.0, pages_per_step: int = 256,
+                 step_sleep: float = 0.01, busy_timeout: int = 5000):
+        self.primary_path = primary_path
+        self.replica_path = replica_path or replica_path_for(primary_path)
+        self.refresh_interval = refresh_interval
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.busy_timeout = busy_timeout
+        self.last_refreshed: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        # Entity caches cannot see the backup's changes, so only the
+        # change-token checked query cache is kept
+        self.service = DatabaseService(self.replica_path, read_pool_size=2,
+                                       busy_timeout=busy_timeout, cache_size=0)
+
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> int:
+        """Copy the primary into the replica now; returns the pages copied"""
+        try:
+            with self._refresh_lock:
+                source = open_read_only(self.primary_path, self.busy_timeout)
+                try:
+                    with self.service.pool.locked_writer() as target:
+                        pages = online_backup(source, target, self.pages_per_step, self.step_sleep)
+                finally:
+                    source.close()
+                self.last_refreshed = time.time()
+                self.last_error = None
+                return pages
+        except Exception as e:
+            self.last_error = str(e)
+            raise Exception(f"Failed to refresh reporting replica: {str(e)}")
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh"""
+        return None if self.last_refreshed is None else time.time() - self.last_refreshed
+
+    def start(self):
+        """Refresh every ``refresh_interval`` seconds in the background.
+
+        The first refresh runs straight away unless ``refresh()`` was
+        already called, e.g. to have a copy before the replica is read.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cms-reporting-replica", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        if self.last_refreshed is not None:
+            self._stop.wait(self.refresh_interval)
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing reporting replica: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def stop(self):
+        """Stop the background refresh"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop refreshing and close the replica's connections"""
+        self.stop()
+        self.service.close()
@@ -0,0 +1,589 @@
+"""Storage backend spreading customers over several SQLite files"""
+
+import heapq
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .database_service import BulkInsertResult, ChangeBatch, DatabaseService
+from .instrumentation import QueryProfiler, profiled_methods
+from .storage_backend import StorageBackend
+
+
+def shard_paths(db_path: str, shards: int) -> List[str]:
+    """File names of the shards for a database path (customers.db -> customers.shard0.db, ...)"""
+    path = Path(db_path)
+    return [str(path.with_name(f"{path.stem}.shard{index}{path.suffix}")) for index in range(shards)]
+
+
+class _ShardRollback(Exception):
+    """Raised inside a shard's transaction to roll it back with the others"""
+
+
+class _MissingSurvivor(Exception):
+    """Raised inside a merge when the survivor is no longer a live customer"""
+
+
+def _newest_first(row: Tuple) -> Tuple:
+    """Merge key of a customer row for (created_at, id) descending order"""
+    return (row[5] or "", row[0])
+
+
+@profiled_methods
+class ShardedDatabaseService(StorageBackend):
+    """Customers hash-partitioned by email over N single-file databases.
+
+    Every shard is a complete DatabaseService with its own writer, so
+    writes to different shards commit in parallel. Lookups by email go to
+    one shard; scans and counts fan out to all shards on a thread pool
+    (sqlite3 releases the GIL while a statement runs) and ordered results
+    are merged with a heap.
+
+    Customer ids are global: ``local_id * shards + shard_index``, so an id
+    alone routes to its shard. Shard 0 also holds service metadata, and its
+    part of a bulk write runs on the calling thread so that it joins a
+    transaction the caller holds on ``pool``.
+    """
+
+    def __init__(self, db_path: str = "customers.db", shards: int = 4,
+                 read_pool_size: int = 4, busy_timeout: int = 5000,
+                 cache_size: int = 1024, query_cache_bytes: int = 8 * 1024 * 1024,
+                 profiler: Optional[QueryProfiler] = None,
+                 storage_profile: Optional[Dict[str, Any]] = None,
+                 barrier_timeout: float = 300.0):
+        if shards < 1:
+            raise ValueError("At least one shard is required")
+        if db_path == ":memory:" or db_path.startswith("file:"):
+            raise ValueError("Sharding needs file-backed databases")
+
+        self.profiler = profiler or QueryProfiler(enabled=False)
+        self.db_path = db_path
+        self.read_pool_size = read_pool_size
+        self.shard_count = shards
+        self.barrier_timeout = barrier_timeout
+
+        # Shards log their slow statements but keep their method timings
+        # apart from the merged timings recorded at this level
+        self.shards = [
+            DatabaseService(path, read_pool_size, busy_timeout,
+                            cache_size // shards, query_cache_bytes // shards,
+                            QueryProfiler(enabled=self.profiler.enabled,
+                                          slow_query_ms=self.profiler.slow_query_ms),
+                            storage_profile)
+            for path in shard_paths(db_path, shards)
+        ]
+        self.pool = self.shards[0].pool
+        self.conn = self.shards[0].conn
+        self.cursor = self.shards[0].cursor
+        self._executor = ThreadPoolExecutor(max_workers=shards, thread_name_prefix="cms-shard")
+
+    # Routing
+
+    def shard_index(self, email: str) -> int:
+        """Shard holding the customer with this email"""
+        return zlib.crc32(email.encode("utf-8")) % self.shard_count
+
+    def _shard_for_email(self, email: str) -> DatabaseService:
+        return self.shards[self.shard_index(email)]
+
+    def _split_id(self, customer_id: int) -> Tuple[DatabaseService, int, int]:
+        """(shard, shard index, local id) for a global customer id"""
+        index = customer_id % self.shard_count
+        return self.shards[index], index, customer_id // self.shard_count
+
+    def _global_id(self, local_id: int, index: int) -> int:
+        return local_id * self.shard_count + index
+
+    def _globalize(self, row: Optional[Tuple], index: int) -> Optional[Tuple]:
+        """Rewrite a shard row's id into a global id"""
+        if row is None:
+            return None
+        return (self._global_id(row[0], index),) + tuple(row[1:])
+
+    def _local_after(self, after: Optional[Tuple[str, int]], index: int) -> Optional[Tuple[str, int]]:
+        """Translate a global keyset cursor into one shard's cursor.
+
+        ``local * N + index < global`` holds exactly when ``local`` is below
+        ``ceil((global - index) / N)``.
+        """
+        if after is None:
+            return None
+        created_at, global_id = after
+        return (created_at, -(-(global_id - index) // self.shard_count))
+
+    def _fan_out(self, func: Callable[[DatabaseService, int], Any]) -> List[Any]:
+        """Call ``func(shard, index)`` on every shard in parallel, results in shard order"""
+        futures = [self._executor.submit(func, shard, index) for index, shard in enumerate(self.shards)]
+        return [future.result() for future in futures]
+
+    def _merge_pages(self, pages: List[List[Tuple]], limit: Optional[int]) -> List[Tuple]:
+        """Merge per-shard newest-first pages (already globalized) into one"""
+        merged = heapq.merge(*pages, key=_newest_first, reverse=True)
+        if limit is None or limit < 0:
+            return list(merged)
+        return [row for _, row in zip(range(limit), merged)]
+
+    # Writes
+
+    def create_customer(self, first_name: str, last_name: str, email: str,
+                        phone: str, password_hash: str) -> int:
+        """Create a new customer"""
+        index = self.shard_index(email)
+        local_id = self.shards[index].create_customer(first_name, last_name, email, phone, password_hash)
+        return self._global_id(local_id, index)
+
+    def create_customers_bulk(self, rows: Iterable[Dict[str, Any]],
+                              on_conflict: str = "fail") -> BulkInsertResult:
+        """Insert many customers, one transaction per shard, shards in parallel.
+
+        The shard transactions only commit once every shard has written its
+        rows, so a batch that fails on any shard leaves all shards untouched.
+        With "fail", emails repeated within the batch or already registered
+        are rejected before any shard writes. Bulk inserts hold shard 0's
+        write lock throughout, so they run one at a time; only a failure
+        inside the commits themselves (disk full, I/O error) can still leave
+        the shards that committed first with their rows.
+        """
+        if on_conflict not in self.CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {on_conflict}")
+
+        rows = list(rows)
+        positions: List[List[int]] = [[] for _ in self.shards]
+        for position, row in enumerate(rows):
+            positions[self.shard_index(row["email"])].append(position)
+
+        # Shard 0's transaction is opened here so it joins one the caller holds on self.pool
+        with self.shards[0].pool.writer():
+            if on_conflict == "fail":
+                seen = set()
+                repeated = []
+                for row in rows:
+                    if row["email"] in seen:
+                        repeated.append(row["email"])
+                    seen.add(row["email"])
+                if repeated:
+                    raise Exception(f"Email already registered: {len(repeated)} email(s) repeated "
+                                    f"in the batch, first: {repeated[0]}")
+
+                def find_existing(shard, index):
+                    emails = [rows[position]["email"] for position in positions[index]]
+                    if not emails:
+                        return []
+                    with shard.pool.reader() as conn:
+                        return list(DatabaseService._ids_by_email(conn, emails))
+                existing = [email for emails in self._fan_out(find_existing) for email in emails]
+                if existing:
+                    raise Exception(f"Email already registered: {len(existing)} email(s) already "
+                                    f"registered, first: {existing[0]}")
+
+            def insert(shard, index):
+                if not positions[index]:
+                    return BulkInsertResult([], [])
+                return shard.create_customers_bulk([rows[position] for position in positions[index]],
+                                                   on_conflict)
+
+            results = self._write_all_or_nothing(
+                insert, [index for index in range(self.shard_count) if index == 0 or positions[index]])
+
+        ids: List[Optional[int]] = [None] * len(rows)
+        conflicts = []
+        for index, result in results.items():
+            for local_position, local_id in enumerate(result.ids):
+                if local_id is not None:
+                    ids[positions[index][local_position]] = self._global_id(local_id, index)
+            conflicts.extend((positions[index][local_position], email)
+                             for local_position, email in result.conflicts)
+        conflicts.sort()
+        return BulkInsertResult(ids, conflicts)
+
+    def _write_all_or_nothing(self, func: Callable[[DatabaseService, int], Any],
+                              indexes: List[int]) -> Dict[int, Any]:
+        """Run ``func(shard, index)`` in a write transaction on each listed shard.
+
+        Shard 0 runs on the calling thread (inside the transaction the caller
+        opened on it), the others on the executor. Every shard waits at a
+        barrier once its writes are done; if any of them failed, or the others
+        did not arrive within ``barrier_timeout`` seconds, all of them roll
+        back and the first failure, in shard order, is raised. Otherwise each
+        transaction commits.
+        """
+        barrier = threading.Barrier(len(indexes))
+        failures: Dict[int, Exception] = {}
+
+        def run(index):
+            shard = self.shards[index]
+            try:
+                with shard.pool.writer():
+                    try:
+                        result = func(shard, index)
+                    except Exception as e:
+                        failures[index] = e
+                    try:
+                        barrier.wait(self.barrier_timeout)
+                    except threading.BrokenBarrierError:
+                        # Aborted by a failed shard, or timed out waiting for a slow one
+                        failures.setdefault(index, Exception(
+                            "Failed to write to all shards: timed out waiting for the other shards"))
+                    if failures:
+                        # Leaving the block with an exception rolls this shard back
+                        raise _ShardRollback()
+                    return result
+            except _ShardRollback:
+                raise
+            except Exception as e:
+                # The transaction could not start (or commit): release the others
+                failures.setdefault(index, e)
+                barrier.abort()
+                raise _ShardRollback()
+
+        futures = {index: self._executor.submit(run, index) for index in indexes if index != 0}
+        results = {}
+        for index in indexes:
+            try:
+                results[index] = run(0) if index == 0 else futures[index].result()
+            except _ShardRollback:
+                pass
+
+        if failures:
+            # Raised inside the caller's shard 0 transaction, which rolls it back
+            raise failures[min(failures)]
+        return results
+
+    def update_customer_password(self, email: str, password_hash: str) -> bool:
+        """Update customer password"""
+        return self._shard_for_email(email).update_customer_password(email, password_hash)
+
+    def update_customer_profile(self, email: str, first_name: str, last_name: str, phone: str) -> bool:
+        """Update customer profile information"""
+        return self._shard_for_email(email).update_customer_profile(email, first_name, last_name, phone)
+
+    def delete_customer(self, customer_id: int) -> bool:
+        """Soft-delete customer by ID"""
+        shard, _, local_id = self._split_id(customer_id)
+        return shard.delete_customer(local_id)
+
+    def delete_customers(self, customer_ids: Iterable[int]) -> int:
+        """Soft-delete many customers; returns how many were deleted"""
+        local_ids: List[List[int]] = [[] for _ in self.shards]
+        for customer_id in customer_ids:
+            _, index, local_id = self._split_id(customer_id)
+            local_ids[index].append(local_id)
+        return sum(shard.delete_customers(local_ids[index])
+                   for index, shard in enumerate(self.shards) if local_ids[index])
+
+    def restore_customer(self, customer_id: int) -> bool:
+        """Undo a soft delete that has not been purged yet"""
+        shard, _, local_id = self._split_id(customer_id)
+        return shard.restore_customer(local_id)
+
+    def merge_customers(self, survivor_id: int, duplicate_ids: Iterable[int]) -> int:
+        """Fold duplicate customers into ``survivor_id``; returns how many were merged.
+
+        Each shard soft-deletes and records its own duplicates against the
+        survivor's global id. The shard transactions commit together, and
+        only if the survivor is still a live customer.
+        """
+        _, survivor_index, survivor_local_id = self._split_id(survivor_id)
+        local_ids: List[List[int]] = [[] for _ in self.shards]
+        for customer_id in duplicate_ids:
+            if customer_id != survivor_id:
+                _, index, local_id = self._split_id(customer_id)
+                local_ids[index].append(local_id)
+
+        def merge(shard, index):
+            if index == survivor_index:
+                with shard.pool.writer() as conn:
+                    if conn.execute("SELECT 1 FROM customers WHERE id = ? AND deleted_at IS NULL",
+                                    (survivor_local_id,)).fetchone() is None:
+                        raise _MissingSurvivor()
+            return shard._merge_duplicates(survivor_id, local_ids[index]) if local_ids[index] else 0
+
+        indexes = [index for index in range(self.shard_count)
+                   if index in (0, survivor_index) or local_ids[index]]
+        try:
+            # Holding shard 0's write lock runs cross-shard writes one at a time
+            with self.shards[0].pool.writer():
+                results = self._write_all_or_nothing(merge, indexes)
+        except _MissingSurvivor:
+            return 0
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to merge customers: {str(e)}")
+
+        # Lookups between a shard's cache invalidation and the common commit
+        # may have cached the pre-merge rows
+        for index in indexes:
+            for local_id in local_ids[index]:
+                self.shards[index].customer_cache.invalidate_id(local_id)
+        return sum(results.values())
+
+    def purge_deleted_customers(self, older_than_days: float = 0, chunk_size: int = 500,
+                                pause: float = 0.05, max_chunks: Optional[int] = None) -> int:
+        """Hard-delete customers soft-deleted more than ``older_than_days`` ago, all shards at once"""
+        return sum(self._fan_out(lambda shard, _: shard.purge_deleted_customers(
+            older_than_days, chunk_size, pause, max_chunks)))
+
+    # Lookups
+
+    def authenticate_customer(self, email: str, password_hash: str) -> Optional[Tuple]:
+        """Authenticate customer with email and password"""
+        index = self.shard_index(email)
+        return self._globalize(self.shards[index].authenticate_customer(email, password_hash), index)
+
+    def email_exists(self, email: str) -> bool:
+        """Check if email already exists"""
+        return self._shard_for_email(email).email_exists(email)
+
+    def get_customer_by_email(self, email: str) -> Optional[Tuple]:
+        """Get customer by email address"""
+        index = self.shard_index(email)
+        return self._globalize(self.shards[index].get_customer_by_email(email), index)
+
+    def get_customer_by_id(self, customer_id: int) -> Optional[Tuple]:
+        """Get customer by ID"""
+        shard, index, local_id = self._split_id(customer_id)
+        return self._globalize(shard.get_customer_by_id(local_id), index)
+
+    # Scans
+
+    def get_all_customers(self) -> List[Tuple]:
+        """Get all customers"""
+        return self._merge_pages(self._fan_out(
+            lambda shard, index: [self._globalize(row, index) for row in shard.get_all_customers()]), None)
+
+    def iter_customers(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Iterate over all customers, newest first, with flat memory use"""
+        streams = [(self._globalize(row, index) for row in shard.iter_customers(batch_size))
+                   for index, shard in enumerate(self.shards)]
+        yield from heapq.merge(*streams, key=_newest_first, reverse=True)
+
+    def get_customers_page(self, after: Optional[Tuple[str, int]] = None,
+                           limit: int = 50) -> List[Tuple]:
+        """Get one page of customers, newest first"""
+        return self._merge_pages(self._fan_out(
+            lambda shard, index: [self._globalize(row, index) for row in
+                                  shard.get_customers_page(self._local_after(after, index), limit)]), limit)
+
+    def get_customers_with_status(self, status: Optional[str] = None,
+                                  after: Optional[Tuple[str, int]] = None,
+                                  limit: int = 50) -> List[Tuple]:
+        """Get one page of customers with their status, newest first"""
+        return self._merge_pages(self._fan_out(
+            lambda shard, index: [self._globalize(row, index) for row in shard.get_customers_with_status(
+                status, self._local_after(after, index), limit)]), limit)
+
+    def get_customer_statuses(self, customer_ids: Iterable[int]) -> Dict[int, str]:
+        """Status of each live customer in ``customer_ids``"""
+        local_ids: List[List[int]] = [[] for _ in self.shards]
+        for customer_id in customer_ids:
+            _, index, local_id = self._split_id(customer_id)
+            local_ids[index].append(local_id)
+        statuses = {}
+        for index, shard in enumerate(self.shards):
+            if local_ids[index]:
+                statuses.update((self._global_id(local_id, index), status) for local_id, status
+                                in shard.get_customer_statuses(local_ids[index]).items())
+        return statuses
+
+    def search_customers(self, search_term: str, limit: Optional[int] = None) -> List[Tuple]:
+        """Search customers by name or email, best matches first"""
+        return [row for _, row in self.search_customers_scored(search_term, limit)]
+
+    def search_customers_scored(self, search_term: str,
+                                limit: Optional[int] = None) -> List[Tuple[float, Tuple]]:
+        """Search customers, returning ``(rank, row)`` pairs best first.
+
+        bm25 ranks are computed per shard; with emails hashed evenly the
+        shards' term statistics are close enough to merge directly.
+        """
+        if not DatabaseService._fts_query(search_term):
+            rows = self.get_all_customers() if limit is None else self.get_customers_page(limit=limit)
+            return [(0.0, row) for row in rows]
+
+        results = self._fan_out(
+            lambda shard, index: [(rank, self._globalize(row, index))
+                                  for rank, row in shard.search_customers_scored(search_term, limit)])
+        merged = heapq.merge(*results, key=lambda match: match[0])
+        if limit is None:
+            return list(merged)
+        return [match for _, match in zip(range(limit), merged)]
+
+    def iter_search(self, search_term: str, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Iterate over every search match, best matches first"""
+        for _, row in self.iter_search_scored(search_term, batch_size):
+            yield row
+
+    def iter_search_scored(self, search_term: str,
+                           batch_size: int = 1000) -> Iterator[Tuple[float, Tuple]]:
+        """Iterate over ``(rank, row)`` for every search match, best first"""
+        if not DatabaseService._fts_query(search_term):
+            for row in self.iter_customers(batch_size):
+                yield 0.0, row
+            return
+
+        def stream(shard, index):
+            for rank, row in shard.iter_search_scored(search_term, batch_size):
+                yield rank, self._globalize(row, index)
+
+        yield from heapq.merge(*(stream(shard, index) for index, shard in enumerate(self.shards)),
+                               key=lambda match: match[0])
+
+    def search_customers_page(self, search_term: str,
+                              after: Optional[Tuple[str, int]] = None,
+                              limit: int = 50) -> List[Tuple]:
+        """Get one page of search results, newest first"""
+        return self._merge_pages(self._fan_out(
+            lambda shard, index: [self._globalize(row, index) for row in shard.search_customers_page(
+                search_term, self._local_after(after, index), limit)]), limit)
+
+    def fuzzy_search_customers(self, search_term: str, limit: int = 10,
+                               max_distance: Optional[int] = None) -> List[Tuple]:
+        """Search customers tolerating typos, closest matches first"""
+        def search(shard, index):
+            return [(distance, -similarity, index, local_id)
+                    for local_id, distance, similarity in shard.fuzzy_search.search(
+                        search_term, limit, max_distance)]
+
+        matches = sorted(match for shard_matches in self._fan_out(search) for match in shard_matches)
+        rows = []
+        for _, _, index, local_id in matches[:limit]:
+            row = self.shards[index].get_customer_by_id(local_id)
+            if row is not None:
+                rows.append(self._globalize(row, index))
+        return rows
+
+    # Dashboard counters
+
+    def get_customer_count(self) -> int:
+        """Get total number of customers"""
+        return sum(self._fan_out(lambda shard, index: shard.get_customer_count()))
+
+    def get_recent_registrations_count(self, days: int = 7) -> int:
+        """Get count of recent registrations"""
+        return sum(self._fan_out(lambda shard, index: shard.get_recent_registrations_count(days)))
+
+    def get_today_registrations_count(self) -> int:
+        """Get count of today's registrations"""
+        return sum(self._fan_out(lambda shard, index: shard.get_today_registrations_count()))
+
+    def get_registration_trend(self, days: Optional[int] = None,
+                               granularity: str = "day") -> List[Tuple[str, int]]:
+        """(bucket, registrations) per day or hour, summed over the shards"""
+        totals: Dict[str, int] = {}
+        for trend in self._fan_out(lambda shard, index: shard.get_registration_trend(days, granularity)):
+            for bucket, registrations in trend:
+                totals[bucket] = totals.get(bucket, 0) + registrations
+        return sorted((bucket, count) for bucket, count in totals.items() if count)
+
+    def get_recent_activity(self, limit: int = 5) -> List[Tuple]:
+        """Get recent customer activity"""
+        results = self._fan_out(lambda shard, index: shard.get_recent_activity(limit))
+        merged = heapq.merge(*results, key=lambda row: row[3] or "", reverse=True)
+        return [row for _, row in zip(range(limit), merged)]
+
+    # Email domain analytics
+
+    def get_email_domain_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(domain, customers) pairs, most common first, summed over the shards"""
+        totals: Dict[str, int] = {}
+        for counts in self._fan_out(lambda shard, index: shard.get_email_domain_counts()):
+            for domain, customers in counts:
+                totals[domain] = totals.get(domain, 0) + customers
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def get_email_domain_count(self, domain: str) -> int:
+        """Number of customers with an email address at ``domain``"""
+        return sum(self._fan_out(lambda shard, index: shard.get_email_domain_count(domain)))
+
+    def get_customers_by_domain(self, domain: str, after: Optional[Tuple[str, int]] = None,
+                                limit: int = 50) -> List[Tuple]:
+        """One keyset page of the customers at ``domain``, newest first"""
+        return self._merge_pages(self._fan_out(
+            lambda shard, index: [self._globalize(row, index) for row in shard.get_customers_by_domain(
+                domain, self._local_after(after, index), limit)]), limit)
+
+    # Change log
+
+    def _split_watermark(self, watermark: Optional[str]) -> List[str]:
+        """Per-shard watermarks inside a sharded watermark ("seq0.seq1...")"""
+        if not watermark:
+            return [""] * self.shard_count
+        parts = watermark.split(".")
+        if len(parts) != self.shard_count:
+            raise ValueError(f"Invalid change watermark for {self.shard_count} shards: {watermark!r}")
+        return parts
+
+    def get_changes_since(self, watermark: Optional[str] = None, limit: int = 1000) -> ChangeBatch:
+        """Up to ``limit`` logged changes after ``watermark``, oldest first.
+
+        Shards are merged by change time; the watermark records how far
+        each shard's own log was read, so nothing is skipped when shards
+        change at different rates.
+        """
+        positions = self._split_watermark(watermark)
+        batches = self._fan_out(lambda shard, index: [
+            (change, index) for change in shard.get_changes_since(positions[index], limit).changes])
+        merged = heapq.merge(*batches, key=lambda item: item[0][8] or "")
+
+        changes = []
+        for change, index in merged:
+            if len(changes) >= limit:
+                break
+            positions[index] = str(change[0])
+            changes.append((self._global_id(change[0], index), change[1],
+                            self._global_id(change[2], index)) + tuple(change[3:]))
+        return ChangeBatch(changes, ".".join(position or "0" for position in positions))
+
+    def prune_changes(self, watermark: str) -> int:
+        """Drop logged changes up to ``watermark`` on every shard"""
+        positions = self._split_watermark(watermark)
+        return sum(self._fan_out(lambda shard, index: shard.prune_changes(positions[index])))
+
+    def oldest_watermark(self, watermarks: Iterable[str]) -> Optional[str]:
+        """The furthest watermark every one of ``watermarks`` has reached, shard by shard"""
+        split = [self._split_watermark(watermark) for watermark in watermarks]
+        if not split:
+            return None
+        return ".".join(self.shards[index].oldest_watermark(positions[index] for positions in split)
+                        for index in range(self.shard_count))
+
+    # Diagnostics and lifecycle
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the customer lookup caches, summed over shards"""
+        return self._sum_stats(shard.get_cache_stats() for shard in self.shards)
+
+    def get_latency_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-method call counts and p50/p95/p99 latencies of merged calls"""
+        return self.profiler.report()
+
+    def get_query_cache_stats(self) -> Dict[str, int]:
+        """Query result cache counters, summed over shards"""
+        return self._sum_stats(shard.get_query_cache_stats() for shard in self.shards)
+
+    @staticmethod
+    def _sum_stats(stats: Iterable[Dict[str, int]]) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for shard_stats in stats:
+            for key, value in shard_stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def close(self):
+        """Close every shard"""
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for shard in getattr(self, "shards", []):
+            shard.close()
+
+
+def create_storage_backend(db_path: str = "customers.db", shards: int = 1,
+                           **kwargs) -> StorageBackend:
+    """Open the single-file service, or the sharded one when ``shards`` > 1"""
+    if shards > 1:
+        return ShardedDatabaseService(db_path, shards, **kwargs)
+    return DatabaseService(db_path, **kwargs)
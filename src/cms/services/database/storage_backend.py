@@ -0,0 +1,208 @@
+"""Storage backend interface implemented by the database services"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class StorageBackend(ABC):
+    """Customer storage operations the rest of the application relies on.
+
+    Customers are passed around as ``(id, first_name, last_name, email,
+    phone, created_at)`` rows. ``pool`` is the connection pool that holds
+    service metadata such as import checkpoints; a write transaction opened
+    on it by the caller is joined by writes that land in the same database.
+    """
+
+    # Conflict policies accepted by create_customers_bulk
+    CONFLICT_POLICIES = ("ignore", "replace", "fail")
+
+    pool = None
+
+    # Writes
+
+    @abstractmethod
+    def create_customer(self, first_name: str, last_name: str, email: str,
+                        phone: str, password_hash: str) -> int:
+        """Create a new customer and return its id"""
+
+    @abstractmethod
+    def create_customers_bulk(self, rows: Iterable[Dict[str, Any]], on_conflict: str = "fail"):
+        """Insert many customers, returning a BulkInsertResult"""
+
+    @abstractmethod
+    def update_customer_password(self, email: str, password_hash: str) -> bool:
+        """Update customer password"""
+
+    @abstractmethod
+    def update_customer_profile(self, email: str, first_name: str, last_name: str, phone: str) -> bool:
+        """Update customer profile information"""
+
+    @abstractmethod
+    def delete_customer(self, customer_id: int) -> bool:
+        """Soft-delete customer by ID"""
+
+    @abstractmethod
+    def delete_customers(self, customer_ids: Iterable[int]) -> int:
+        """Soft-delete many customers; returns how many were deleted"""
+
+    @abstractmethod
+    def restore_customer(self, customer_id: int) -> bool:
+        """Undo a soft delete that has not been purged yet"""
+
+    @abstractmethod
+    def merge_customers(self, survivor_id: int, duplicate_ids: Iterable[int]) -> int:
+        """Fold duplicate customers into ``survivor_id``; returns how many were merged"""
+
+    @abstractmethod
+    def purge_deleted_customers(self, older_than_days: float = 0, chunk_size: int = 500,
+                                pause: float = 0.05, max_chunks: Optional[int] = None) -> int:
+        """Hard-delete customers soft-deleted more than ``older_than_days`` ago"""
+
+    # Lookups
+
+    @abstractmethod
+    def authenticate_customer(self, email: str, password_hash: str) -> Optional[Tuple]:
+        """Return (id, first_name, last_name, email) for matching credentials"""
+
+    @abstractmethod
+    def email_exists(self, email: str) -> bool:
+        """Check if email already exists"""
+
+    @abstractmethod
+    def get_customer_by_email(self, email: str) -> Optional[Tuple]:
+        """Get customer by email address"""
+
+    @abstractmethod
+    def get_customer_by_id(self, customer_id: int) -> Optional[Tuple]:
+        """Get customer by ID"""
+
+    # Scans
+
+    @abstractmethod
+    def get_all_customers(self) -> List[Tuple]:
+        """Get all customers, newest first"""
+
+    @abstractmethod
+    def iter_customers(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Iterate over all customers, newest first"""
+
+    @abstractmethod
+    def get_customers_page(self, after: Optional[Tuple[str, int]] = None,
+                           limit: int = 50) -> List[Tuple]:
+        """Get one keyset page of customers, newest first"""
+
+    @abstractmethod
+    def get_customers_with_status(self, status: Optional[str] = None,
+                                  after: Optional[Tuple[str, int]] = None,
+                                  limit: int = 50) -> List[Tuple]:
+        """Get one keyset page of customers with a status column, newest first"""
+
+    @abstractmethod
+    def get_customer_statuses(self, customer_ids: Iterable[int]) -> Dict[int, str]:
+        """Status of each live customer in ``customer_ids``"""
+
+    @abstractmethod
+    def search_customers(self, search_term: str, limit: Optional[int] = None) -> List[Tuple]:
+        """Search customers by name or email, best matches first"""
+
+    @abstractmethod
+    def search_customers_scored(self, search_term: str,
+                                limit: Optional[int] = None) -> List[Tuple[float, Tuple]]:
+        """Search customers, returning (rank, row) pairs best first"""
+
+    @abstractmethod
+    def iter_search(self, search_term: str, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Iterate over every search match, best matches first"""
+
+    @abstractmethod
+    def iter_search_scored(self, search_term: str,
+                           batch_size: int = 1000) -> Iterator[Tuple[float, Tuple]]:
+        """Iterate over (rank, row) for every search match, best first"""
+
+    @abstractmethod
+    def search_customers_page(self, search_term: str, after: Optional[Tuple[str, int]] = None,
+                              limit: int = 50) -> List[Tuple]:
+        """Get one keyset page of search results, newest first"""
+
+    @abstractmethod
+    def fuzzy_search_customers(self, search_term: str, limit: int = 10,
+                               max_distance: Optional[int] = None) -> List[Tuple]:
+        """Search customers tolerating typos, closest matches first"""
+
+    @staticmethod
+    def page_cursor(rows: List[Tuple]) -> Optional[Tuple[str, int]]:
+        """Build the ``after`` cursor for the page following ``rows``"""
+        if not rows:
+            return None
+        last = rows[-1]
+        return (last[5], last[0])
+
+    # Dashboard counters
+
+    @abstractmethod
+    def get_customer_count(self) -> int:
+        """Get total number of customers"""
+
+    @abstractmethod
+    def get_recent_registrations_count(self, days: int = 7) -> int:
+        """Get count of recent registrations"""
+
+    @abstractmethod
+    def get_today_registrations_count(self) -> int:
+        """Get count of today's registrations"""
+
+    @abstractmethod
+    def get_registration_trend(self, days: Optional[int] = None,
+                               granularity: str = "day") -> List[Tuple[str, int]]:
+        """(bucket, registrations) per day or hour, oldest first"""
+
+    @abstractmethod
+    def get_recent_activity(self, limit: int = 5) -> List[Tuple]:
+        """Get (first_name, last_name, email, created_at) of the newest customers"""
+
+    # Email domain analytics
+
+    @abstractmethod
+    def get_email_domain_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(domain, customers) pairs, most common first"""
+
+    @abstractmethod
+    def get_email_domain_count(self, domain: str) -> int:
+        """Number of customers with an email address at ``domain``"""
+
+    @abstractmethod
+    def get_customers_by_domain(self, domain: str, after: Optional[Tuple[str, int]] = None,
+                                limit: int = 50) -> List[Tuple]:
+        """One keyset page of the customers at ``domain``, newest first"""
+
+    # Change log
+
+    @abstractmethod
+    def get_changes_since(self, watermark: Optional[str] = None, limit: int = 1000):
+        """Up to ``limit`` logged customer changes after ``watermark``, as a ChangeBatch"""
+
+    @abstractmethod
+    def prune_changes(self, watermark: str) -> int:
+        """Drop logged changes up to ``watermark``"""
+
+    @abstractmethod
+    def oldest_watermark(self, watermarks: Iterable[str]) -> Optional[str]:
+        """The furthest watermark every one of ``watermarks`` has reached"""
+
+    # Diagnostics and lifecycle
+
+    @abstractmethod
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the customer lookup cache"""
+
+    @abstractmethod
+    def get_latency_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-method call counts and latency percentiles"""
+
+    @abstractmethod
+    def get_query_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and memory use of the query result cache"""
+
+    @abstractmethod
+    def close(self):
+        """Close database connections"""
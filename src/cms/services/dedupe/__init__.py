@@ -0,0 +1 @@
+# Duplicate detection services
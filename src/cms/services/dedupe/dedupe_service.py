@@ -0,0 +1,340 @@
+"""Dedupe service for finding and merging duplicate customers"""
+
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..database.storage_backend import StorageBackend
+
+
+# Share of the duplicate score contributed by each field
+FIELD_WEIGHTS = {"name": 0.45, "phone": 0.35, "email": 0.20}
+
+SOUNDEX_DIGITS = {letter: digit for digit, letters in (
+    ("1", "BFPV"), ("2", "CGJKQSXZ"), ("3", "DT"), ("4", "L"), ("5", "MN"), ("6", "R"))
+    for letter in letters}
+
+# (id, created_at, first_name, last_name, email, normalized phone) as sent to workers
+Candidate = Tuple[int, str, str, str, str, str]
+
+# ((created_at, id), (created_at, id), score) for a likely duplicate pair
+ScoredPair = Tuple[Tuple[str, int], Tuple[str, int], float]
+
+
+class DuplicateCluster(NamedTuple):
+    """Customers that look like the same person.
+
+    ``customer_ids`` are oldest first, so the first one is the suggested
+    survivor; ``score`` is the weakest pair score linking the cluster.
+    """
+    customer_ids: List[int]
+    score: float
+    pairs: List[Tuple[int, int, float]]
+
+
+class DedupeProgress(NamedTuple):
+    """Running totals reported to the progress callback"""
+    blocks_done: int
+    comparisons: int
+    pairs: int
+
+
+class DedupeResult(NamedTuple):
+    """Outcome of a duplicate scan"""
+    clusters: List[DuplicateCluster]
+    customers: int
+    blocks: int
+    comparisons: int
+
+
+def normalize_phone(phone: str) -> str:
+    """Last ten digits of a phone number, or "" if it has too few to match on"""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 7 else ""
+
+
+def _ascii_letters(text: str) -> str:
+    """Upper-case ASCII letters of ``text`` with accents stripped"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed.upper() if "A" <= char <= "Z")
+
+
+def name_code(name: str) -> str:
+    """American Soundex code of a name ("Robert" and "Rupert" -> "R163")"""
+    letters = _ascii_letters(name)
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = SOUNDEX_DIGITS.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_DIGITS.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code
+        if letter not in "HW":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(first_name: str, last_name: str, phone: str) -> List[str]:
+    """Keys of the blocks a customer is compared within.
+
+    One block per normalized phone number and one per pair of name codes;
+    the codes are sorted, so swapped first and last names share a block.
+    """
+    keys = []
+    phone_key = normalize_phone(phone)
+    if phone_key:
+        keys.append("p:" + phone_key)
+    first_code, last_code = name_code(first_name), name_code(last_name)
+    if first_code and last_code:
+        keys.append("n:" + "".join(sorted((first_code, last_code))))
+    return keys
+
+
+def _email_local(email: str) -> str:
+    """Local part of an email without dots and +tags, for comparison"""
+    local = (email or "").lower().split("@", 1)[0]
+    return local.split("+", 1)[0].replace(".", "")
+
+
+def score_pair(a: Candidate, b: Candidate, threshold: float = 0.0) -> float:
+    """Weighted similarity of two customers between 0 and 1.
+
+    Returns 0 early when even the optimistic bound is below ``threshold``.
+    """
+    name_a = f"{a[2]} {a[3]}".lower()
+    name_b = f"{b[2]} {b[3]}".lower()
+    # Phone numbers are identifiers, so nearly-equal ones are still different
+    # people; only a differing area code or country prefix earns partial credit
+    if a[5] and a[5] == b[5]:
+        phone_score = 1.0
+    elif a[5] and b[5] and a[5][-7:] == b[5][-7:]:
+        phone_score = 0.5
+    else:
+        phone_score = 0.0
+
+    # Cheap upper bound first: most candidates in a name block are strangers
+    names = SequenceMatcher(None, name_a, name_b)
+    bound = FIELD_WEIGHTS["phone"] * phone_score + FIELD_WEIGHTS["email"]
+    if FIELD_WEIGHTS["name"] * names.quick_ratio() + bound < threshold:
+        return 0.0
+
+    name_score = max(names.ratio(),
+                     SequenceMatcher(None, name_a, f"{b[3]} {b[2]}".lower()).ratio())
+    email_score = SequenceMatcher(None, _email_local(a[4]), _email_local(b[4])).ratio()
+
+    return (FIELD_WEIGHTS["name"] * name_score + FIELD_WEIGHTS["phone"] * phone_score
+            + FIELD_WEIGHTS["email"] * email_score)
+
+
+def score_blocks(blocks: List[List[Candidate]], threshold: float, max_block_size: int,
+                 window: int) -> Tuple[List[ScoredPair], int]:
+    """Score the candidate pairs inside each block.
+
+    Runs in a worker process, so it only touches its arguments. Blocks up
+    to ``max_block_size`` compare every pair; larger ones (common names)
+    are sorted by name and email and each customer is compared with the
+    next ``window`` ones only. Returns the pairs scoring at least
+    ``threshold`` and the number of comparisons made.
+    """
+    pairs = []
+    comparisons = 0
+    for block in blocks:
+        if len(block) > max_block_size:
+            block = sorted(block, key=lambda c: (c[3].lower(), c[2].lower(), c[4]))
+            reach = window
+        else:
+            reach = len(block)
+        for i, a in enumerate(block):
+            for b in block[i + 1:i + 1 + reach]:
+                comparisons += 1
+                score = score_pair(a, b, threshold)
+                if score >= threshold:
+                    pairs.append(((a[1] or "", a[0]), (b[1] or "", b[0]), round(score, 4)))
+    return pairs, comparisons
+
+
+class DedupeService:
+    """Finds customers registered more than once and merges them.
+
+    Instead of comparing every customer with every other one, customers
+    are grouped into blocks by blocking key (normalized phone, sound-alike
+    name codes) and only compared within a block. The keys are sorted in a
+    temporary SQLite workspace, so memory stays flat on large tables, and
+    the blocks are scored in a process pool. Linked pairs are joined into
+    clusters.
+    """
+
+    def __init__(self, database_service: StorageBackend, threshold: float = 0.8,
+                 max_block_size: int = 100, window: int = 20,
+                 workers: Optional[int] = None, task_size: int = 5000):
+        self.database_service = database_service
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.window = window
+        self.workers = workers or os.cpu_count() or 1
+        self.task_size = task_size
+
+    def _build_workspace(self) -> Tuple[sqlite3.Connection, int]:
+        """Write (key, candidate) rows for every customer to a temporary database"""
+        workspace = sqlite3.connect("")
+        workspace.execute('''
+            CREATE TABLE entries (
+                key TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                created_at TEXT,
+                first_name TEXT,
+                last_name TEXT,
+                email TEXT,
+                phone TEXT
+            )
+        ''')
+        customers = 0
+        batch = []
+        for customer_id, first_name, last_name, email, phone, created_at in \
+                self.database_service.iter_customers():
+            customers += 1
+            phone_key = normalize_phone(phone)
+            for key in blocking_keys(first_name, last_name, phone):
+                batch.append((key, customer_id, created_at, first_name, last_name, email, phone_key))
+            if len(batch) >= 10000:
+                workspace.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        workspace.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+        workspace.execute("CREATE INDEX idx_entries_key ON entries (key)")
+        return workspace, customers
+
+    @staticmethod
+    def _iter_blocks(workspace: sqlite3.Connection) -> Iterator[List[Candidate]]:
+        """Blocks with at least two customers, in key order"""
+        rows = workspace.execute('''
+            SELECT key, id, created_at, first_name, last_name, email, phone
+            FROM entries
+            WHERE key IN (SELECT key FROM entries GROUP BY key HAVING COUNT(*) > 1)
+            ORDER BY key
+        ''')
+        current_key = None
+        block: List[Candidate] = []
+        for key, *candidate in rows:
+            if key != current_key:
+                if len(block) > 1:
+                    yield block
+                current_key = key
+                block = []
+            block.append(tuple(candidate))
+        if len(block) > 1:
+            yield block
+
+    def _iter_tasks(self, workspace: sqlite3.Connection) -> Iterator[List[List[Candidate]]]:
+        """Group blocks into tasks of roughly ``task_size`` customers"""
+        task: List[List[Candidate]] = []
+        rows = 0
+        for block in self._iter_blocks(workspace):
+            task.append(block)
+            rows += len(block)
+            if rows >= self.task_size:
+                yield task
+                task = []
+                rows = 0
+        if task:
+            yield task
+
+    def find_duplicates(self, progress_callback: Optional[Callable[[DedupeProgress], None]] = None,
+                        executor: Optional[Executor] = None) -> DedupeResult:
+        """Scan every customer and return duplicate clusters, most certain first"""
+        try:
+            workspace, customers = self._build_workspace()
+            best: Dict[Tuple[Tuple[str, int], Tuple[str, int]], float] = {}
+            blocks_done = comparisons = 0
+
+            own_executor = executor is None
+            if own_executor:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+            # Bounded window of in-flight tasks keeps memory flat
+            pending = deque()
+            try:
+                tasks = self._iter_tasks(workspace)
+                exhausted = False
+                while pending or not exhausted:
+                    while not exhausted and len(pending) < self.workers * 2:
+                        try:
+                            task = next(tasks)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        pending.append((len(task), executor.submit(
+                            score_blocks, task, self.threshold, self.max_block_size, self.window)))
+
+                    if not pending:
+                        break
+
+                    block_count, future = pending.popleft()
+                    pairs, task_comparisons = future.result()
+                    blocks_done += block_count
+                    comparisons += task_comparisons
+                    # A pair sharing both a phone and a name block is scored twice
+                    for a, b, score in pairs:
+                        pair = (a, b) if a <= b else (b, a)
+                        best[pair] = max(score, best.get(pair, 0.0))
+
+                    if progress_callback:
+                        progress_callback(DedupeProgress(blocks_done, comparisons, len(best)))
+            finally:
+                # Tasks not yet started are dropped (shutdown's cancel_futures needs 3.9)
+                for _, future in pending:
+                    future.cancel()
+                if own_executor:
+                    executor.shutdown(wait=True)
+                workspace.close()
+
+            return DedupeResult(self._cluster(best), customers, blocks_done, comparisons)
+        except Exception as e:
+            raise Exception(f"Failed to find duplicate customers: {str(e)}")
+
+    @staticmethod
+    def _cluster(best: Dict[Tuple[Tuple[str, int], Tuple[str, int]], float]) -> List[DuplicateCluster]:
+        """Join linked pairs into clusters (union-find)"""
+        parent: Dict[Tuple[str, int], Tuple[str, int]] = {}
+
+        def find(member):
+            root = parent.setdefault(member, member)
+            while root != parent[root]:
+                root = parent[root]
+            while member != root:
+                parent[member], member = root, parent[member]
+            return root
+
+        for a, b in best:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        members: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+        edges: Dict[Tuple[str, int], List[Tuple[int, int, float]]] = {}
+        for member in parent:
+            members.setdefault(find(member), []).append(member)
+        for (a, b), score in best.items():
+            edges.setdefault(find(a), []).append((a[1], b[1], score))
+
+        clusters = [
+            DuplicateCluster([customer_id for _, customer_id in sorted(group)],
+                             min(score for _, _, score in edges[root]),
+                             sorted(edges[root], key=lambda edge: -edge[2]))
+            for root, group in members.items()
+        ]
+        clusters.sort(key=lambda cluster: (-cluster.score, cluster.customer_ids))
+        return clusters
+
+    def merge_cluster(self, cluster: DuplicateCluster, survivor_id: Optional[int] = None) -> int:
+        """Merge a cluster into ``survivor_id`` (its oldest customer by default)"""
+        survivor_id = survivor_id if survivor_id is not None else cluster.customer_ids[0]
+        return self.database_service.merge_customers(
+            survivor_id, [customer_id for customer_id in cluster.customer_ids if customer_id != survivor_id])
@@ -0,0 +1,129 @@
+"""Export service for incremental customer exports from the change log"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from ..database.storage_backend import StorageBackend
+
+
+CHANGE_EXPORT_HEADER = ['Sequence', 'Operation', 'ID', 'First Name', 'Last Name',
+                        'Email', 'Phone', 'Created Date', 'Changed At']
+
+
+class ChangeExportResult(NamedTuple):
+    """Outcome of an incremental export"""
+    path: Optional[str]
+    changes: int
+    watermark: str
+
+
+class ExportService:
+    """Writes the customer changes made since a consumer's previous export to CSV.
+
+    Every consumer (the app, view_database.py, ...) keeps its own
+    watermark in ``<state_dir>/<consumer>.json``, advanced only once its
+    CSV is completely written, so an export that fails part-way is simply
+    repeated by the next run.
+
+    Exports never shorten the change log on their own: a consumer that
+    has not exported yet, and a sync starting from an empty watermark,
+    rely on every change since migration 8 still being there. Pruning is
+    opt-in, either by calling ``prune()`` or with ``prune_after_export``,
+    and only drops changes that every recorded consumer has exported.
+    """
+
+    def __init__(self, backend: StorageBackend, state_dir: str, consumer: str = "app",
+                 batch_size: int = 1000, prune_after_export: bool = False):
+        if not consumer or not all(c.isalnum() or c in "-_" for c in consumer):
+            raise ValueError(f"Invalid export consumer name: {consumer!r}")
+        self.backend = backend
+        self.state_dir = Path(state_dir)
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.prune_after_export = prune_after_export
+
+    @property
+    def state_file(self) -> Path:
+        """Watermark file of this consumer"""
+        return self.state_dir / f"{self.consumer}.json"
+
+    def load_watermark(self) -> Optional[str]:
+        """Watermark saved by this consumer's last export (None before the first one)"""
+        return self._read_watermark(self.state_file)
+
+    def save_watermark(self, watermark: str):
+        """Record ``watermark`` as exported by this consumer"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"consumer": self.consumer,
+                       "watermark": watermark,
+                       "exported_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, f)
+        os.replace(temp_path, self.state_file)
+
+    def consumer_watermarks(self) -> Dict[str, str]:
+        """Saved watermark of every consumer that has exported"""
+        if not self.state_dir.exists():
+            return {}
+        watermarks = {}
+        for path in sorted(self.state_dir.glob("*.json")):
+            watermark = self._read_watermark(path)
+            if watermark is not None:
+                watermarks[path.stem] = watermark
+        return watermarks
+
+    @staticmethod
+    def _read_watermark(path: Path) -> Optional[str]:
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("watermark")
+
+    def export_changes(self, filename: str) -> ChangeExportResult:
+        """Write every change after this consumer's watermark to ``filename``.
+
+        Nothing is written when there are no new changes.
+        """
+        try:
+            watermark = self.load_watermark()
+            batch = self.backend.get_changes_since(watermark, self.batch_size)
+            if not batch.changes:
+                return ChangeExportResult(None, 0, batch.watermark)
+
+            partial_path = filename + ".partial"
+            exported = 0
+            with open(partial_path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CHANGE_EXPORT_HEADER)
+                while batch.changes:
+                    writer.writerows(batch.changes)
+                    exported += len(batch.changes)
+                    watermark = batch.watermark
+                    batch = self.backend.get_changes_since(watermark, self.batch_size)
+            os.replace(partial_path, filename)
+
+            self.save_watermark(watermark)
+        except Exception as e:
+            raise Exception(f"Failed to export changes: {str(e)}")
+
+        if self.prune_after_export:
+            # The export is already saved; a failed prune is retried next time
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"Error pruning exported changes: {e}")
+        return ChangeExportResult(filename, exported, watermark)
+
+    def prune(self) -> int:
+        """Drop the changes every recorded consumer has exported; returns how many"""
+        try:
+            watermark = self.backend.oldest_watermark(self.consumer_watermarks().values())
+            if watermark is None:
+                return 0
+            return self.backend.prune_changes(watermark)
+        except Exception as e:
+            raise Exception(f"Failed to prune exported changes: {str(e)}")
@@ -0,0 +1 @@
+# Data import services
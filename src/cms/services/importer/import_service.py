@@ -0,0 +1,320 @@
+"""Import service for loading customers from CSV files"""
+
+import csv
+import itertools
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..database.storage_backend import StorageBackend
+from ...utils.validators.validators import validate_email, validate_name, validate_phone
+
+
+# Header spellings accepted for each customer field (after lower-casing and
+# replacing spaces with underscores), covering our own export formats
+HEADER_ALIASES = {
+    "first_name": ("first_name", "firstname", "first"),
+    "last_name": ("last_name", "lastname", "last", "surname"),
+    "email": ("email", "email_address", "e-mail"),
+    "phone": ("phone", "phone_number", "telephone"),
+    "password_hash": ("password_hash",),
+    "created_at": ("created_at", "created_date", "created"),
+}
+
+REQUIRED_FIELDS = ("first_name", "last_name", "email", "phone")
+
+# Stored for imported customers without a hash; it never matches a SHA-256
+# digest, so those accounts must use the password reset flow to log in
+UNUSABLE_PASSWORD_HASH = "!"
+
+TIMESTAMP_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+
+class ImportProgress(NamedTuple):
+    """Running totals reported to the progress callback"""
+    rows_done: int
+    imported: int
+    rejected: int
+    conflicts: int
+
+
+class ImportResult(NamedTuple):
+    """Final outcome of an import run"""
+    rows_done: int
+    imported: int
+    rejected: int
+    conflicts: int
+    resumed_from: int
+    errors: List[Tuple[int, str]]
+    reject_path: Optional[str]
+
+
+def map_header(header: List[str]) -> Dict[str, int]:
+    """Map customer fields to column positions in a CSV header row"""
+    normalized = [name.strip().lower().replace(" ", "_") for name in header]
+    columns = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    return columns
+
+
+def _normalize_timestamp(value: str) -> Optional[str]:
+    """Parse a created_at cell into the database's timestamp format"""
+    value = value.strip()
+    if not value:
+        return None
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid created_at '{value}'")
+
+
+def validate_chunk(first_line: int, rows: List[List[str]],
+                   columns: Dict[str, int]) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+    """Validate one chunk of raw CSV rows.
+
+    Runs in a worker process, so it only touches its arguments. Returns the
+    bulk-insert dicts for valid rows and ``(line_number, reason)`` for the
+    rejected ones.
+    """
+    valid = []
+    errors = []
+    for offset, row in enumerate(rows):
+        line = first_line + offset
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            def cell(field):
+                index = columns.get(field)
+                return row[index].strip() if index is not None and index < len(row) else ""
+
+            first_name = cell("first_name")
+            last_name = cell("last_name")
+            email = cell("email").lower()
+            phone = cell("phone")
+
+            if not validate_name(first_name):
+                raise ValueError(f"Invalid first name '{first_name}'")
+            if not validate_name(last_name):
+                raise ValueError(f"Invalid last name '{last_name}'")
+            if not validate_email(email):
+                raise ValueError(f"Invalid email '{email}'")
+            if not validate_phone(phone):
+                raise ValueError(f"Invalid phone '{phone}'")
+
+            valid.append({
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "phone": phone,
+                "password_hash": cell("password_hash") or UNUSABLE_PASSWORD_HASH,
+                "created_at": _normalize_timestamp(cell("created_at")),
+            })
+        except ValueError as e:
+            errors.append((line, str(e)))
+    return valid, errors
+
+
+class CsvImportService:
+    """Streams a CSV file into the customers table.
+
+    The file is read in fixed-size chunks, chunks are validated in a process
+    pool and each validated chunk is upserted in one transaction together
+    with its checkpoint, so an interrupted import resumes after the last
+    committed chunk. Rejected rows are copied, with their line number and
+    reason, to a reject file next to the source (see ``reject_path_for``).
+    """
+
+    # Rejected rows kept in the result for reporting
+    MAX_REPORTED_ERRORS = 1000
+
+    def __init__(self, database_service: StorageBackend, chunk_size: int = 10000,
+                 workers: Optional[int] = None, on_conflict: str = "replace"):
+        if on_conflict not in StorageBackend.CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {on_conflict}")
+        self.database_service = database_service
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.on_conflict = on_conflict
+
+    @staticmethod
+    def fingerprint(path: str) -> str:
+        """Identify a source file version by size and modification time"""
+        stat = os.stat(path)
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+    @staticmethod
+    def reject_path_for(path: str) -> str:
+        """Reject file for a source file (customers.csv -> customers.rejected.csv)"""
+        stem, extension = os.path.splitext(path)
+        return f"{stem}.rejected{extension or '.csv'}"
+
+    def get_checkpoint(self, path: str) -> Optional[Tuple]:
+        """Return the saved (fingerprint, rows_done, imported, rejected, conflicts, completed)"""
+        with self.database_service.pool.reader() as conn:
+            return conn.execute('''
+                SELECT fingerprint, rows_done, imported, rejected, conflicts, completed
+                FROM import_checkpoints
+                WHERE source = ?
+            ''', (os.path.abspath(path),)).fetchone()
+
+    def clear_checkpoint(self, path: str):
+        """Forget saved progress so the next run starts from the top"""
+        with self.database_service.pool.writer() as conn:
+            conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (os.path.abspath(path),))
+
+    @staticmethod
+    def _read_header(path: str) -> List[str]:
+        """The source file's header row"""
+        with open(path, newline='', encoding='utf-8-sig') as csvfile:
+            return next(csv.reader(csvfile), [])
+
+    def _read_chunks(self, path: str, skip_rows: int) -> Iterator[Tuple[int, List[List[str]], Dict[str, int]]]:
+        """Yield (first_line, rows, columns) chunks, skipping already imported rows"""
+        with open(path, newline='', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile)
+            columns = map_header(next(reader))
+
+            # Rows already committed by an earlier run are parsed but not kept
+            for _ in itertools.islice(reader, skip_rows):
+                pass
+
+            # Data rows are numbered from 2, after the header
+            chunk = []
+            first_line = skip_rows + 2
+            for row in reader:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    yield first_line, chunk, columns
+                    first_line += len(chunk)
+                    chunk = []
+            if chunk:
+                yield first_line, chunk, columns
+
+    def import_csv(self, path: str, progress_callback: Optional[Callable[[ImportProgress], None]] = None,
+                   resume: bool = True, executor: Optional[Executor] = None) -> ImportResult:
+        """Import customers from a CSV file.
+
+        With ``resume`` set, a previous unfinished run over the same file
+        continues after its last committed chunk.
+        """
+        try:
+            source = os.path.abspath(path)
+            fingerprint = self.fingerprint(path)
+
+            rows_done = imported = rejected = conflicts = 0
+            checkpoint = self.get_checkpoint(path) if resume else None
+            if checkpoint and checkpoint[0] == fingerprint and not checkpoint[5]:
+                _, rows_done, imported, rejected, conflicts, _ = checkpoint
+            resumed_from = rows_done
+
+            errors: List[Tuple[int, str]] = []
+
+            # A resumed run appends to the rejects of the run it continues
+            reject_path = self.reject_path_for(path)
+            reject_file = None
+            reject_writer = None
+            if not resumed_from and os.path.exists(reject_path):
+                os.remove(reject_path)
+
+            own_executor = executor is None
+            if own_executor:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+
+            # Bounded window of in-flight chunks keeps memory flat while
+            # results are still committed in file order
+            pending = deque()
+            try:
+                chunks = self._read_chunks(path, rows_done)
+                exhausted = False
+                while pending or not exhausted:
+                    while not exhausted and len(pending) < self.workers * 2:
+                        try:
+                            first_line, rows, columns = next(chunks)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        pending.append((first_line, rows, executor.submit(validate_chunk, first_line, rows, columns)))
+
+                    if not pending:
+                        break
+
+                    first_line, rows, future = pending.popleft()
+                    row_count = len(rows)
+                    valid, chunk_errors = future.result()
+
+                    # Written before the commit: a crash in between repeats
+                    # the chunk's rejects on resume rather than losing them
+                    if chunk_errors:
+                        if reject_writer is None:
+                            append = os.path.exists(reject_path)
+                            reject_file = open(reject_path, 'a' if append else 'w',
+                                               newline='', encoding='utf-8')
+                            reject_writer = csv.writer(reject_file)
+                            if not append:
+                                reject_writer.writerow(['Line', 'Reason'] + self._read_header(path))
+                        reject_writer.writerows([line, reason] + rows[line - first_line]
+                                                for line, reason in chunk_errors)
+                        reject_file.flush()
+
+                    with self.database_service.pool.writer() as conn:
+                        result = self.database_service.create_customers_bulk(valid, self.on_conflict)
+                        rows_done += row_count
+                        rejected += len(chunk_errors)
+                        conflicts += len(result.conflicts)
+                        imported += sum(1 for customer_id in result.ids if customer_id is not None)
+                        self._save_checkpoint(conn, source, fingerprint, rows_done,
+                                              imported, rejected, conflicts, False)
+
+                    if len(errors) < self.MAX_REPORTED_ERRORS:
+                        errors.extend(chunk_errors[:self.MAX_REPORTED_ERRORS - len(errors)])
+
+                    if progress_callback:
+                        progress_callback(ImportProgress(rows_done, imported, rejected, conflicts))
+            finally:
+                # Chunks not yet started are dropped (shutdown's cancel_futures needs 3.9)
+                for _, _, future in pending:
+                    future.cancel()
+                if own_executor:
+                    executor.shutdown(wait=True)
+                if reject_file is not None:
+                    reject_file.close()
+
+            with self.database_service.pool.writer() as conn:
+                self._save_checkpoint(conn, source, fingerprint, rows_done,
+                                      imported, rejected, conflicts, True)
+
+            return ImportResult(rows_done, imported, rejected, conflicts, resumed_from, errors,
+                                reject_path if os.path.exists(reject_path) else None)
+        except Exception as e:
+            raise Exception(f"Failed to import customers: {str(e)}")
+
+    @staticmethod
+    def _save_checkpoint(conn: sqlite3.Connection, source: str, fingerprint: str, rows_done: int,
+                         imported: int, rejected: int, conflicts: int, completed: bool):
+        """Record progress inside the chunk's own transaction"""
+        conn.execute('''
+            INSERT INTO import_checkpoints
+                (source, fingerprint, rows_done, imported, rejected, conflicts, completed, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (source) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                rows_done = excluded.rows_done,
+                imported = excluded.imported,
+                rejected = excluded.rejected,
+                conflicts = excluded.conflicts,
+                completed = excluded.completed,
+                updated_at = excluded.updated_at
+        ''', (source, fingerprint, rows_done, imported, rejected, conflicts, int(completed)))
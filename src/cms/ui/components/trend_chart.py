@@ -0,0 +1,121 @@
+"""Registration trend chart drawn on a Tk canvas"""
+
+import tkinter as tk
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ...utils.helpers.downsampling import lttb
+
+
+# Bucket text format and width for each trend granularity
+BUCKETS = {
+    "day": ("%Y-%m-%d", timedelta(days=1)),
+    "hour": ("%Y-%m-%d %H:00:00", timedelta(hours=1)),
+}
+
+
+def fill_trend_gaps(trend: Sequence[Tuple[str, int]], granularity: str = "day",
+                    days: Optional[int] = None) -> List[Tuple[datetime, int]]:
+    """Dense (bucket start, registrations) series with empty buckets as zero.
+
+    The series runs from ``days`` ago (or the first bucket when None) up
+    to the current bucket. Buckets are UTC, like the database timestamps.
+    """
+    bucket_format, step = BUCKETS[granularity]
+    counts = {}
+    for bucket, registrations in trend:
+        try:
+            counts[datetime.fromisoformat(bucket)] = registrations
+        except ValueError:
+            continue
+
+    now = datetime.strptime(datetime.now(timezone.utc).strftime(bucket_format), bucket_format)
+    if days is not None:
+        start = datetime.strptime((now - timedelta(days=days)).strftime(bucket_format), bucket_format)
+    elif counts:
+        start = min(counts)
+    else:
+        return []
+    end = max([now] + list(counts))
+
+    series = []
+    current = start
+    while current <= end:
+        series.append((current, counts.get(current, 0)))
+        current += step
+    return series
+
+
+class TrendChart:
+    """Line chart of a bucketed time series on a Tk canvas.
+
+    Series with more buckets than the plot is wide are reduced with LTTB
+    to one point per pixel before drawing, so a redraw costs the same for
+    a month as for several years of history.
+    """
+
+    # Space around the plot for the axis labels: left, top, right, bottom
+    PADDING = (48, 12, 16, 28)
+
+    def __init__(self, parent, colors: Dict[str, str], height: int = 200):
+        self.colors = colors
+        self.canvas = tk.Canvas(parent, height=height, background=colors['card'],
+                                highlightthickness=1, highlightbackground=colors['border'])
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.series: List[Tuple[datetime, int]] = []
+        self.label_format = "%b %d"
+
+    def grid(self, **kwargs):
+        """Place the chart with the grid geometry manager"""
+        self.canvas.grid(**kwargs)
+
+    def set_series(self, series: List[Tuple[datetime, int]], label_format: str = "%b %d"):
+        """Replace the plotted series and redraw"""
+        self.series = series
+        self.label_format = label_format
+        self.redraw()
+
+    def redraw(self):
+        """Draw the current series at the canvas's current size"""
+        canvas = self.canvas
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        left, top, right, bottom = self.PADDING
+        plot_width, plot_height = width - left - right, height - top - bottom
+        if plot_width < 10 or plot_height < 10:
+            return  # not laid out yet
+
+        font = ("Segoe UI", 9)
+        text_color = self.colors['text_secondary']
+        if not any(count for _, count in self.series):
+            canvas.create_text(width / 2, height / 2, text="No registrations in this range",
+                               fill=text_color, font=font)
+            return
+
+        y_max = max(count for _, count in self.series)
+        last = max(len(self.series) - 1, 1)
+        points = lttb([(index, count) for index, (_, count) in enumerate(self.series)], plot_width)
+
+        # Horizontal grid lines with their values
+        for fraction in (0.0, 0.5, 1.0):
+            y = top + plot_height * (1 - fraction)
+            canvas.create_line(left, y, left + plot_width, y, fill=self.colors['border'])
+            canvas.create_text(left - 6, y, text=f"{y_max * fraction:,.0f}", anchor="e",
+                               fill=text_color, font=font)
+
+        coords = []
+        for index, count in points:
+            coords.append(left + plot_width * index / last)
+            coords.append(top + plot_height * (1 - count / y_max))
+        if len(points) > 1:
+            canvas.create_line(*coords, fill=self.colors['primary'], width=2)
+        else:
+            x, y = coords
+            canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=self.colors['primary'], outline="")
+
+        first_bucket, last_bucket = self.series[0][0], self.series[-1][0]
+        canvas.create_text(left, height - bottom + 6, text=first_bucket.strftime(self.label_format),
+                           anchor="nw", fill=text_color, font=font)
+        canvas.create_text(left + plot_width, height - bottom + 6,
+                           text=last_bucket.strftime(self.label_format),
+                           anchor="ne", fill=text_color, font=font)
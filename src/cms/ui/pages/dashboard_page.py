@@ -5,10 +5,20 @@ from tkinter import ttk
 import hashlib
 from datetime import datetime
 
+from ..components.trend_chart import TrendChart, fill_trend_gaps
+
 
 class DashboardPage:
     """Dashboard page for the application"""
     
+    # Trend chart ranges: label -> (days, granularity, axis label format)
+    TREND_RANGES = {
+        "Last 48 hours": (2, "hour", "%b %d %H:00"),
+        "Last 30 days": (30, "day", "%b %d"),
+        "Last 12 months": (365, "day", "%b %d, %Y"),
+        "All time": (None, "day", "%b %d, %Y"),
+    }
+    
     def __init__(self, app, user):
         self.app = app
         self.user = user
@@ -97,9 +107,29 @@ class DashboardPage:
         self._create_stat_card(stats_frame, "Today", f"{today_registrations}", "🆕", 2)
         self._create_stat_card(stats_frame, "System Status", "Online", "✅", 3)
         
+        # Registration trend chart, fed by the rollup tables
+        trend_frame = ttk.Frame(content_frame, style="Professional.TFrame")
+        trend_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 20))
+        trend_frame.grid_columnconfigure(0, weight=1)
+        
+        trend_title = ttk.Label(trend_frame, text="Registration Trend", 
+                              style="Heading.TLabel")
+        trend_title.grid(row=0, column=0, pady=(0, 10), sticky="w")
+        
+        self.trend_range_var = tk.StringVar(value="Last 30 days")
+        trend_combo = ttk.Combobox(trend_frame, textvariable=self.trend_range_var, 
+                                  values=list(self.TREND_RANGES), 
+                                  state="readonly", width=16)
+        trend_combo.grid(row=0, column=1, pady=(0, 10), sticky="e")
+        trend_combo.bind('<<ComboboxSelected>>', lambda event: self.update_trend_chart())
+        
+        self.trend_chart = TrendChart(trend_frame, self.app.style_manager.colors, height=180)
+        self.trend_chart.grid(row=1, column=0, columnspan=2, sticky="ew")
+        self.update_trend_chart()
+        
         # Professional recent activity section
         activity_frame = ttk.Frame(content_frame, style="Professional.TFrame")
-        activity_frame.grid(row=1, column=0, sticky="ew", pady=(0, 20))
+        activity_frame.grid(row=2, column=0, sticky="ew", pady=(0, 20))
         activity_frame.grid_columnconfigure(0, weight=1)
         
         activity_title = ttk.Label(activity_frame, text="Recent Activity", 
@@ -128,9 +158,34 @@ class DashboardPage:
                                         style="Caption.TLabel", foreground="gray")
             no_activity_label.grid(row=1, column=0, pady=2, sticky="w")
         
+        # Most common email domains, answered from the email_domain index
+        domains_frame = ttk.Frame(content_frame, style="Professional.TFrame")
+        domains_frame.grid(row=3, column=0, sticky="ew", pady=(0, 20))
+        domains_frame.grid_columnconfigure(0, weight=1)
+        
+        domains_title = ttk.Label(domains_frame, text="Top Email Domains", 
+                                style="Heading.TLabel")
+        domains_title.grid(row=0, column=0, pady=(0, 15), sticky="w")
+        
+        try:
+            top_domains = self.app.reporting_service.get_email_domain_counts(5)
+        except Exception as e:
+            print(f"Error loading email domains: {e}")
+            top_domains = []
+        
+        if top_domains:
+            for i, (domain, count) in enumerate(top_domains):
+                domain_label = ttk.Label(domains_frame, text=f"📧 {domain} - {count:,} users", 
+                                       style="Body.TLabel")
+                domain_label.grid(row=i+1, column=0, pady=2, sticky="w")
+        else:
+            no_domains_label = ttk.Label(domains_frame, text="No customers yet", 
+                                       style="Caption.TLabel", foreground="gray")
+            no_domains_label.grid(row=1, column=0, pady=2, sticky="w")
+        
         # Professional quick actions section
         actions_frame = ttk.Frame(content_frame, style="Professional.TFrame")
-        actions_frame.grid(row=1, column=1, sticky="ew", padx=(20, 0))
+        actions_frame.grid(row=2, column=1, sticky="ew", padx=(20, 0))
         actions_frame.grid_columnconfigure(0, weight=1)
         
         actions_title = ttk.Label(actions_frame, text="Quick Actions", 
@@ -166,6 +221,16 @@ class DashboardPage:
                                style="Caption.TLabel")
         footer_text.grid(row=1, column=0, pady=(5, 0))
     
+    def update_trend_chart(self):
+        """Reload the trend chart for the selected range"""
+        days, granularity, label_format = self.TREND_RANGES[self.trend_range_var.get()]
+        try:
+            trend = self.app.database_service.get_registration_trend(days, granularity)
+        except Exception as e:
+            print(f"Error loading registration trend: {e}")
+            trend = []
+        self.trend_chart.set_series(fill_trend_gaps(trend, granularity, days), label_format)
+    
     def _create_stat_card(self, parent, title, value, icon, column):
         """Create a professional stat card"""
         card_frame = ttk.Frame(parent, style="Professional.TFrame")
@@ -7,9 +7,21 @@ from tkinter import ttk
 class UsersPage:
     """Users page for the application"""
     
+    # Rows fetched per keyset page while scrolling the users table
+    PAGE_SIZE = 100
+    
+    # Maximum number of ranked matches shown for a search
+    SEARCH_LIMIT = 200
+    
+    # Pause after the last keystroke before searching
+    SEARCH_DELAY_MS = 250
+    
     def __init__(self, app):
         self.app = app
         self.main_frame = app.main_frame
+        self._page_cursor = None
+        self._has_more_pages = True
+        self._filter_job = None
     
     def show(self):
         """Show the users page"""
@@ -53,6 +65,7 @@ class UsersPage:
         nav_frame.grid_columnconfigure(0, weight=1)
         nav_frame.grid_columnconfigure(1, weight=1)
         nav_frame.grid_columnconfigure(2, weight=1)
+        nav_frame.grid_columnconfigure(3, weight=1)
         
         # Professional navigation buttons
         dashboard_btn = ttk.Button(nav_frame, text="🏠 Dashboard", 
@@ -70,6 +83,11 @@ class UsersPage:
                                style="Secondary.TButton", width=18)
         export_btn.grid(row=0, column=2, padx=10, pady=10)
         
+        export_changes_btn = ttk.Button(nav_frame, text="🔁 Export Changes", 
+                                       command=self.export_changes, 
+                                       style="Secondary.TButton", width=18)
+        export_changes_btn.grid(row=0, column=3, padx=10, pady=10)
+        
         # Professional search and filter section
         search_frame = ttk.Frame(card_frame, style="Professional.TFrame")
         search_frame.grid(row=2, column=0, sticky="ew", pady=(0, 20))
@@ -78,14 +96,14 @@ class UsersPage:
         search_frame.grid_columnconfigure(2, weight=1)
         
         # Professional search field
-        search_label = ttk.Label(search_frame, text="Search Users:", 
+        search_label = ttk.Label(search_frame, text="Search Users (or @domain):", 
                                 style="Body.TLabel")
         search_label.grid(row=0, column=0, sticky="w", pady=(0, 8))
         
         self.search_entry = ttk.Entry(search_frame, style="Professional.TEntry", 
                                      font=("Segoe UI", 11), width=30)
         self.search_entry.grid(row=1, column=0, sticky="ew", pady=(0, 5))
-        self.search_entry.bind('<KeyRelease>', self.filter_users)
+        self.search_entry.bind('<KeyRelease>', self.schedule_filter)
         
         # Professional filter dropdown
         filter_label = ttk.Label(search_frame, text="Filter by Status:", 
@@ -141,12 +159,12 @@ class UsersPage:
         self.tree.column('Actions', width=120, anchor='center')
         
         # Professional scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         
         # Professional grid layout for tree and scrollbar
         self.tree.grid(row=1, column=0, sticky="nsew", pady=(0, 10))
-        scrollbar.grid(row=1, column=1, sticky="ns")
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
         
         # Professional real data from database
         self.load_users_from_database()
@@ -168,118 +186,108 @@ class UsersPage:
         footer_text.grid(row=1, column=0, pady=(5, 0))
     
     def load_users_from_database(self):
-        """Load real users data from database"""
+        """Load the first page of users from the database"""
         try:
-            # Get all users from database
-            users = self.app.database_service.get_all_customers()
-            
             # Clear existing items
             for item in self.tree.get_children():
                 self.tree.delete(item)
             
-            # Add users to treeview
-            for user in users:
-                user_id, first_name, last_name, email, phone, created_at = user
-                
-                # Format the date
-                try:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
-                    formatted_date = date_obj.strftime('%Y-%m-%d')
-                except:
-                    formatted_date = created_at
-                
-                # Determine status based on creation date
-                try:
-                    from datetime import datetime, timedelta
-                    created_date = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
-                    days_old = (datetime.now() - created_date).days
-                    
-                    if days_old == 0:
-                        status = "New"
-                    elif days_old <= 7:
-                        status = "Active"
-                    else:
-                        status = "Active"
-                except:
-                    status = "Active"
-                
-                # Insert into treeview
-                self.tree.insert('', 'end', values=(
-                    user_id,
-                    f"{first_name} {last_name}",
-                    email,
-                    phone,
-                    status,
-                    formatted_date,
-                    "Edit | Delete"
-                ))
+            # Start paging from the newest customer again
+            self._page_cursor = None
+            self._has_more_pages = True
+            self.load_next_page()
                 
         except Exception as e:
             print(f"Error loading users: {e}")
             # Fallback to empty list
             pass
     
+    def load_next_page(self):
+        """Append the next page of users to the treeview"""
+        if not self._has_more_pages:
+            return
+        
+        users = self.app.customer_repository.get_page_with_status(
+            self._status_filter(), self._page_cursor, self.PAGE_SIZE)
+        self._page_cursor = self.app.customer_repository.page_cursor(users) or self._page_cursor
+        self._has_more_pages = len(users) == self.PAGE_SIZE
+        
+        for user in users:
+            self._insert_user_row(user)
+    
+    def _status_filter(self):
+        """Selected status filter, or None for all customers"""
+        status_filter = self.filter_var.get()
+        return None if status_filter == "All" else status_filter
+    
+    def on_tree_scroll(self, first, last):
+        """Update the scrollbar and fetch more rows near the bottom"""
+        self.scrollbar.set(first, last)
+        
+        # Only page while the list (optionally status-filtered) is shown
+        if float(last) >= 0.95 and not self.search_entry.get().strip():
+            try:
+                self.load_next_page()
+            except Exception as e:
+                print(f"Error loading users: {e}")
+    
+    def _insert_user_row(self, user):
+        """Add a customer row to the treeview"""
+        self.tree.insert('', 'end', values=self._format_user_row(user))
+    
+    def _format_user_row(self, user):
+        """Build the treeview values for a customer"""
+        return (
+            user.id,
+            user.full_name,
+            user.email,
+            user.phone,
+            user.status or "Active",
+            user.created_date,
+            "Edit | Delete"
+        )
+    
+    def schedule_filter(self, event=None):
+        """Run the search shortly after the user stops typing"""
+        if self._filter_job is not None:
+            self.main_frame.after_cancel(self._filter_job)
+        self._filter_job = self.main_frame.after(self.SEARCH_DELAY_MS, self.filter_users)
+    
     def filter_users(self, event=None):
         """Filter users based on search and filter criteria"""
         try:
-            search_term = self.search_entry.get().strip().lower()
-            status_filter = self.filter_var.get()
+            self._filter_job = None
+            search_term = self.search_entry.get().strip()
+            status_filter = self._status_filter()
+            
+            # Without a search term the status filter runs in SQL, paged
+            if not search_term:
+                self.load_users_from_database()
+                return
             
             # Clear existing items
             for item in self.tree.get_children():
                 self.tree.delete(item)
             
-            # Get all users
-            users = self.app.database_service.get_all_customers()
+            # "@domain" lists the customers at that email domain, from its index
+            if search_term.startswith("@") and len(search_term) > 1:
+                users = self.app.customer_repository.get_by_domain(search_term, limit=self.SEARCH_LIMIT)
             
-            # Filter users
-            for user in users:
-                user_id, first_name, last_name, email, phone, created_at = user
-                
-                # Format the date
-                try:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
-                    formatted_date = date_obj.strftime('%Y-%m-%d')
-                except:
-                    formatted_date = created_at
-                
-                # Determine status based on creation date
-                try:
-                    from datetime import datetime, timedelta
-                    created_date = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
-                    days_old = (datetime.now() - created_date).days
-                    
-                    if days_old == 0:
-                        status = "New"
-                    elif days_old <= 7:
-                        status = "Active"
-                    else:
-                        status = "Active"
-                except:
-                    status = "Active"
-                
-                # Apply search filter
-                if search_term:
-                    search_text = f"{first_name} {last_name} {email}".lower()
-                    if search_term not in search_text:
-                        continue
+            # Ranked full-text lookup instead of scanning every customer
+            else:
+                users = self.app.customer_repository.search(search_term, limit=self.SEARCH_LIMIT)
                 
-                # Apply status filter
-                if status_filter != "All" and status != status_filter:
+                # Fall back to typo-tolerant matching for misspelled names
+                if not users:
+                    users = self.app.customer_repository.fuzzy_search(search_term, limit=self.SEARCH_LIMIT)
+            
+            # Statuses of the matches come from the database in one query
+            self.app.customer_repository.load_statuses(users)
+            
+            for user in users:
+                if status_filter is not None and user.status != status_filter:
                     continue
-                
-                # Insert into treeview
-                self.tree.insert('', 'end', values=(
-                    user_id,
-                    f"{first_name} {last_name}",
-                    email,
-                    phone,
-                    status,
-                    formatted_date,
-                    "Edit | Delete"
-                ))
+                self._insert_user_row(user)
                 
         except Exception as e:
             print(f"Error filtering users: {e}")
@@ -327,7 +335,7 @@ class UsersPage:
         """Edit user information"""
         try:
             # Get user data from database
-            user = self.app.database_service.get_customer_by_id(user_id)
+            user = self.app.customer_repository.get_by_id(user_id)
             if not user:
                 self.app.message_box.show_error("Error", "User not found")
                 return
@@ -371,31 +379,31 @@ class UsersPage:
         ttk.Label(form_frame, text="User ID:", style="Body.TLabel").pack(anchor="w", pady=(0, 5))
         id_entry = ttk.Entry(form_frame, style="Professional.TEntry", state="readonly")
         id_entry.pack(fill="x", pady=(0, 15))
-        id_entry.insert(0, str(user[0]))
+        id_entry.insert(0, str(user.id))
         
         # First Name
         ttk.Label(form_frame, text="First Name:", style="Body.TLabel").pack(anchor="w", pady=(0, 5))
         first_name_entry = ttk.Entry(form_frame, style="Professional.TEntry")
         first_name_entry.pack(fill="x", pady=(0, 15))
-        first_name_entry.insert(0, user[1])
+        first_name_entry.insert(0, user.first_name)
         
         # Last Name
         ttk.Label(form_frame, text="Last Name:", style="Body.TLabel").pack(anchor="w", pady=(0, 5))
         last_name_entry = ttk.Entry(form_frame, style="Professional.TEntry")
         last_name_entry.pack(fill="x", pady=(0, 15))
-        last_name_entry.insert(0, user[2])
+        last_name_entry.insert(0, user.last_name)
         
         # Email
         ttk.Label(form_frame, text="Email:", style="Body.TLabel").pack(anchor="w", pady=(0, 5))
         email_entry = ttk.Entry(form_frame, style="Professional.TEntry")
         email_entry.pack(fill="x", pady=(0, 15))
-        email_entry.insert(0, user[3])
+        email_entry.insert(0, user.email)
         
         # Phone
         ttk.Label(form_frame, text="Phone:", style="Body.TLabel").pack(anchor="w", pady=(0, 5))
         phone_entry = ttk.Entry(form_frame, style="Professional.TEntry")
         phone_entry.pack(fill="x", pady=(0, 20))
-        phone_entry.insert(0, user[4])
+        phone_entry.insert(0, user.phone)
         
         # Buttons frame
         buttons_frame = ttk.Frame(main_frame, style="Professional.TFrame")
@@ -414,8 +422,8 @@ class UsersPage:
                     return
                 
                 # Update user in database
-                success = self.app.database_service.update_customer_profile(
-                    user[3],  # original email
+                success = self.app.customer_repository.update_profile(
+                    user,
                     first_name,
                     last_name,
                     phone
@@ -436,12 +444,13 @@ class UsersPage:
                 # Confirm deletion
                 result = self.app.message_box.show_confirm(
                     "Confirm Delete",
-                    f"Are you sure you want to delete user {user[1]} {user[2]}?\n\nThis action cannot be undone."
+                    f"Are you sure you want to delete user {user.full_name}?\n\n"
+                    f"The record is permanently removed after {self.app.settings.PURGE_RETENTION_DAYS:g} days."
                 )
                 
                 if result:
                     # Delete user from database
-                    success = self.app.database_service.delete_customer(user[0])
+                    success = self.app.customer_repository.delete(user)
                     
                     if success:
                         self.app.message_box.show_info("Success", "User deleted successfully!")
@@ -481,8 +490,8 @@ class UsersPage:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"users_export_{timestamp}.csv"
             
-            # Get all users
-            users = self.app.database_service.get_all_customers()
+            # Stream users from the reporting copy instead of loading the whole table
+            users = self.app.reporting_repository.iter_all()
             
             # Write to CSV
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -493,16 +502,26 @@ class UsersPage:
                 
                 # Write user data
                 for user in users:
-                    writer.writerow([
-                        user[0],  # ID
-                        user[1],  # First Name
-                        user[2],  # Last Name
-                        user[3],  # Email
-                        user[4],  # Phone
-                        user[5]   # Created Date
-                    ])
+                    writer.writerow(user.as_row())
             
             self.app.message_box.show_info("Export Success", f"Users exported to {filename}")
             
         except Exception as e:
             self.app.message_box.show_error("Export Error", f"Failed to export users: {str(e)}")
+    
+    def export_changes(self):
+        """Export only the users changed since the last changes export"""
+        try:
+            from datetime import datetime
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            result = self.app.export_service.export_changes(f"users_changes_{timestamp}.csv")
+            
+            if result.changes:
+                self.app.message_box.show_info("Export Success", 
+                                               f"{result.changes} changes exported to {result.path}")
+            else:
+                self.app.message_box.show_info("Export Changes", "No changes since the last export.")
+            
+        except Exception as e:
+            self.app.message_box.show_error("Export Error", str(e))
@@ -0,0 +1,53 @@
+"""Downsampling of time series for plotting"""
+
+from typing import List, Sequence, Tuple
+
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Largest-Triangle-Three-Buckets downsampling to ``threshold`` points.
+
+    ``points`` must be sorted by x. The first and last points are kept;
+    every bucket in between contributes the point forming the largest
+    triangle with the previously chosen point and the next bucket's
+    average, which preserves peaks and dips that averaging would flatten.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (count - 2) / (threshold - 2)
+    chosen = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            avg_x, avg_y = points[-1]
+        else:
+            span = next_end - next_start
+            avg_x = sum(x for x, _ in points[next_start:next_end]) / span
+            avg_y = sum(y for _, y in points[next_start:next_end]) / span
+
+        chosen_x, chosen_y = points[chosen]
+        best_area = -1.0
+        best = start
+        for index in range(start, end):
+            x, y = points[index]
+            area = abs((chosen_x - avg_x) * (y - chosen_y) - (chosen_x - x) * (avg_y - chosen_y))
+            if area > best_area:
+                best_area = area
+                best = index
+
+        sampled.append(points[best])
+        chosen = best
+
+    sampled.append(points[-1])
+    return sampled
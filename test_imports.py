@@ -18,13 +18,34 @@ def test_imports():
         'cms.ui.pages.register_page',
         'cms.ui.pages.dashboard_page',
         'cms.ui.pages.users_page',
+        'cms.models.entities.customer',
+        'cms.models.repositories.customer_repository',
         'cms.services.database.database_service',
+        'cms.services.database.connection_pool',
+        'cms.services.database.migrations',
+        'cms.services.database.fuzzy_search',
+        'cms.services.database.entity_cache',
+        'cms.services.database.query_cache',
+        'cms.services.database.instrumentation',
+        'cms.services.database.async_database_service',
+        'cms.services.database.storage_backend',
+        'cms.services.database.sharded_backend',
+        'cms.services.database.backup',
+        'cms.services.database.replica',
+        'cms.services.database.purge',
+        'cms.services.database.autotune',
         'cms.services.auth.auth_service',
+        'cms.services.importer.import_service',
+        'cms.services.backup.backup_service',
+        'cms.services.exporter.export_service',
+        'cms.services.dedupe.dedupe_service',
         'cms.services.email.email_service',
         'cms.ui.styles',
         'cms.ui.dialogs.message_box',
+        'cms.ui.components.trend_chart',
         'cms.utils.validators.validators',
         'cms.utils.helpers.icon_manager',
+        'cms.utils.helpers.downsampling',
         'cms.config.settings',
     ]
     
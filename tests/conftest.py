@@ -0,0 +1,44 @@
+"""Shared pytest configuration for the Enterprise CMS test suite"""
+
+import os
+import sys
+
+import pytest
+
+# Make the cms package importable without installing it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from cms.services.database.database_service import DatabaseService
+from cms.services.database.sharded_backend import ShardedDatabaseService
+
+
+@pytest.fixture
+def customer_row():
+    """Factory for bulk-insert rows of test customers, unique by index"""
+    def make(index, **overrides):
+        row = {
+            "first_name": "Test",
+            "last_name": f"Customer{index}",
+            "email": f"customer{index}@example.com",
+            "phone": f"+1 555 {index:07d}",
+            "password_hash": "0" * 64,
+        }
+        row.update(overrides)
+        return row
+    return make
+
+
+@pytest.fixture
+def service(tmp_path):
+    """DatabaseService over a fresh database file"""
+    db = DatabaseService(str(tmp_path / "customers.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def sharded_service(tmp_path):
+    """Three-shard backend over fresh database files"""
+    db = ShardedDatabaseService(str(tmp_path / "customers.db"), shards=3)
+    yield db
+    db.close()
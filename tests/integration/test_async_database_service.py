@@ -0,0 +1,136 @@
+"""asyncio facade: read and write executors, errors, streaming and close"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cms.services.database.async_database_service import AsyncDatabaseService
+from cms.services.database.database_service import DatabaseService
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "async.db")
+
+
+def test_reads_run_concurrently(db_path):
+    # Both reads have to be inside the barrier at once to get past it
+    barrier = threading.Barrier(2, timeout=5)
+
+    async def scenario():
+        async with AsyncDatabaseService(db_path, read_pool_size=2) as db:
+            service_count = db.service.get_customer_count
+
+            def blocking_count():
+                barrier.wait()
+                return service_count()
+
+            db.service.get_customer_count = blocking_count
+            return await asyncio.gather(db.get_customer_count(), db.get_customer_count())
+
+    assert run(scenario()) == [0, 0]
+
+
+def test_writes_are_serialized_in_order(db_path):
+    active = []
+    overlaps = []
+    order = []
+    threads = set()
+
+    async def scenario():
+        async with AsyncDatabaseService(db_path) as db:
+            create = db.service.create_customer
+
+            def tracked_create(first_name, *args):
+                active.append(first_name)
+                overlaps.append(len(active))
+                threads.add(threading.current_thread().name)
+                time.sleep(0.01)
+                order.append(first_name)
+                active.remove(first_name)
+                return create(first_name, *args)
+
+            db.service.create_customer = tracked_create
+            await asyncio.gather(*(
+                db.create_customer(f"Writer{i}", "Customer", f"writer{i}@example.com", "+1 555 0000000", "h")
+                for i in range(5)))
+            return await db.get_customer_count()
+
+    assert run(scenario()) == 5
+    assert max(overlaps) == 1
+    assert order == [f"Writer{i}" for i in range(5)]
+    assert len(threads) == 1 and threads.pop().startswith("cms-db-write")
+
+
+def test_exceptions_propagate_through_awaitables(db_path):
+    async def scenario():
+        async with AsyncDatabaseService(db_path) as db:
+            await db.create_customer("First", "Customer", "same@example.com", "+1 555 0000001", "h")
+            with pytest.raises(Exception, match="already registered"):
+                await db.create_customer("Second", "Customer", "same@example.com", "+1 555 0000002", "h")
+            with pytest.raises(ValueError, match="Unknown conflict policy"):
+                await db.create_customers_bulk([], on_conflict="merge")
+            # The executors keep working after a failure
+            return await db.get_customer_count()
+
+    assert run(scenario()) == 1
+
+
+def test_async_iteration(db_path, customer_row):
+    async def scenario():
+        async with AsyncDatabaseService(db_path, read_pool_size=1, busy_timeout=500) as db:
+            await db.create_customers_bulk([customer_row(i, first_name="Match" if i < 3 else "Other")
+                                            for i in range(5)])
+            streamed = [row async for row in db.iter_customers(batch_size=2)]
+            matches = [row async for row in db.iter_search("match", batch_size=2)]
+            # Exhausted streams hand the single read connection back
+            return streamed, matches, await db.get_all_customers(), await db.get_customer_count()
+
+    streamed, matches, everything, count = run(scenario())
+    assert streamed == everything
+    assert sorted(row[3] for row in matches) == [f"customer{i}@example.com" for i in range(3)]
+    assert count == 5
+
+
+@pytest.mark.parametrize("open_stream", [
+    lambda db: db.iter_customers(batch_size=2),
+    lambda db: db.iter_search("test", batch_size=2),
+    lambda db: db.iter_search_scored("test", batch_size=2),
+], ids=["iter_customers", "iter_search", "iter_search_scored"])
+def test_closing_stream_early_releases_connection(db_path, customer_row, open_stream):
+    async def scenario():
+        async with AsyncDatabaseService(db_path, read_pool_size=1, busy_timeout=500) as db:
+            await db.create_customers_bulk([customer_row(i) for i in range(5)])
+            stream = open_stream(db)
+            await stream.__anext__()
+            await stream.aclose()
+            # The single read connection is back in the pool straight away
+            return len(await db.get_all_customers())
+
+    assert run(scenario()) == 5
+
+
+def test_close_finishes_queued_writes(db_path):
+    async def scenario():
+        db = await AsyncDatabaseService.create(db_path)
+        write = asyncio.ensure_future(
+            db.create_customer("Queued", "Customer", "queued@example.com", "+1 555 0000000", "h"))
+        await asyncio.sleep(0)
+        await db.close()
+        await db.close()
+        with pytest.raises(RuntimeError):
+            await db.get_customer_count()
+        return await write
+
+    assert run(scenario())
+    service = DatabaseService(db_path)
+    try:
+        assert service.get_customer_by_email("queued@example.com") is not None
+    finally:
+        service.close()
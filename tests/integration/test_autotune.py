@@ -0,0 +1,83 @@
+"""Storage profile recommendations of the auto-tuner"""
+
+import pytest
+
+from cms.config.settings import AppSettings
+from cms.services.database import autotune
+from cms.services.database.autotune import ProfileBenchmark, StorageTuner
+
+
+GIB = 1024 ** 3
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    return StorageTuner(str(tmp_path / "customers.db"), AppSettings().STORAGE_PROFILES,
+                        rounds=2, sample_rows=200)
+
+
+@pytest.fixture
+def fake_benchmarks(monkeypatch):
+    """Replace real benchmarks with fixed throughput per profile; records the profiles run"""
+    ops_per_second = {"desktop-safe": 1000, "throughput": 1000, "low-memory": 800, "network-share": 300}
+    ran = []
+
+    def benchmark(self, name):
+        ran.append(name)
+        return ProfileBenchmark(name, ops_per_second[name], 1.0, 0.1, 1.0)
+
+    monkeypatch.setattr(StorageTuner, "benchmark", benchmark)
+    monkeypatch.setattr(autotune, "is_network_path", lambda path: False)
+    monkeypatch.setattr(autotune, "physical_memory", lambda: 16 * GIB)
+    return ops_per_second, ran
+
+
+def test_network_share_is_recommended_without_trying_wal(tuner, fake_benchmarks, monkeypatch):
+    _, ran = fake_benchmarks
+    monkeypatch.setattr(autotune, "is_network_path", lambda path: True)
+
+    result = tuner.tune()
+
+    assert result.recommended == "network-share"
+    assert ran == ["network-share"]
+
+
+def test_low_memory_is_checked_before_benchmarking(tuner, fake_benchmarks, monkeypatch):
+    _, ran = fake_benchmarks
+    monkeypatch.setattr(autotune, "physical_memory", lambda: GIB)
+
+    result = tuner.tune()
+
+    assert result.recommended == "low-memory"
+    assert "1.0 GB" in result.reason
+    assert ran == ["low-memory"]
+
+
+@pytest.mark.parametrize("throughput_ops, recommended", [
+    (1000, "desktop-safe"), (1200, "desktop-safe"), (1250, "throughput"), (2000, "throughput"),
+])
+def test_throughput_needs_a_clear_gain(tuner, fake_benchmarks, throughput_ops, recommended):
+    ops_per_second, ran = fake_benchmarks
+    ops_per_second["throughput"] = throughput_ops
+
+    result = tuner.tune()
+
+    assert result.recommended == recommended
+    assert ran == ["desktop-safe", "throughput", "low-memory"]
+    assert [benchmark.profile for benchmark in result.benchmarks] == ran
+
+
+def test_unknown_memory_does_not_force_low_memory(tuner, fake_benchmarks, monkeypatch):
+    monkeypatch.setattr(autotune, "physical_memory", lambda: None)
+
+    assert tuner.tune().recommended == "desktop-safe"
+
+
+def test_benchmark_runs_query_mix_on_sample_copy(tuner, tmp_path):
+    result = tuner.benchmark("low-memory")
+
+    assert result.profile == "low-memory"
+    assert result.operations > 0
+    assert result.ops_per_second > 0
+    # The work copy is removed and the real database is never created
+    assert list(tmp_path.iterdir()) == []
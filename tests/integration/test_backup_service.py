@@ -0,0 +1,94 @@
+"""Verification and rotation of online backups"""
+
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+from cms.services.backup.backup_service import BackupService
+
+
+@pytest.fixture
+def backups(service, tmp_path, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(20)])
+    return BackupService(service.db_path, str(tmp_path / "backups"), keep=3, step_sleep=0)
+
+
+def backup_name(when, counter=None):
+    suffix = f"-{counter}" if counter else ""
+    return f"customers-{when.strftime(BackupService.TIMESTAMP_FORMAT)}{suffix}.db"
+
+
+@pytest.mark.parametrize("method", BackupService.METHODS)
+def test_backup_is_verified_copy(service, tmp_path, customer_row, method):
+    service.create_customers_bulk([customer_row(i) for i in range(20)])
+    backup_service = BackupService(service.db_path, str(tmp_path / "backups"), method=method, step_sleep=0)
+
+    info = backup_service.create_backup()
+
+    assert backup_service.verify_backup(info.path) is None
+    assert backup_service.list_backups() == [info]
+    with closing(sqlite3.connect(info.path)) as copy:
+        assert copy.execute("SELECT COUNT(*) FROM customers").fetchone() == (20,)
+    assert not list((tmp_path / "backups").glob("*.partial"))
+
+
+def test_verify_reports_damaged_backup(backups, tmp_path):
+    info = backups.create_backup()
+    damaged = tmp_path / "damaged.db"
+    with open(info.path, "rb") as source:
+        data = bytearray(source.read())
+    data[100:4096] = b"\xff" * (4096 - 100)
+    damaged.write_bytes(bytes(data))
+
+    assert backups.verify_backup(str(damaged))
+    assert backups.verify_backup(str(tmp_path / "missing.db"))
+
+
+def test_rotation_keeps_newest_backups(backups):
+    taken = [backups.create_backup() for _ in range(5)]
+
+    kept = backups.list_backups()
+
+    assert [info.path for info in kept] == [info.path for info in reversed(taken[2:])]
+    assert all(os.path.exists(info.path) for info in kept)
+    assert not any(os.path.exists(info.path) for info in taken[:2])
+
+
+def test_rotation_drops_old_backups_but_never_the_newest(backups):
+    newest = backups.create_backup()
+    backup_dir = os.path.dirname(newest.path)
+    now = datetime.now()
+    old = os.path.join(backup_dir, backup_name(now - timedelta(days=40)))
+    older = os.path.join(backup_dir, backup_name(now - timedelta(days=50), counter=1))
+    for path in (old, older):
+        shutil.copy(newest.path, path)
+    backups.max_age_days = 30
+
+    assert sorted(backups.rotate()) == sorted([old, older])
+    assert [info.path for info in backups.list_backups()] == [newest.path]
+
+    # Even an expired backup is kept when it is the only one
+    os.replace(newest.path, old)
+    assert backups.rotate() == []
+    assert [info.path for info in backups.list_backups()] == [old]
+
+
+def test_rotation_removes_stale_partial_files(backups):
+    info = backups.create_backup()
+    backup_dir = os.path.dirname(info.path)
+    stale = os.path.join(backup_dir, "customers-20200101-000000.db.partial")
+    fresh = os.path.join(backup_dir, "customers-20200102-000000.db.partial")
+    for path in (stale, fresh):
+        open(path, "wb").close()
+    hour_ago = time.time() - 7200
+    os.utime(stale, (hour_ago, hour_ago))
+
+    backups.rotate()
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
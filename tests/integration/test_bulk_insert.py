@@ -0,0 +1,80 @@
+"""Bulk customer inserts under each conflict policy"""
+
+import pytest
+
+
+@pytest.fixture
+def existing_id(service):
+    return service.create_customer("Existing", "Customer", "customer1@example.com", "+1 555 9999999", "h")
+
+
+def test_bulk_insert_returns_ids_in_row_order(service, customer_row):
+    rows = [customer_row(i, created_at=f"2024-01-0{i + 1} 12:00:00") for i in range(3)]
+
+    result = service.create_customers_bulk(rows)
+
+    assert result.conflicts == []
+    assert [service.get_customer_by_id(customer_id)[3] for customer_id in result.ids] == [
+        row["email"] for row in rows]
+    assert service.get_customer_by_id(result.ids[2])[5] == "2024-01-03 12:00:00"
+
+
+def test_fail_rolls_back_whole_batch(service, customer_row, existing_id):
+    with pytest.raises(Exception, match="already registered"):
+        service.create_customers_bulk([customer_row(i) for i in range(3)], on_conflict="fail")
+
+    assert service.get_customer_count() == 1
+    assert service.get_customer_by_email("customer0@example.com") is None
+
+
+def test_ignore_skips_conflicting_rows(service, customer_row, existing_id):
+    result = service.create_customers_bulk([customer_row(i) for i in range(3)], on_conflict="ignore")
+
+    assert result.ids[1] is None
+    assert None not in (result.ids[0], result.ids[2])
+    assert result.conflicts == [(1, "customer1@example.com")]
+    assert service.get_customer_by_email("customer1@example.com")[1] == "Existing"
+    assert service.get_customer_count() == 3
+
+
+def test_replace_updates_existing_customer_in_place(service, customer_row, existing_id):
+    created_at = service.get_customer_by_id(existing_id)[5]
+
+    result = service.create_customers_bulk([customer_row(i) for i in range(3)], on_conflict="replace")
+
+    assert result.ids[1] == existing_id
+    assert result.conflicts == [(1, "customer1@example.com")]
+    replaced = service.get_customer_by_id(existing_id)
+    assert replaced[1:5] == ("Test", "Customer1", "customer1@example.com", "+1 555 0000001")
+    # Without a created_at in the row the original registration date stays
+    assert replaced[5] == created_at
+    assert service.get_customer_count() == 3
+
+
+def test_repeated_email_within_batch(service, customer_row):
+    rows = [customer_row(0), customer_row(1), customer_row(0, first_name="Second")]
+
+    ignored = service.create_customers_bulk(rows, on_conflict="ignore")
+    assert ignored.ids[2] is None
+    assert ignored.conflicts == [(2, "customer0@example.com")]
+    assert service.get_customer_by_email("customer0@example.com")[1] == "Test"
+
+    replaced = service.create_customers_bulk(rows, on_conflict="replace")
+    assert replaced.ids[0] == replaced.ids[2] == ignored.ids[0]
+    assert service.get_customer_by_email("customer0@example.com")[1] == "Second"
+    assert service.get_customer_count() == 2
+
+
+def test_deleted_customer_email_is_not_a_conflict(service, customer_row, existing_id):
+    service.delete_customer(existing_id)
+
+    result = service.create_customers_bulk([customer_row(1)], on_conflict="fail")
+
+    assert result.conflicts == []
+    assert result.ids[0] != existing_id
+    assert service.get_customer_by_email("customer1@example.com")[1] == "Test"
+
+
+def test_unknown_policy_is_rejected(service, customer_row):
+    with pytest.raises(ValueError, match="Unknown conflict policy"):
+        service.create_customers_bulk([customer_row(0)], on_conflict="merge")
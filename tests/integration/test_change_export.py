@@ -0,0 +1,142 @@
+"""Change-log watermarks, per-consumer incremental exports and opt-in pruning"""
+
+import csv
+
+import pytest
+
+from cms.services.exporter.export_service import ExportService
+
+
+def logged_changes(service):
+    with service.pool.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM customer_changes").fetchone()[0]
+
+
+def read_export(path):
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        return list(csv.reader(csvfile))[1:]
+
+
+def test_changes_are_read_after_watermark(service, customer_row):
+    ids = service.create_customers_bulk([customer_row(i) for i in range(5)]).ids
+    service.update_customer_profile("customer0@example.com", "Changed", "Customer0", "+1 555 0000000")
+    service.delete_customer(ids[1])
+
+    first = service.get_changes_since(None, limit=4)
+    rest = service.get_changes_since(first.watermark, limit=4)
+
+    assert [change[1] for change in first.changes + rest.changes] == ["insert"] * 5 + ["update", "delete"]
+    assert first.watermark == str(first.changes[-1][0])
+    assert rest.changes[0][0] > first.changes[-1][0]
+    # An exhausted log keeps the watermark where it was
+    assert service.get_changes_since(rest.watermark) == ([], rest.watermark)
+    with pytest.raises(ValueError):
+        service.get_changes_since("not-a-watermark")
+
+
+def test_prune_drops_changes_up_to_watermark(service, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(6)])
+    watermark = service.get_changes_since(None, limit=4).watermark
+
+    assert service.prune_changes(watermark) == 4
+    assert logged_changes(service) == 2
+    assert len(service.get_changes_since(watermark).changes) == 2
+
+
+def test_export_saves_watermark_and_keeps_log(service, customer_row, tmp_path):
+    exporter = ExportService(service, str(tmp_path / "state"), batch_size=3)
+    service.create_customers_bulk([customer_row(i) for i in range(7)])
+
+    result = exporter.export_changes(str(tmp_path / "first.csv"))
+
+    assert result.changes == 7
+    assert len(read_export(result.path)) == 7
+    assert exporter.load_watermark() == result.watermark
+    assert (tmp_path / "state" / "app.json").exists()
+    # Exporting alone never shortens the log
+    assert logged_changes(service) == 7
+
+    # Nothing new: no file
+    empty = exporter.export_changes(str(tmp_path / "empty.csv"))
+    assert (empty.path, empty.changes) == (None, 0)
+    assert not (tmp_path / "empty.csv").exists()
+
+    service.update_customer_profile("customer3@example.com", "Changed", "Customer3", "+1 555 0000003")
+    second = exporter.export_changes(str(tmp_path / "second.csv"))
+    rows = read_export(second.path)
+    assert [(row[1], row[5]) for row in rows] == [("update", "customer3@example.com")]
+    assert int(second.watermark) > int(result.watermark)
+
+
+def test_new_consumer_starts_from_full_snapshot(service, customer_row, tmp_path):
+    service.create_customers_bulk([customer_row(i) for i in range(4)])
+    ExportService(service, str(tmp_path), consumer="app").export_changes(str(tmp_path / "app.csv"))
+
+    late = ExportService(service, str(tmp_path), consumer="late").export_changes(str(tmp_path / "late.csv"))
+
+    assert late.changes == 4
+
+
+def test_prune_stops_at_slowest_consumer(service, customer_row, tmp_path):
+    app = ExportService(service, str(tmp_path), consumer="app")
+    viewer = ExportService(service, str(tmp_path), consumer="view_database")
+    assert app.prune() == 0
+
+    service.create_customers_bulk([customer_row(i) for i in range(3)])
+    viewer.export_changes(str(tmp_path / "viewer.csv"))
+    service.create_customers_bulk([customer_row(i) for i in range(3, 5)])
+    app.export_changes(str(tmp_path / "app.csv"))
+
+    assert app.consumer_watermarks() == {"app": app.load_watermark(), "view_database": viewer.load_watermark()}
+    assert app.prune() == 3
+    assert logged_changes(service) == 2
+
+    # The slower consumer still gets everything after its own watermark
+    rest = viewer.export_changes(str(tmp_path / "viewer-2.csv"))
+    assert rest.changes == 2
+    assert viewer.prune() == 2
+    assert logged_changes(service) == 0
+
+
+def test_prune_after_export_is_opt_in(service, customer_row, tmp_path):
+    service.create_customers_bulk([customer_row(i) for i in range(3)])
+    ExportService(service, str(tmp_path)).export_changes(str(tmp_path / "kept.csv"))
+    assert logged_changes(service) == 3
+
+    pruning = ExportService(service, str(tmp_path), consumer="pruning", prune_after_export=True)
+    pruning.export_changes(str(tmp_path / "pruned.csv"))
+
+    assert logged_changes(service) == 0
+
+
+def test_failed_export_keeps_watermark_and_log(service, customer_row, tmp_path):
+    exporter = ExportService(service, str(tmp_path), prune_after_export=True)
+    service.create_customers_bulk([customer_row(i) for i in range(3)])
+
+    with pytest.raises(Exception, match="Failed to export changes"):
+        exporter.export_changes(str(tmp_path / "missing-dir" / "changes.csv"))
+
+    assert exporter.load_watermark() is None
+    assert logged_changes(service) == 3
+
+
+def test_consumer_names_are_checked(service, tmp_path):
+    with pytest.raises(ValueError, match="Invalid export consumer"):
+        ExportService(service, str(tmp_path), consumer="../app")
+
+
+def test_sharded_export_and_prune(sharded_service, customer_row, tmp_path):
+    exporter = ExportService(sharded_service, str(tmp_path), batch_size=4)
+    sharded_service.create_customers_bulk([customer_row(i) for i in range(10)])
+    slow = ExportService(sharded_service, str(tmp_path), consumer="slow")
+    slow.export_changes(str(tmp_path / "slow.csv"))
+    sharded_service.create_customers_bulk([customer_row(i) for i in range(10, 12)])
+
+    result = exporter.export_changes(str(tmp_path / "changes.csv"))
+
+    assert result.changes == 12
+    assert len(result.watermark.split(".")) == 3
+    assert sorted(row[5] for row in read_export(result.path)) == sorted(
+        f"customer{i}@example.com" for i in range(12))
+    assert exporter.prune() == 10
+    assert sum(logged_changes(shard) for shard in sharded_service.shards) == 2
@@ -0,0 +1,167 @@
+"""Writer transactions, read-only readers and change tokens of the connection pool"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from cms.services.database.connection_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), read_pool_size=2, busy_timeout=500)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+    yield pool
+    pool.close()
+
+
+def names(pool):
+    with pool.reader() as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM items ORDER BY rowid")]
+
+
+def test_database_runs_in_wal_mode(pool):
+    with pool.reader() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_nested_writer_joins_outer_transaction(pool):
+    generation = pool.write_generation
+    with pool.writer() as outer:
+        outer.execute("INSERT INTO items VALUES ('outer')")
+        with pool.writer() as inner:
+            assert inner is outer
+            inner.execute("INSERT INTO items VALUES ('inner')")
+        # Not committed by the inner block
+        assert names(pool) == []
+
+    assert names(pool) == ["outer", "inner"]
+    assert pool.write_generation == generation + 1
+
+
+def test_inner_failure_rolls_back_whole_transaction(pool):
+    with pytest.raises(RuntimeError):
+        with pool.writer() as outer:
+            outer.execute("INSERT INTO items VALUES ('outer')")
+            with pool.writer() as inner:
+                inner.execute("INSERT INTO items VALUES ('inner')")
+                raise RuntimeError("boom")
+
+    assert names(pool) == []
+    # The write connection is usable again afterwards
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items VALUES ('after')")
+    assert names(pool) == ["after"]
+
+
+def test_readers_are_read_only(pool):
+    with pool.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            conn.execute("INSERT INTO items VALUES ('nope')")
+
+
+def test_readers_see_committed_data_while_writer_is_open(pool):
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items VALUES ('first')")
+
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items VALUES ('second')")
+        # WAL: the reader gets the last committed snapshot without waiting
+        assert names(pool) == ["first"]
+    assert names(pool) == ["first", "second"]
+
+
+def test_writer_is_exclusive_across_threads(pool):
+    entered = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def hold():
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO items VALUES ('held')")
+            entered.set()
+            release.wait(5)
+            order.append("holder done")
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    entered.wait(5)
+
+    def write():
+        with pool.writer() as conn:
+            order.append("second writer")
+            conn.execute("INSERT INTO items VALUES ('second')")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    writer.join(0.1)
+    assert order == []
+    release.set()
+    thread.join()
+    writer.join()
+
+    assert order == ["holder done", "second writer"]
+    assert names(pool) == ["held", "second"]
+
+
+def test_reader_pool_is_bounded(pool):
+    with pool.reader(), pool.reader():
+        with pytest.raises(sqlite3.OperationalError, match="Timed out"):
+            with pool.reader():
+                pass
+
+
+def test_change_token_moves_on_outside_commits(pool):
+    token = pool.change_token()
+    other = sqlite3.connect(pool.db_path)
+    other.execute("INSERT INTO items VALUES ('elsewhere')")
+    other.commit()
+    other.close()
+
+    assert pool.change_token() != token
+    token = pool.change_token()
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items VALUES ('here')")
+    assert pool.change_token() != token
+
+
+def test_invalid_pragmas_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported"):
+        ConnectionPool(str(tmp_path / "a.db"), pragmas={"journal_mode": "OFF"})
+    with pytest.raises(ValueError, match="Invalid value"):
+        ConnectionPool(str(tmp_path / "b.db"), pragmas={"cache_size": "1; DROP TABLE items"})
+
+
+def test_closed_pool_refuses_connections(pool):
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.reader():
+            pass
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.writer():
+            pass
+
+
+def test_service_reads_from_threads_while_writing(service):
+    errors = []
+
+    def read():
+        try:
+            for _ in range(50):
+                service.get_customer_count()
+                service.get_all_customers()
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for index in range(50):
+        service.create_customer("Test", "Customer", f"customer{index}@example.com", "+1 555 0000000", "h")
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert service.get_customer_count() == 50
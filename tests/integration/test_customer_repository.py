@@ -0,0 +1,57 @@
+"""Customer entities mapped from database rows by CustomerRepository"""
+
+import pytest
+
+from cms.models.entities.customer import Customer
+from cms.models.repositories.customer_repository import CustomerRepository
+
+
+@pytest.fixture
+def repository(service, customer_row):
+    service.create_customers_bulk([customer_row(i, created_at=f"2024-01-{i + 1:02d} 12:00:00")
+                                   for i in range(5)])
+    return CustomerRepository(service)
+
+
+def test_rows_map_to_customers(repository, service):
+    customer = repository.get_by_email("customer2@example.com")
+
+    assert isinstance(customer, Customer)
+    assert customer.as_row() == service.get_customer_by_email("customer2@example.com")
+    assert customer.full_name == "Test Customer2"
+    assert customer.created_date == "2024-01-03"
+    assert repository.get_by_id(customer.id) == customer
+    assert repository.get_by_email("missing@example.com") is None
+
+
+def test_customers_are_slotted():
+    customer = Customer(1, "Ada", "Lovelace", "ada@example.com", "+1 555 0000000")
+
+    assert not hasattr(customer, "__dict__")
+    with pytest.raises(AttributeError):
+        customer.nickname = "Ada"
+
+
+def test_lists_streams_and_pages(repository):
+    everything = repository.get_all()
+
+    assert [c.email for c in everything] == [f"customer{i}@example.com" for i in reversed(range(5))]
+    assert list(repository.iter_all(batch_size=2)) == everything
+
+    first = repository.get_page(limit=2)
+    second = repository.get_page(repository.page_cursor(first), limit=2)
+    assert first + second == everything[:4]
+    assert repository.page_cursor([]) is None
+
+    assert [c.email for c in repository.search("customer3")] == ["customer3@example.com"]
+    assert repository.fuzzy_search("custmer4")[0].email == "customer4@example.com"
+
+
+def test_writes_go_through_the_service(repository):
+    customer = repository.get_by_email("customer0@example.com")
+
+    assert repository.update_profile(customer, "Changed", "Name", "+1 555 1111111")
+    assert repository.get_by_id(customer.id).full_name == "Changed Name"
+
+    assert repository.delete(customer)
+    assert repository.get_by_id(customer.id) is None
@@ -0,0 +1,80 @@
+"""Dashboard counters served from the customer_stats table"""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from cms.services.database.database_service import DatabaseService
+
+
+def utc_ago(**delta):
+    # SQLite's 'now' is UTC
+    return (datetime.utcnow() - timedelta(**delta)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def scanned_counts(service, days=7):
+    """The counters computed the old way, by scanning live customers"""
+    with service.pool.reader() as conn:
+        return (
+            conn.execute("SELECT COUNT(*) FROM customers WHERE deleted_at IS NULL").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM customers WHERE deleted_at IS NULL"
+                         " AND created_at >= datetime('now', ?)", (f"-{days} days",)).fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM customers WHERE deleted_at IS NULL"
+                         " AND DATE(created_at) = DATE('now')").fetchone()[0],
+        )
+
+
+def counters(service, days=7):
+    return (service.get_customer_count(),
+            service.get_recent_registrations_count(days),
+            service.get_today_registrations_count())
+
+
+def test_counters_match_a_table_scan(service, customer_row):
+    ages = [{"minutes": 1}, {"hours": 30}, {"days": 3}, {"days": 7, "minutes": -5},
+            {"days": 7, "minutes": 5}, {"days": 40}]
+    service.create_customers_bulk([customer_row(i, created_at=utc_ago(**age))
+                                   for i, age in enumerate(ages)])
+    service.create_customer("Now", "Customer", "now@example.com", "+1 555 1234567", "h")
+
+    assert counters(service) == scanned_counts(service)
+    assert counters(service, days=1) == scanned_counts(service, days=1)
+    assert counters(service, days=90) == scanned_counts(service, days=90)
+
+
+def test_counters_follow_deletes_and_date_changes(service, customer_row):
+    ids = service.create_customers_bulk([customer_row(i) for i in range(4)]).ids
+
+    service.delete_customer(ids[0])
+    with service.pool.writer() as conn:
+        conn.execute("UPDATE customers SET created_at = ? WHERE id = ?", (utc_ago(days=20), ids[1]))
+
+    assert counters(service) == scanned_counts(service) == (3, 2, 2)
+
+
+def test_existing_rows_are_backfilled(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    with closing(sqlite3.connect(path)) as legacy:
+        legacy.execute('''
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                phone TEXT NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        legacy.executemany('''
+            INSERT INTO customers (first_name, last_name, email, phone, password_hash, created_at)
+            VALUES ('Old', 'Customer', ?, '+1 555 0000000', 'h', ?)
+        ''', [(f"old{i}@example.com", utc_ago(days=i)) for i in range(5)])
+        legacy.commit()
+
+    service = DatabaseService(path)
+    try:
+        assert counters(service) == scanned_counts(service)
+        assert service.get_customer_count() == 5
+    finally:
+        service.close()
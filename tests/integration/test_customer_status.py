@@ -0,0 +1,63 @@
+"""Customer status computed in SQL from created_epoch"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def utc_ago(**delta):
+    # SQLite's 'now' is UTC
+    return (datetime.utcnow() - timedelta(**delta)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+AGES = [{"minutes": 5}, {"hours": 23}, {"hours": 25}, {"days": 3}, {"days": 3}, {"days": 90}]
+
+
+@pytest.fixture(params=["single", "sharded"])
+def backend(request, customer_row):
+    backend = request.getfixturevalue("service" if request.param == "single" else "sharded_service")
+    backend.create_customers_bulk([customer_row(i, created_at=utc_ago(**age)) for i, age in enumerate(AGES)])
+    return backend
+
+
+def all_pages(backend, status, limit=2):
+    rows = []
+    after = None
+    while True:
+        page = backend.get_customers_with_status(status, after, limit)
+        if not page:
+            return rows
+        rows.extend(page)
+        after = (page[-1][5], page[-1][0])
+
+
+def test_status_is_new_for_the_first_day(backend):
+    rows = all_pages(backend, None)
+
+    # Same rows and order as the plain listing, plus the status
+    assert [row[:6] for row in rows] == backend.get_customers_page(limit=10)
+    statuses = {row[3]: row[6] for row in rows}
+    assert [statuses[f"customer{i}@example.com"] for i in range(6)] == [
+        "New", "New", "Active", "Active", "Active", "Active"]
+
+
+def test_status_filter_pages_through_matches_only(backend):
+    assert [row[3] for row in all_pages(backend, "New")] == ["customer0@example.com", "customer1@example.com"]
+    # Two customers share a created_at, so the cursor has to break the tie by id
+    active = all_pages(backend, "Active", limit=1)
+    assert [row[:6] for row in active] == backend.get_customers_page(limit=10)[2:]
+    assert backend.get_customers_with_status("Inactive") == []
+    with pytest.raises(ValueError, match="Unknown customer status"):
+        backend.get_customers_with_status("Dormant")
+
+
+def test_statuses_for_search_results(backend):
+    rows = backend.get_customers_page(limit=10)
+    ids = [row[0] for row in rows]
+
+    statuses = backend.get_customer_statuses(ids + ids[:1])
+
+    assert statuses == {row[0]: row[6] for row in backend.get_customers_with_status(limit=10)}
+    assert sorted(statuses.values()) == ["Active"] * 4 + ["New"] * 2
+    backend.delete_customer(ids[0])
+    assert ids[0] not in backend.get_customer_statuses(ids)
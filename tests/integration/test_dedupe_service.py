@@ -0,0 +1,100 @@
+"""Blocking, pair scoring, clustering and merging of duplicate customers"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cms.services.dedupe.dedupe_service import (
+    DedupeService, DuplicateCluster, blocking_keys, name_code, normalize_phone, score_blocks, score_pair,
+)
+
+
+@pytest.mark.parametrize("name, code", [
+    ("Robert", "R163"), ("Rupert", "R163"), ("Ashcraft", "A261"), ("Tymczak", "T522"),
+    ("Pfister", "P236"), ("Lee", "L000"), ("José", "J200"), ("", ""),
+])
+def test_name_code_is_american_soundex(name, code):
+    assert name_code(name) == code
+
+
+def test_normalize_phone_keeps_last_ten_digits():
+    assert normalize_phone("+1 (555) 123-4567") == "5551234567"
+    assert normalize_phone("555 123 4567") == "5551234567"
+    assert normalize_phone("12-34") == ""
+    assert normalize_phone(None) == ""
+
+
+def test_blocking_keys_share_phone_and_swapped_names():
+    keys = blocking_keys("Robert", "Smith", "+1 555 123 4567")
+    assert keys == ["p:5551234567", "n:R163S530"]
+    assert blocking_keys("Smith", "Rupert", "555-123-4567") == keys
+    assert blocking_keys("Robert", "Smith", "") == ["n:R163S530"]
+
+
+def candidate(customer_id, first_name, last_name, email, phone, created_at="2024-01-01 00:00:00"):
+    return (customer_id, created_at, first_name, last_name, email, normalize_phone(phone))
+
+
+def test_score_pair_against_threshold():
+    robert = candidate(1, "Robert", "Smith", "robert.smith@example.com", "+1 555 123 4567")
+    bob = candidate(2, "Rob", "Smith", "robertsmith+shop@example.com", "555 123 4567")
+    stranger = candidate(3, "Rupert", "Simms", "rsimms@example.com", "+1 555 765 4321")
+
+    assert score_pair(robert, bob) >= 0.8
+    assert score_pair(robert, stranger) < 0.8
+    # Below the bound, the early exit returns 0
+    assert score_pair(robert, stranger, threshold=0.8) == 0.0
+    # Swapped first and last names still match
+    swapped = candidate(4, "Smith", "Robert", "robert.smith@example.com", "+1 555 123 4567")
+    assert score_pair(robert, swapped) == pytest.approx(1.0)
+
+
+def test_nearby_phone_numbers_are_not_duplicates():
+    a = candidate(1, "Test", "Customer1", "customer1@example.com", "+1 555 0000001")
+    b = candidate(2, "Test", "Customer2", "customer2@example.com", "+1 555 0000002")
+    assert score_pair(a, b) < 0.8
+
+
+def test_score_blocks_windows_large_blocks():
+    block = [candidate(i, "Test", f"Customer{i}", f"c{i}@example.com", "") for i in range(10)]
+
+    _, full = score_blocks([block], 0.8, max_block_size=10, window=2)
+    _, windowed = score_blocks([block], 0.8, max_block_size=5, window=2)
+
+    assert full == 45
+    assert windowed == 9 + 8
+
+
+def test_cluster_joins_linked_pairs():
+    a, b, c, d, e = [("2024-01-0%d" % day, day) for day in range(1, 6)]
+    clusters = DedupeService._cluster({(a, b): 0.9, (c, b): 0.85, (d, e): 0.95})
+
+    assert clusters == [
+        DuplicateCluster([4, 5], 0.95, [(4, 5, 0.95)]),
+        DuplicateCluster([1, 2, 3], 0.85, [(1, 2, 0.9), (3, 2, 0.85)]),
+    ]
+
+
+def test_find_duplicates_and_merge_then_restore(service):
+    survivor = service.create_customer("Robert", "Smith", "robert.smith@example.com", "+1 555 123 4567", "h")
+    duplicate = service.create_customer("Rob", "Smith", "robertsmith@example.com", "555 123 4567", "h")
+    service.create_customer("Maria", "Garcia", "maria@example.com", "+1 555 765 4321", "h")
+
+    dedupe = DedupeService(service, workers=1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = dedupe.find_duplicates(executor=executor)
+
+    assert result.customers == 3
+    assert [cluster.customer_ids for cluster in result.clusters] == [[survivor, duplicate]]
+
+    assert dedupe.merge_cluster(result.clusters[0]) == 1
+    assert service.get_customer_by_id(duplicate) is None
+    assert service.get_customer_count() == 2
+    with service.pool.reader() as conn:
+        assert conn.execute("SELECT survivor_id FROM customer_merges WHERE duplicate_id = ?",
+                            (duplicate,)).fetchone() == (survivor,)
+
+    assert service.restore_customer(duplicate)
+    assert service.get_customer_by_id(duplicate)[3] == "robertsmith@example.com"
+    with service.pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM customer_merges").fetchone() == (0,)
@@ -0,0 +1,53 @@
+"""email_domain generated column and domain analytics"""
+
+import pytest
+
+
+DOMAINS = ["gmail.com"] * 5 + ["Example.ORG"] * 3 + ["mail.example.com"] * 2
+
+
+@pytest.fixture
+def rows(customer_row):
+    return [customer_row(i, email=f"user{i}@{domain}", created_at=f"2024-02-{i + 1:02d} 09:00:00")
+            for i, domain in enumerate(DOMAINS)]
+
+
+@pytest.fixture(params=["single", "sharded"])
+def backend(request, rows):
+    backend = request.getfixturevalue("service" if request.param == "single" else "sharded_service")
+    backend.create_customers_bulk(rows)
+    return backend
+
+
+def test_domain_counts_are_case_insensitive_and_ranked(backend):
+    assert backend.get_email_domain_counts() == [
+        ("gmail.com", 5), ("example.org", 3), ("mail.example.com", 2)]
+    assert backend.get_email_domain_counts(limit=1) == [("gmail.com", 5)]
+    assert backend.get_email_domain_count("@Example.org ") == 3
+    assert backend.get_email_domain_count("example.com") == 0
+
+
+def test_domain_pages_are_newest_first(backend):
+    first = backend.get_customers_by_domain("gmail.com", limit=3)
+    second = backend.get_customers_by_domain("gmail.com", (first[-1][5], first[-1][0]), limit=3)
+
+    assert [row[3] for row in first + second] == [f"user{i}@gmail.com" for i in reversed(range(5))]
+
+
+def test_deleted_customers_are_not_counted(service, rows):
+    ids = service.create_customers_bulk(rows).ids
+    service.delete_customer(ids[0])
+
+    assert service.get_email_domain_count("gmail.com") == 4
+    assert len(service.get_customers_by_domain("gmail.com")) == 4
+
+
+def test_column_follows_the_email(service):
+    customer_id = service.create_customer("Mixed", "Case", "Someone@Sub.Example.COM", "+1 555 0000000", "h")
+
+    with service.pool.reader() as conn:
+        domain = conn.execute("SELECT email_domain FROM customers WHERE id = ?", (customer_id,)).fetchone()[0]
+    assert domain == "sub.example.com"
+    # The rebuilt table keeps the search indexes working
+    assert service.search_customers("mixed")[0][0] == customer_id
+    assert service.fuzzy_search_customers("mixd case")[0][0] == customer_id
@@ -0,0 +1,101 @@
+"""Customer lookup cache: hits, LRU bound and invalidation after writes"""
+
+from cms.services.database.database_service import DatabaseService
+from cms.services.database.entity_cache import CustomerCache
+
+
+def row(customer_id, email, first_name="Test"):
+    return (customer_id, first_name, "Customer", email, "+1 555 0000000", "2024-01-01 00:00:00")
+
+
+def test_repeated_lookups_are_served_from_cache(service, customer_row):
+    customer_id = service.create_customers_bulk([customer_row(0)]).ids[0]
+
+    first = service.get_customer_by_id(customer_id)
+    stats = service.get_cache_stats()
+    assert service.get_customer_by_id(customer_id) == first
+    assert service.get_customer_by_email("customer0@example.com") == first
+
+    after = service.get_cache_stats()
+    assert after["hits"] == stats["hits"] + 2
+    assert after["misses"] == stats["misses"]
+
+
+def test_profile_update_is_written_through(service, customer_row):
+    customer_id = service.create_customers_bulk([customer_row(0)]).ids[0]
+    service.get_customer_by_id(customer_id)
+
+    service.update_customer_profile("customer0@example.com", "Changed", "Name", "+1 555 1111111")
+
+    assert service.get_customer_by_id(customer_id)[1:3] == ("Changed", "Name")
+    assert service.get_customer_by_email("customer0@example.com")[4] == "+1 555 1111111"
+
+
+def test_delete_and_restore_invalidate(service, customer_row):
+    customer_id = service.create_customers_bulk([customer_row(0)]).ids[0]
+    service.get_customer_by_email("customer0@example.com")
+
+    service.delete_customer(customer_id)
+    assert service.get_customer_by_id(customer_id) is None
+    assert service.get_customer_by_email("customer0@example.com") is None
+    assert not service.email_exists("customer0@example.com")
+
+    service.restore_customer(customer_id)
+    assert service.get_customer_by_email("customer0@example.com")[0] == customer_id
+
+
+def test_bulk_replace_and_delete_invalidate(service, customer_row):
+    ids = service.create_customers_bulk([customer_row(i) for i in range(3)]).ids
+    for customer_id in ids:
+        service.get_customer_by_id(customer_id)
+
+    service.create_customers_bulk([customer_row(1, first_name="Replaced")], on_conflict="replace")
+    assert service.get_customer_by_id(ids[1])[1] == "Replaced"
+
+    service.delete_customers(ids[:2])
+    assert service.get_customer_by_id(ids[0]) is None
+    assert service.get_customer_by_id(ids[1]) is None
+    assert service.get_customer_by_id(ids[2]) is not None
+
+
+def test_cache_is_bounded(tmp_path, customer_row):
+    service = DatabaseService(str(tmp_path / "small.db"), cache_size=2)
+    try:
+        ids = service.create_customers_bulk([customer_row(i) for i in range(4)]).ids
+        for customer_id in ids:
+            service.get_customer_by_id(customer_id)
+        assert service.get_cache_stats()["size"] == 2
+    finally:
+        service.close()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = CustomerCache(max_entries=2)
+    cache.put(row(1, "a@example.com"))
+    cache.put(row(2, "b@example.com"))
+    cache.get_by_id(1)
+    cache.put(row(3, "c@example.com"))
+
+    assert cache.get_by_id(2) is None
+    assert cache.get_by_email("a@example.com")[0] == 1
+    assert cache.get_by_email("b@example.com") is None
+
+
+def test_lookup_racing_a_write_does_not_cache_stale_row():
+    cache = CustomerCache()
+    generation = cache.generation
+    stale = row(1, "a@example.com")
+    # A write lands between the lookup's read and its put()
+    cache.invalidate_id(1)
+    cache.put(stale, generation)
+
+    assert cache.get_by_id(1) is None
+
+
+def test_email_change_drops_old_email_index():
+    cache = CustomerCache()
+    cache.put(row(1, "old@example.com"))
+    cache.update(row(1, "new@example.com"))
+
+    assert cache.get_by_email("old@example.com") is None
+    assert cache.get_by_email("new@example.com")[0] == 1
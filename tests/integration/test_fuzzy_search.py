@@ -0,0 +1,43 @@
+"""Typo-tolerant customer search over the trigram index"""
+
+import pytest
+
+from cms.services.database.fuzzy_search import edit_distance
+
+
+@pytest.fixture
+def customers(service):
+    return {
+        "jonathan": service.create_customer("Jonathan", "Smith", "jsmith@example.com", "+1 555 0000001", "h"),
+        "katherine": service.create_customer("Katherine", "Jones", "kjones@example.com", "+1 555 0000002", "h"),
+        "peter": service.create_customer("Peter", "Parker", "ppark@example.com", "+1 555 0000003", "h"),
+    }
+
+
+def test_misspelled_names_are_found(service, customers):
+    assert service.fuzzy_search_customers("jonathon")[0][0] == customers["jonathan"]
+    assert service.fuzzy_search_customers("kathrine")[0][0] == customers["katherine"]
+    assert service.fuzzy_search_customers("petr parkr")[0][0] == customers["peter"]
+
+
+def test_distance_threshold_limits_matches(service, customers):
+    assert service.fuzzy_search_customers("zzzzzz") == []
+    assert service.fuzzy_search_customers("jonathon", max_distance=0) == []
+
+
+def test_index_follows_profile_changes(service, customers):
+    service.update_customer_profile("jsmith@example.com", "Nathaniel", "Smith", "+1 555 0000001")
+    assert service.fuzzy_search_customers("nathanial")[0][0] == customers["jonathan"]
+
+    service.delete_customer(customers["peter"])
+    assert service.fuzzy_search_customers("petr parkr") == []
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("kitten", "sitting", 3),
+    ("abcd", "abdc", 1),  # adjacent transposition counts once
+    ("same", "same", 0),
+    ("", "abc", 3),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
@@ -0,0 +1,164 @@
+"""Chunked CSV import: conflict policies, reject file and checkpoint resume"""
+
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cms.services.importer.import_service import CsvImportService
+
+
+HEADER = ["First Name", "Last Name", "Email", "Phone"]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def customer(index, first_name="Imported"):
+    return [first_name, "Customer", f"import{index}@example.com", f"+1 555 {index:07d}"]
+
+
+def run_import(importer, path, **kwargs):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        return importer.import_csv(path, executor=executor, **kwargs)
+
+
+def read_rejects(path):
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        return list(csv.reader(csvfile))
+
+
+@pytest.fixture
+def existing(service):
+    """One customer already registered under import1@example.com"""
+    return service.create_customer("Existing", "Customer", "import1@example.com", "+1 555 9999999", "0" * 64)
+
+
+def test_replace_overwrites_existing_customer(service, tmp_path, existing):
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(4)])
+
+    result = run_import(CsvImportService(service, chunk_size=2, on_conflict="replace"), path)
+
+    assert (result.rows_done, result.imported, result.conflicts) == (4, 4, 1)
+    assert service.get_customer_count() == 4
+    replaced = service.get_customer_by_email("import1@example.com")
+    assert replaced[0] == existing
+    assert replaced[1] == "Imported"
+
+
+def test_ignore_keeps_existing_customer(service, tmp_path, existing):
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(4)])
+
+    result = run_import(CsvImportService(service, chunk_size=2, on_conflict="ignore"), path)
+
+    assert (result.rows_done, result.imported, result.conflicts) == (4, 3, 1)
+    assert service.get_customer_count() == 4
+    assert service.get_customer_by_email("import1@example.com")[1] == "Existing"
+
+
+def test_fail_stops_at_conflicting_chunk(service, tmp_path, existing):
+    # import1 lands in the first chunk, so nothing is imported
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(4)])
+    importer = CsvImportService(service, chunk_size=2, on_conflict="fail")
+
+    with pytest.raises(Exception, match="already registered"):
+        run_import(importer, path)
+
+    assert service.get_customer_count() == 1
+    assert service.get_customer_by_email("import1@example.com")[1] == "Existing"
+    assert importer.get_checkpoint(path) is None
+
+
+def test_rejected_rows_are_written_to_reject_file(service, tmp_path):
+    rows = [customer(0), ["X", "Customer", "import1@example.com", "+1 555 0000001"],
+            customer(2), ["Bad", "Email", "not-an-email", "+1 555 0000003"]]
+    path = write_csv(tmp_path / "customers.csv", rows)
+
+    result = run_import(CsvImportService(service, chunk_size=2), path)
+
+    assert (result.imported, result.rejected) == (2, 2)
+    assert result.reject_path == str(tmp_path / "customers.rejected.csv")
+    assert [line for line, _ in result.errors] == [3, 5]
+    rejects = read_rejects(result.reject_path)
+    assert rejects[0] == ["Line", "Reason"] + HEADER
+    assert [r[0] for r in rejects[1:]] == ["3", "5"]
+    assert "first name" in rejects[1][1]
+    assert rejects[1][2:] == rows[1]
+    assert rejects[2][2:] == rows[3]
+
+
+def test_clean_import_has_no_reject_file(service, tmp_path):
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(3)])
+    (tmp_path / "customers.rejected.csv").write_text("stale\n", encoding="utf-8")
+
+    result = run_import(CsvImportService(service), path)
+
+    assert result.reject_path is None
+    assert not (tmp_path / "customers.rejected.csv").exists()
+
+
+def test_interrupted_import_resumes_after_last_committed_chunk(service, tmp_path):
+    rows = [customer(i) for i in range(10)]
+    rows[1] = ["Bad", "Email", "first-bad", "+1 555 0000001"]
+    rows[7] = ["Bad", "Email", "second-bad", "+1 555 0000007"]
+    path = write_csv(tmp_path / "customers.csv", rows)
+    importer = CsvImportService(service, chunk_size=4, workers=1)
+
+    def interrupt(progress):
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(Exception, match="interrupted"):
+        run_import(importer, path, progress_callback=interrupt)
+
+    # The first chunk committed with its checkpoint before the interruption
+    fingerprint = importer.fingerprint(path)
+    assert importer.get_checkpoint(path) == (fingerprint, 4, 3, 1, 0, 0)
+    assert service.get_customer_count() == 3
+
+    result = run_import(importer, path)
+
+    assert result.resumed_from == 4
+    assert (result.rows_done, result.imported, result.rejected) == (10, 8, 2)
+    assert service.get_customer_count() == 8
+    assert importer.get_checkpoint(path) == (fingerprint, 10, 8, 2, 0, 1)
+    # The resumed run appends to the reject file of the first one
+    rejects = read_rejects(result.reject_path)
+    assert [r[0] for r in rejects[1:]] == ["3", "9"]
+
+
+def test_completed_import_starts_over(service, tmp_path):
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(3)])
+    importer = CsvImportService(service, on_conflict="ignore")
+    run_import(importer, path)
+
+    result = run_import(importer, path)
+
+    assert (result.resumed_from, result.rows_done, result.imported, result.conflicts) == (0, 3, 0, 3)
+
+
+def test_default_process_pool(service, tmp_path):
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(6)])
+
+    result = CsvImportService(service, chunk_size=2, workers=2).import_csv(path)
+
+    assert (result.rows_done, result.imported) == (6, 6)
+
+
+def test_interrupted_import_stops_default_pool(service, tmp_path):
+    path = write_csv(tmp_path / "customers.csv", [customer(i) for i in range(40)])
+    importer = CsvImportService(service, chunk_size=2, workers=2)
+
+    def interrupt(progress):
+        raise RuntimeError("interrupted")
+
+    # Queued chunks are cancelled rather than validated before the pool shuts down
+    with pytest.raises(Exception, match="interrupted"):
+        importer.import_csv(path, progress_callback=interrupt)
+
+    assert importer.get_checkpoint(path)[1] == 2
+    assert service.get_customer_count() == 2
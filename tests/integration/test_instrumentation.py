@@ -0,0 +1,100 @@
+"""Latency histograms and the slow-query log"""
+
+import logging
+import re
+import time
+
+import pytest
+
+from cms.services.database.connection_pool import ConnectionPool
+from cms.services.database.database_service import DatabaseService
+from cms.services.database.instrumentation import LatencyHistogram, QueryProfiler
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    db = DatabaseService(str(tmp_path / "profiled.db"),
+                         profiler=QueryProfiler(enabled=True, slow_query_ms=0))
+    yield db
+    db.close()
+
+
+def slow_query_messages(caplog):
+    return [record.getMessage() for record in caplog.records
+            if record.name == "cms.database.slow_queries"]
+
+
+def test_disabled_profiler_records_nothing(service):
+    service.get_customer_count()
+
+    assert service.get_latency_report() == {}
+
+
+def test_public_methods_are_timed(profiled, customer_row):
+    profiled.create_customers_bulk([customer_row(i) for i in range(3)])
+    for _ in range(3):
+        profiled.get_customer_by_email("customer0@example.com")
+    list(profiled.iter_customers(batch_size=1))
+    with pytest.raises(ValueError):
+        profiled.create_customers_bulk([customer_row(9)], on_conflict="merge")
+
+    report = profiled.get_latency_report()
+
+    assert report["get_customer_by_email"]["count"] == 3
+    assert report["iter_customers"]["count"] == 1
+    assert report["create_customers_bulk"]["errors"] == 1
+    assert 0 < report["get_customer_by_email"]["p50_ms"] <= report["get_customer_by_email"]["max_ms"]
+
+
+def test_slow_statements_are_logged_without_values(profiled, caplog):
+    caplog.set_level(logging.WARNING, logger="cms.database.slow_queries")
+
+    profiled.get_customer_by_email("secret@example.com")
+
+    messages = slow_query_messages(caplog)
+    assert any("WHERE email = ?" in message and "params (str)" in message
+               and "plan " in message for message in messages)
+    assert not any("secret@example.com" in message for message in messages)
+
+
+@pytest.mark.parametrize("read", [
+    lambda cursor: cursor.fetchall(),
+    lambda cursor: iter(lambda: cursor.fetchmany(3), []),
+    lambda cursor: list(cursor),
+], ids=["fetchall", "fetchmany", "iterate"])
+def test_fetch_bound_statement_is_logged(tmp_path, caplog, read):
+    caplog.set_level(logging.WARNING, logger="cms.database.slow_queries")
+    pool = ConnectionPool(str(tmp_path / "fetch.db"),
+                          profiler=QueryProfiler(enabled=True, slow_query_ms=100))
+    try:
+        with pool.writer() as conn:
+            conn.execute("CREATE TABLE items (value INTEGER)")
+            conn.executemany("INSERT INTO items VALUES (?)", [(i,) for i in range(10)])
+        with pool.reader() as conn:
+            # Each row costs 20 ms while it is stepped; execute() only steps the first
+            conn.create_function("pause", 1, lambda value: time.sleep(0.02) or value)
+            start = time.perf_counter()
+            cursor = conn.execute("SELECT pause(value) FROM items")
+            assert (time.perf_counter() - start) * 1000 < 100
+            list(read(cursor))
+    finally:
+        pool.close()
+
+    messages = [message for message in slow_query_messages(caplog) if "pause(value)" in message]
+    assert len(messages) == 1
+    assert float(re.search(r"slow query ([\d.]+) ms", messages[0]).group(1)) >= 180
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+    histogram.record(0.5, failed=True)
+
+    summary = histogram.summary()
+
+    assert (summary["count"], summary["errors"]) == (101, 1)
+    # Buckets are about 10% wide
+    assert 45 <= summary["p50_ms"] <= 56
+    assert 90 <= summary["p95_ms"] <= 105
+    assert summary["p99_ms"] <= summary["max_ms"] == 500
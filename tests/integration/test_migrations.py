@@ -0,0 +1,103 @@
+"""Versioned schema migrations"""
+
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from cms.services.database.connection_pool import ConnectionPool
+from cms.services.database.database_service import DatabaseService
+from cms.services.database.migrations import Migration, MigrationRunner
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "schema.db"))
+    yield pool
+    pool.close()
+
+
+def recorded_versions(pool):
+    with pool.reader() as conn:
+        return [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+def test_new_database_is_at_latest_version(service):
+    runner = service.migration_runner
+
+    assert runner.current_version() == runner.latest_version
+    assert recorded_versions(service.pool) == [m.version for m in runner.migrations]
+    # Nothing is left to apply on the next start
+    assert runner.upgrade() == []
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    with closing(sqlite3.connect(path)) as legacy:
+        legacy.execute('''
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                phone TEXT NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        legacy.execute('''
+            INSERT INTO customers (first_name, last_name, email, phone, password_hash)
+            VALUES ('Old', 'Customer', 'old@example.com', '+1 555 0000000', 'h')
+        ''')
+        legacy.commit()
+
+    service = DatabaseService(path)
+    try:
+        assert service.migration_runner.current_version() == service.migration_runner.latest_version
+        assert service.get_customer_by_email("old@example.com")[1] == "Old"
+        with service.pool.reader() as conn:
+            indexed = [tuple(column[2] for column in conn.execute(f"PRAGMA index_info('{index[1]}')"))
+                       for index in conn.execute("PRAGMA index_list(customers)")]
+        assert ("created_at", "id") in indexed
+    finally:
+        service.close()
+
+
+def test_failed_migration_is_rolled_back(pool):
+    def fail(conn):
+        raise sqlite3.OperationalError("broken step")
+
+    runner = MigrationRunner(pool, [
+        Migration(1, "Create items", ["CREATE TABLE items (name TEXT)"]),
+        Migration(2, "Half done", ["CREATE TABLE partial (name TEXT)", fail]),
+    ])
+
+    with pytest.raises(sqlite3.OperationalError, match="broken step"):
+        runner.upgrade()
+
+    assert recorded_versions(pool) == [1]
+    with pool.reader() as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "items" in tables
+    assert "partial" not in tables
+
+
+def test_pending_migrations_apply_in_order(pool):
+    MigrationRunner(pool, [Migration(1, "Create items", ["CREATE TABLE items (name TEXT)"])]).upgrade()
+
+    runner = MigrationRunner(pool, [
+        Migration(3, "Index names", ["CREATE INDEX idx_items_name ON items (name)"]),
+        Migration(1, "Create items", ["CREATE TABLE items (name TEXT)"]),
+        Migration(2, "Seed", ["INSERT INTO items VALUES ('seed')"]),
+    ])
+
+    assert runner.upgrade() == [2, 3]
+    assert recorded_versions(pool) == [1, 2, 3]
+
+
+def test_newer_database_is_refused(pool):
+    MigrationRunner(pool, [Migration(1, "One", ["CREATE TABLE a (x)"]),
+                           Migration(2, "Two", ["CREATE TABLE b (x)"])]).upgrade()
+
+    with pytest.raises(Exception, match="newer than this application supports"):
+        MigrationRunner(pool, [Migration(1, "One", ["CREATE TABLE a (x)"])]).upgrade()
@@ -0,0 +1,70 @@
+"""Keyset pagination of the customer list and search results"""
+
+import pytest
+
+
+def add_customers(service, count, created_at="2024-01-01 12:00:00", name="Test"):
+    """Insert customers with fixed timestamps, so pages must break ties by id"""
+    with service.pool.writer() as conn:
+        for index in range(count):
+            conn.execute('''
+                INSERT INTO customers (first_name, last_name, email, phone, password_hash, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (name, f"Customer{index}", f"{name.lower()}{index}@example.com",
+                  "+1 555 0000000", "h", created_at))
+
+
+def all_pages(fetch, limit):
+    pages = []
+    after = None
+    while True:
+        page = fetch(after, limit)
+        if not page:
+            return pages
+        pages.append(page)
+        after = (page[-1][5], page[-1][0])
+
+
+def test_pages_cover_every_customer_once_newest_first(service):
+    add_customers(service, 12, created_at="2024-01-01 12:00:00")
+    add_customers(service, 11, created_at="2024-02-01 12:00:00", name="Later")
+
+    pages = all_pages(service.get_customers_page, 5)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    rows = [row for page in pages for row in page]
+    assert len({row[0] for row in rows}) == 23
+    keys = [(row[5], row[0]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert all(row[1] == "Later" for row in rows[:11])
+
+
+def test_new_customers_do_not_shift_later_pages(service):
+    add_customers(service, 10)
+    first = service.get_customers_page(limit=4)
+
+    add_customers(service, 3, created_at="2024-06-01 12:00:00", name="Newer")
+    second = service.get_customers_page(after=(first[-1][5], first[-1][0]), limit=4)
+
+    assert [row[0] for row in second] == [first[-1][0] - offset for offset in range(1, 5)]
+
+
+def test_search_pages_only_hold_matches(service):
+    add_customers(service, 9, name="Alice")
+    add_customers(service, 7, name="Bob")
+
+    pages = all_pages(lambda after, limit: service.search_customers_page("alice", after, limit), 4)
+
+    rows = [row for page in pages for row in page]
+    assert len(rows) == 9
+    assert all(row[1] == "Alice" for row in rows)
+    assert service.search_customers_page("nobody") == []
+
+
+@pytest.mark.parametrize("rows, cursor", [
+    ([], None),
+    ([(3, "A", "B", "a@example.com", "1", "2024-01-02 00:00:00"),
+      (2, "C", "D", "c@example.com", "1", "2024-01-01 00:00:00")], ("2024-01-01 00:00:00", 2)),
+])
+def test_page_cursor_is_last_row_key(service, rows, cursor):
+    assert service.page_cursor(rows) == cursor
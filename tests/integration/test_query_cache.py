@@ -0,0 +1,126 @@
+"""Query result cache: hits, invalidation after writes, age and memory bounds"""
+
+import sqlite3
+
+from cms.services.database import query_cache
+from cms.services.database.query_cache import QueryCache
+
+
+def test_repeated_query_is_served_from_cache(service, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(3)])
+
+    assert service.get_customer_count() == 3
+    stats = service.get_query_cache_stats()
+    assert service.get_customer_count() == 3
+
+    after = service.get_query_cache_stats()
+    assert after["hits"] == stats["hits"] + 1
+    assert after["misses"] == stats["misses"]
+
+
+def test_writes_through_service_invalidate(service, customer_row):
+    ids = service.create_customers_bulk([customer_row(i) for i in range(3)]).ids
+    assert service.get_customer_count() == 3
+
+    service.create_customer("New", "Customer", "new@example.com", "+1 555 1234567", "h")
+    assert service.get_customer_count() == 4
+
+    service.delete_customer(ids[0])
+    assert service.get_customer_count() == 3
+    assert service.get_query_cache_stats()["entries"] == 1
+
+
+def test_commits_from_other_connections_invalidate(service, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(3)])
+    assert service.get_customer_count() == 3
+
+    # Another process writing to the same file
+    other = sqlite3.connect(service.db_path)
+    other.execute('''
+        INSERT INTO customers (first_name, last_name, email, phone, password_hash)
+        VALUES ('Outside', 'Writer', 'outside@example.com', '+1 555 7654321', 'h')
+    ''')
+    other.commit()
+    other.close()
+
+    assert service.get_customer_count() == 4
+
+
+class FakePool:
+    """Stands in for the connection pool's change token"""
+
+    def __init__(self):
+        self.token = (0, 0)
+
+    def change_token(self):
+        return self.token
+
+
+def test_clock_dependent_entries_expire(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: clock[0])
+    cache = QueryCache(FakePool())
+    loads = []
+
+    def load():
+        loads.append(clock[0])
+        return len(loads)
+
+    assert cache.get_or_load("today", load, max_age=60) == 1
+    clock[0] += 59
+    assert cache.get_or_load("today", load, max_age=60) == 1
+    clock[0] += 2
+    assert cache.get_or_load("today", load, max_age=60) == 2
+    # Entries without max_age only expire with the data
+    assert cache.get_or_load("total", load) == 3
+    clock[0] += 3600
+    assert cache.get_or_load("total", load) == 3
+
+
+def test_token_change_drops_every_entry():
+    pool = FakePool()
+    cache = QueryCache(pool)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+
+    pool.token = (1, 0)
+
+    assert cache.get_or_load("a", lambda: 10) == 10
+    assert cache.stats()["entries"] == 1
+
+
+def test_result_loaded_across_a_write_is_not_cached():
+    pool = FakePool()
+    cache = QueryCache(pool)
+
+    def load_then_write():
+        pool.token = (1, 0)
+        return "stale"
+
+    cache.get_or_load("a", load_then_write)
+
+    assert cache.get_or_load("a", lambda: "fresh") == "fresh"
+
+
+def test_memory_budget_evicts_oldest_and_skips_large_results():
+    cache = QueryCache(FakePool(), max_bytes=4096)
+    for index in range(50):
+        cache.get_or_load(index, lambda: [(index, "x" * 20)])
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 4096
+    assert stats["evictions"] > 0
+    assert cache.get_or_load(49, lambda: "reloaded") != "reloaded"
+    assert cache.get_or_load(0, lambda: "reloaded") == "reloaded"
+
+    entries = cache.stats()["entries"]
+    cache.get_or_load("big", lambda: ["y" * 2000])
+    assert cache.stats()["entries"] == entries
+
+
+def test_disabled_cache_always_loads():
+    cache = QueryCache(FakePool(), max_bytes=0)
+    loads = []
+    for _ in range(3):
+        cache.get_or_load("a", lambda: loads.append(1))
+    assert len(loads) == 3
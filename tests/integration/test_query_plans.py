@@ -0,0 +1,286 @@
+"""Query-plan regression guard and latency budgets for DatabaseService.
+
+A synthetic customers database is built once per size tier. Every SQL
+statement issued by the service is captured through the query profiler and
+explained with ``EXPLAIN QUERY PLAN``; a full scan of ``customers`` or a
+temp B-tree sort fails the test unless the method is listed in
+``ALLOWED_PLAN_STEPS`` with the reason it is unavoidable.
+
+The 100k tier's plan checks always run. Wall-clock budgets depend on the
+machine, so they, like the 1M tier (which takes several minutes to build),
+only run with ``CMS_RUN_LARGE_BENCHMARKS=1``.
+"""
+
+import os
+import random
+import re
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from cms.services.database.database_service import DatabaseService
+from cms.services.database.instrumentation import QueryProfiler
+
+
+LARGE_BENCHMARKS = os.environ.get("CMS_RUN_LARGE_BENCHMARKS") == "1"
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+               "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Thomas", "Sarah", "Charles", "Karen", "Ahmed", "Fatima", "Wei", "Yuki", "Olga"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+              "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Khan", "Chen", "Tanaka", "Ivanova"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "example.com", "company.org", "mail.net"]
+
+# Plan steps that are acceptable for a given method, with the reason
+ALLOWED_PLAN_STEPS = {
+    # Whole-table reads walk the (created_at, id) index in order by design
+    "get_all_customers": ["SCAN customers USING INDEX"],
+    "iter_customers": ["SCAN customers USING INDEX"],
+    # The first page has no keyset bound, so it is an ordered index scan with a LIMIT
+    "get_customers_page": ["SCAN customers USING INDEX"],
+    "get_recent_activity": ["SCAN customers USING INDEX"],
+    # One row per registration day, so the total stays cheap as customers grow
+    "get_customer_count": ["SCAN customer_stats"],
+    "get_registration_trend": ["SCAN customer_stats"],
+    # Counts only exist once the domain index has been walked; one row per domain
+    "get_email_domain_counts": ["USE TEMP B-TREE FOR ORDER BY"],
+    # Relevance order only exists after FTS has scored the matches
+    "search_customers": ["USE TEMP B-TREE FOR ORDER BY"],
+    "iter_search": ["USE TEMP B-TREE FOR ORDER BY"],
+    # FTS returns matches in rowid order, which must be re-sorted by created_at
+    "search_customers_page": ["USE TEMP B-TREE FOR ORDER BY"],
+    # Candidates are ranked by an aggregate over their shared trigrams
+    "fuzzy_search_customers": ["USE TEMP B-TREE FOR GROUP BY", "USE TEMP B-TREE FOR ORDER BY"],
+}
+
+FORBIDDEN_PLAN_STEPS = [
+    re.compile(r"^SCAN (customers|c)( AS \w+)?$"),
+    re.compile(r"^SCAN customer_trigrams\b"),
+    re.compile(r"^SCAN customer_stats\b"),
+    re.compile(r"USE TEMP B-TREE"),
+]
+
+# Median latency budgets in milliseconds per size tier, measured with the
+# entity and query caches disabled so every call reaches SQLite
+LATENCY_BUDGETS_MS = {
+    100_000: {
+        "authenticate_customer": 5,
+        "email_exists": 5,
+        "get_customer_by_email": 5,
+        "get_customer_by_id": 5,
+        "get_customers_page": 10,
+        "get_customers_page_after": 10,
+        "search_customers": 150,
+        "search_customers_page": 150,
+        "fuzzy_search_customers": 400,
+        "get_customer_count": 10,
+        "get_recent_registrations_count": 10,
+        "get_today_registrations_count": 5,
+        "get_recent_activity": 5,
+        "update_customer_profile": 25,
+        "get_all_customers": 2500,
+    },
+    1_000_000: {
+        "authenticate_customer": 5,
+        "email_exists": 5,
+        "get_customer_by_email": 5,
+        "get_customer_by_id": 5,
+        "get_customers_page": 10,
+        "get_customers_page_after": 10,
+        "search_customers": 1500,
+        "search_customers_page": 1500,
+        "fuzzy_search_customers": 2500,
+        "get_customer_count": 20,
+        "get_recent_registrations_count": 10,
+        "get_today_registrations_count": 5,
+        "get_recent_activity": 5,
+        "update_customer_profile": 25,
+        "get_all_customers": 25000,
+    },
+}
+
+SIZES = [
+    100_000,
+    pytest.param(1_000_000, marks=pytest.mark.skipif(
+        not LARGE_BENCHMARKS, reason="set CMS_RUN_LARGE_BENCHMARKS=1 to build the 1M row database")),
+]
+
+
+class PlanRecorder(QueryProfiler):
+    """Profiler that explains every statement and files it under the current method"""
+
+    def __init__(self):
+        super().__init__(enabled=False, slow_query_ms=0)
+        self.method = None
+        self.plans = {}
+
+    def observe_query(self, conn, sql, params, seconds):
+        keyword = sql.lstrip().split(None, 1)[0].upper()
+        if keyword in ("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA"):
+            return
+        plan = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        steps = [row[3] for row in plan]
+        self.plans.setdefault(self.method, []).append((" ".join(sql.split()), steps))
+
+
+def synthetic_customers(count, seed=1234):
+    """Yield bulk-insert rows with realistic name, domain and date spread"""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=3 * 365)
+    span = int((datetime.now() - start).total_seconds())
+    for i in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield {
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first.lower()}.{last.lower()}{i}@{rng.choice(DOMAINS)}",
+            "phone": f"+1 555 {rng.randrange(10_000_000):07d}",
+            "password_hash": "0" * 64,
+            "created_at": start + timedelta(seconds=rng.randrange(span)),
+        }
+
+
+def build_database(path, count, batch_size=50_000):
+    """Create and analyze a synthetic database of ``count`` customers"""
+    service = DatabaseService(path, cache_size=0, query_cache_bytes=0)
+    try:
+        batch = []
+        for row in synthetic_customers(count):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                service.create_customers_bulk(batch, on_conflict="ignore")
+                batch = []
+        if batch:
+            service.create_customers_bulk(batch, on_conflict="ignore")
+        with service.pool.writer() as conn:
+            conn.execute("ANALYZE")
+    finally:
+        service.close()
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size // 1000}k")
+def seeded_service(request, tmp_path_factory):
+    """DatabaseService over a synthetic database, caches disabled, plans recorded"""
+    size = request.param
+    path = str(tmp_path_factory.mktemp(f"plans_{size}") / "customers.db")
+    build_database(path, size)
+
+    recorder = PlanRecorder()
+    service = DatabaseService(path, cache_size=0, query_cache_bytes=0, profiler=recorder)
+    yield size, service, recorder
+    service.close()
+
+
+def workload(service):
+    """(label, callable) pairs covering every read and write path of the service"""
+    sample = service.get_customers_page(limit=200)
+    target = sample[100]
+    customer_id, email = target[0], target[3]
+    after = service.page_cursor(sample[:100])
+    created = {}
+
+    def create():
+        created["id"] = service.create_customer("Plan", "Guard", "plan.guard@example.com",
+                                                "+1 555 0000000", "0" * 64)
+
+    return [
+        ("create_customer", create),
+        ("authenticate_customer", lambda: service.authenticate_customer(email, "0" * 64)),
+        ("email_exists", lambda: service.email_exists(email)),
+        ("get_customer_by_email", lambda: service.get_customer_by_email(email)),
+        ("get_customer_by_id", lambda: service.get_customer_by_id(customer_id)),
+        ("get_customers_page", lambda: service.get_customers_page(limit=100)),
+        ("get_customers_page_after", lambda: service.get_customers_page(after=after, limit=100)),
+        ("get_customers_with_status", lambda: service.get_customers_with_status(limit=100)),
+        ("get_customers_with_status_new", lambda: service.get_customers_with_status("New", limit=100)),
+        ("get_customers_with_status_active",
+         lambda: service.get_customers_with_status("Active", after=after, limit=100)),
+        ("get_customer_statuses", lambda: service.get_customer_statuses([customer_id, customer_id + 1])),
+        ("search_customers", lambda: service.search_customers("smith", limit=200)),
+        ("search_customers_page", lambda: service.search_customers_page("tanaka", limit=100)),
+        ("fuzzy_search_customers", lambda: service.fuzzy_search_customers("Jenifer Smiht")),
+        ("get_customer_count", service.get_customer_count),
+        ("get_recent_registrations_count", lambda: service.get_recent_registrations_count(7)),
+        ("get_today_registrations_count", service.get_today_registrations_count),
+        ("get_recent_activity", lambda: service.get_recent_activity(5)),
+        ("get_registration_trend", service.get_registration_trend),
+        ("get_registration_trend_hourly", lambda: service.get_registration_trend(2, "hour")),
+        ("get_email_domain_counts", lambda: service.get_email_domain_counts(10)),
+        ("get_email_domain_count", lambda: service.get_email_domain_count("gmail.com")),
+        ("get_customers_by_domain", lambda: service.get_customers_by_domain("gmail.com", limit=50)),
+        ("get_changes_since", lambda: service.get_changes_since("1000", 500)),
+        ("update_customer_profile",
+         lambda: service.update_customer_profile(email, target[1], target[2], "+1 555 1234567")),
+        ("update_customer_password", lambda: service.update_customer_password(email, "0" * 64)),
+        ("iter_customers", lambda: next(iter(service.iter_customers()))),
+        ("iter_search", lambda: next(iter(service.iter_search("smith")))),
+        ("get_all_customers", service.get_all_customers),
+        ("delete_customer", lambda: service.delete_customer(created["id"])),
+        ("restore_customer", lambda: service.restore_customer(created["id"])),
+        ("merge_customers", lambda: service.merge_customers(customer_id, [created["id"]])),
+        ("delete_customers", lambda: service.delete_customers([created["id"]])),
+        ("purge_deleted_customers", lambda: service.purge_deleted_customers(pause=0)),
+    ]
+
+
+def method_name(label):
+    """Service method behind a workload label"""
+    return {"get_customers_page_after": "get_customers_page",
+            "get_registration_trend_hourly": "get_registration_trend",
+            "get_customers_with_status_new": "get_customers_with_status",
+            "get_customers_with_status_active": "get_customers_with_status"}.get(label, label)
+
+
+def test_statements_use_indexes(seeded_service):
+    """No statement scans customers or sorts in a temp B-tree unless allowed"""
+    _, service, recorder = seeded_service
+    recorder.enabled = True
+    try:
+        for label, call in workload(service):
+            recorder.method = label
+            call()
+    finally:
+        recorder.enabled = False
+
+    violations = []
+    for label, statements in recorder.plans.items():
+        allowed = ALLOWED_PLAN_STEPS.get(method_name(label), [])
+        for sql, steps in statements:
+            for step in steps:
+                if any(step.startswith(prefix) for prefix in allowed):
+                    continue
+                if any(pattern.search(step) for pattern in FORBIDDEN_PLAN_STEPS):
+                    violations.append(f"{label}: {step!r} in {sql[:120]}")
+
+    assert recorder.plans, "no statements were recorded"
+    assert not violations, "unexpected query plans:\n" + "\n".join(violations)
+
+
+@pytest.mark.skipif(not LARGE_BENCHMARKS,
+                    reason="set CMS_RUN_LARGE_BENCHMARKS=1 to check wall-clock latency budgets")
+def test_latency_budgets(seeded_service):
+    """Median latency of each method stays within its budget for the tier"""
+    size, service, _ = seeded_service
+    budgets = LATENCY_BUDGETS_MS[size]
+
+    over_budget = []
+    for label, call in workload(service):
+        if label not in budgets:
+            continue
+        call()  # warm the page cache
+        repeats = 3 if label == "get_all_customers" else 15
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        if median > budgets[label]:
+            over_budget.append(f"{label}: {median:.1f} ms > {budgets[label]} ms")
+
+    assert not over_budget, f"latency budgets exceeded at {size:,} rows:\n" + "\n".join(over_budget)
@@ -0,0 +1,90 @@
+"""Refreshes of the read-only reporting replica"""
+
+import threading
+import time
+
+import pytest
+
+from cms.services.database import replica as replica_module
+from cms.services.database.replica import ReportingReplica, replica_path_for
+
+
+@pytest.fixture
+def replica(service):
+    replica = ReportingReplica(service.db_path, refresh_interval=3600, step_sleep=0)
+    yield replica
+    replica.close()
+
+
+def test_replica_path_sits_next_to_primary():
+    assert replica_path_for("data/customers.db") == "data/customers.replica.db"
+
+
+def test_refresh_copies_primary_snapshot(service, replica, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(5)])
+    assert replica.last_refreshed is None
+    assert replica.age is None
+
+    assert replica.refresh() > 0
+    assert replica.service.get_customer_count() == 5
+    assert replica.age is not None and replica.age < 60
+
+    # Later writes only show up after the next refresh
+    service.create_customers_bulk([customer_row(i) for i in range(5, 8)])
+    assert replica.service.get_customer_count() == 5
+    replica.refresh()
+    assert replica.service.get_customer_count() == 8
+    assert replica.service.get_customer_by_email("customer7@example.com") is not None
+
+
+def test_start_refreshes_in_background(service, replica, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(3)])
+
+    replica.start()
+    deadline = time.time() + 10
+    while replica.last_refreshed is None and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert replica.service.get_customer_count() == 3
+    replica.stop()
+
+
+def test_start_does_not_wait_for_first_copy(service, replica, customer_row, monkeypatch):
+    service.create_customers_bulk([customer_row(0)])
+    release = threading.Event()
+    copy = replica_module.online_backup
+    monkeypatch.setattr(replica_module, "online_backup",
+                        lambda *args: release.wait(10) and copy(*args))
+
+    replica.start()
+    # The application keeps reporting from the primary meanwhile
+    assert replica.last_refreshed is None
+
+    release.set()
+    deadline = time.time() + 10
+    while replica.last_refreshed is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert replica.service.get_customer_count() == 1
+
+
+def test_start_after_refresh_waits_for_interval(service, replica, customer_row):
+    service.create_customers_bulk([customer_row(0)])
+    replica.refresh()
+    refreshed = replica.last_refreshed
+
+    replica.start()
+    time.sleep(0.2)
+    replica.stop()
+
+    assert replica.last_refreshed == refreshed
+
+
+def test_failed_refresh_is_reported(tmp_path):
+    replica = ReportingReplica(str(tmp_path / "missing.db"))
+    try:
+        with pytest.raises(Exception, match="Failed to refresh reporting replica"):
+            replica.refresh()
+        assert replica.last_error
+        assert replica.last_refreshed is None
+    finally:
+        replica.close()
@@ -0,0 +1,44 @@
+"""Full-text customer search through the FTS5 index"""
+
+def emails(rows):
+    return sorted(row[3] for row in rows)
+
+
+def test_words_match_as_prefixes(service):
+    service.create_customer("Alice", "Johnson", "alice@example.com", "+1 555 0000001", "h")
+    service.create_customer("Bob", "Johnston", "bob@example.com", "+1 555 0000002", "h")
+    service.create_customer("Carol", "Smith", "carol@example.com", "+1 555 0000003", "h")
+
+    assert emails(service.search_customers("john")) == ["alice@example.com", "bob@example.com"]
+    # Every word has to match
+    assert emails(service.search_customers("ali john")) == ["alice@example.com"]
+    assert emails(service.search_customers("carol@example")) == ["carol@example.com"]
+    assert service.search_customers("zed") == []
+
+
+def test_limit_and_blank_term(service):
+    for index in range(5):
+        service.create_customer("Same", f"Customer{index}", f"same{index}@example.com", "+1 555 0000000", "h")
+
+    assert len(service.search_customers("same", limit=2)) == 2
+    assert len(service.search_customers("  ")) == 5
+    assert len(service.search_customers("", limit=3)) == 3
+
+
+def test_index_follows_updates_and_deletes(service):
+    customer_id = service.create_customer("Dana", "White", "dana@example.com", "+1 555 0000004", "h")
+
+    service.update_customer_profile("dana@example.com", "Dana", "Black", "+1 555 0000004")
+    assert service.search_customers("white") == []
+    assert [row[0] for row in service.search_customers("black")] == [customer_id]
+
+    service.delete_customer(customer_id)
+    assert service.search_customers("dana") == []
+
+
+def test_query_syntax_is_treated_as_text(service):
+    service.create_customer("Eve", "Or", "eve@example.com", "+1 555 0000005", "h")
+
+    # FTS operators and quotes in user input must not raise
+    assert emails(service.search_customers('eve" OR (')) == ["eve@example.com"]
+    assert emails(service.search_customers_page("or*")) == ["eve@example.com"]
@@ -0,0 +1,198 @@
+"""Routing, cursors, merged results and all-or-nothing bulk writes of the sharded backend"""
+
+import sqlite3
+import time
+
+import pytest
+
+from cms.services.database.database_service import DatabaseService
+from cms.services.database.sharded_backend import ShardedDatabaseService
+from cms.services.database.storage_backend import StorageBackend
+
+
+def shard_counts(backend):
+    """Live customers on each shard"""
+    return [shard.get_customer_count() for shard in backend.shards]
+
+
+def test_customers_are_routed_by_email_and_ids_are_global(sharded_service):
+    ids = {}
+    for index in range(12):
+        email = f"routed{index}@example.com"
+        ids[email] = sharded_service.create_customer("Routed", f"User{index}", email, "+1 555 0000000", "h")
+
+    for email, customer_id in ids.items():
+        shard_index = sharded_service.shard_index(email)
+        assert customer_id % sharded_service.shard_count == shard_index
+        assert sharded_service.get_customer_by_id(customer_id)[3] == email
+        assert sharded_service.get_customer_by_email(email)[0] == customer_id
+        assert sharded_service.shards[shard_index].get_customer_by_email(email) is not None
+    assert len(set(ids.values())) == len(ids)
+    assert sum(shard_counts(sharded_service)) == sharded_service.get_customer_count() == 12
+
+
+def test_local_cursor_translation(sharded_service):
+    # local * 3 + index < global  <=>  local < ceil((global - index) / 3)
+    for global_id in range(0, 30):
+        for index in range(3):
+            _, local = sharded_service._local_after(("2024-01-01 00:00:00", global_id), index)
+            below = [l for l in range(20) if l * 3 + index < global_id]
+            assert all(l < local for l in below)
+            assert all(l >= local for l in range(20) if l not in below)
+    assert sharded_service._local_after(None, 1) is None
+
+
+def test_keyset_pages_cover_every_customer_once(sharded_service, customer_row):
+    rows = [customer_row(i, created_at=f"2024-01-{1 + i % 28:02d} 12:00:00") for i in range(40)]
+    sharded_service.create_customers_bulk(rows)
+
+    seen = []
+    after = None
+    while True:
+        page = sharded_service.get_customers_page(after, limit=7)
+        if not page:
+            break
+        seen.extend(page)
+        after = (page[-1][5], page[-1][0])
+
+    assert len(seen) == 40
+    assert len({row[0] for row in seen}) == 40
+    keys = [(row[5], row[0]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_search_and_stats_merge_across_shards(sharded_service, customer_row):
+    rows = [customer_row(i, first_name="Match" if i % 3 == 0 else "Other") for i in range(12)]
+    sharded_service.create_customers_bulk(rows)
+
+    matches = sharded_service.search_customers("match")
+    assert sorted(row[3] for row in matches) == sorted(
+        f"customer{i}@example.com" for i in range(0, 12, 3))
+    assert list(sharded_service.iter_search("match", batch_size=2)) == matches
+    assert sharded_service.fuzzy_search_customers("custmer7")[0][3] == "customer7@example.com"
+    assert sharded_service.get_today_registrations_count() == 12
+    assert isinstance(sharded_service, StorageBackend)
+
+
+def test_delete_routes_by_global_id(sharded_service, customer_row):
+    ids = sharded_service.create_customers_bulk([customer_row(i) for i in range(6)]).ids
+
+    assert sharded_service.delete_customer(ids[4])
+    assert sharded_service.get_customer_by_id(ids[4]) is None
+    assert sharded_service.get_customer_count() == 5
+
+
+def test_bulk_fail_rejects_in_batch_duplicate_before_writing(sharded_service, customer_row):
+    rows = [customer_row(i) for i in range(10)] + [customer_row(3)]
+
+    with pytest.raises(Exception, match="repeated in the batch"):
+        sharded_service.create_customers_bulk(rows, on_conflict="fail")
+
+    assert shard_counts(sharded_service) == [0, 0, 0]
+
+
+def test_bulk_fail_rejects_existing_email_on_any_shard(sharded_service, customer_row):
+    sharded_service.create_customers_bulk([customer_row(5)])
+
+    with pytest.raises(Exception, match="already registered"):
+        sharded_service.create_customers_bulk([customer_row(i) for i in range(11)], on_conflict="fail")
+
+    assert sum(shard_counts(sharded_service)) == 1
+
+
+@pytest.mark.parametrize("failing_shard", [0, 1, 2])
+@pytest.mark.parametrize("on_conflict", ["fail", "ignore", "replace"])
+def test_bulk_rolls_back_every_shard_when_one_shard_fails(sharded_service, customer_row,
+                                                          monkeypatch, failing_shard, on_conflict):
+    shard = sharded_service.shards[failing_shard]
+    original = DatabaseService.create_customers_bulk
+
+    def write_then_fail(rows, on_conflict="fail"):
+        original(shard, rows, on_conflict)
+        raise Exception("Failed to create customers: disk I/O error")
+    monkeypatch.setattr(shard, "create_customers_bulk", write_then_fail)
+
+    rows = [customer_row(i) for i in range(11)]
+    assert {sharded_service.shard_index(row["email"]) for row in rows} == {0, 1, 2}
+
+    with pytest.raises(Exception, match="disk I/O error"):
+        sharded_service.create_customers_bulk(rows, on_conflict=on_conflict)
+
+    assert shard_counts(sharded_service) == [0, 0, 0]
+    monkeypatch.undo()
+
+    # Every shard is usable again afterwards
+    result = sharded_service.create_customers_bulk(rows, on_conflict=on_conflict)
+    assert all(customer_id is not None for customer_id in result.ids)
+    assert shard_counts(sharded_service) == [
+        sum(1 for row in rows if sharded_service.shard_index(row["email"]) == i) for i in range(3)]
+
+
+
+def test_bulk_rolls_back_when_a_shard_misses_the_barrier(tmp_path, customer_row, monkeypatch):
+    backend = ShardedDatabaseService(str(tmp_path / "customers.db"), shards=3, barrier_timeout=0.2)
+    try:
+        shard = backend.shards[1]
+        original = DatabaseService.create_customers_bulk
+
+        def write_slowly(rows, on_conflict="fail"):
+            result = original(shard, rows, on_conflict)
+            time.sleep(1)
+            return result
+        monkeypatch.setattr(shard, "create_customers_bulk", write_slowly)
+
+        with pytest.raises(Exception, match="timed out waiting for the other shards"):
+            backend.create_customers_bulk([customer_row(i) for i in range(11)])
+
+        assert shard_counts(backend) == [0, 0, 0]
+    finally:
+        backend.close()
+
+
+def cross_shard_duplicates(backend, customer_row):
+    """A survivor and one duplicate on each of the other shards"""
+    ids = backend.create_customers_bulk([customer_row(i) for i in range(11)]).ids
+    by_shard = {}
+    for customer_id in ids:
+        by_shard.setdefault(customer_id % backend.shard_count, customer_id)
+    survivor_id = by_shard.pop(0)
+    return survivor_id, list(by_shard.values())
+
+
+def test_merge_across_shards(sharded_service, customer_row):
+    survivor_id, duplicate_ids = cross_shard_duplicates(sharded_service, customer_row)
+    for customer_id in duplicate_ids:
+        sharded_service.get_customer_by_id(customer_id)
+
+    assert sharded_service.merge_customers(survivor_id, duplicate_ids) == 2
+
+    assert all(sharded_service.get_customer_by_id(customer_id) is None for customer_id in duplicate_ids)
+    assert sharded_service.get_customer_count() == 9
+    assert sharded_service.restore_customer(duplicate_ids[0])
+
+
+@pytest.mark.parametrize("failing_shard", [1, 2])
+def test_merge_rolls_back_every_shard_when_one_shard_fails(sharded_service, customer_row,
+                                                           monkeypatch, failing_shard):
+    survivor_id, duplicate_ids = cross_shard_duplicates(sharded_service, customer_row)
+    shard = sharded_service.shards[failing_shard]
+    original = DatabaseService._merge_duplicates
+
+    def merge_then_fail(survivor_ref, local_ids):
+        original(shard, survivor_ref, local_ids)
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(shard, "_merge_duplicates", merge_then_fail)
+
+    with pytest.raises(Exception, match="Failed to merge customers: disk I/O error"):
+        sharded_service.merge_customers(survivor_id, duplicate_ids)
+
+    assert sharded_service.get_customer_count() == 11
+    assert all(sharded_service.get_customer_by_id(customer_id) for customer_id in duplicate_ids)
+
+
+def test_merge_into_deleted_survivor_changes_nothing(sharded_service, customer_row):
+    survivor_id, duplicate_ids = cross_shard_duplicates(sharded_service, customer_row)
+    sharded_service.delete_customer(survivor_id)
+
+    assert sharded_service.merge_customers(survivor_id, duplicate_ids) == 0
+    assert sharded_service.get_customer_count() == 10
@@ -0,0 +1,110 @@
+"""Soft delete, restore and the chunked background purge"""
+
+import pytest
+
+from cms.services.database.purge import PurgeWorker
+
+
+def age_deletions(service, days):
+    """Pretend every soft delete happened ``days`` ago"""
+    with service.pool.writer() as conn:
+        conn.execute("UPDATE customers SET deleted_at = datetime('now', ?) WHERE deleted_at IS NOT NULL",
+                     (f"-{days} days",))
+
+
+def stored_rows(service):
+    """Rows in the table, soft-deleted ones included"""
+    with service.pool.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+
+@pytest.fixture
+def customer_ids(service, customer_row):
+    return service.create_customers_bulk([customer_row(i) for i in range(25)]).ids
+
+
+def test_soft_delete_hides_customer_until_restored(service, customer_ids):
+    customer_id = customer_ids[0]
+
+    assert service.delete_customer(customer_id)
+    assert not service.delete_customer(customer_id)
+    assert service.get_customer_by_id(customer_id) is None
+    assert service.get_customer_by_email("customer0@example.com") is None
+    assert service.get_customer_count() == 24
+    assert stored_rows(service) == 25
+
+    assert service.restore_customer(customer_id)
+    assert not service.restore_customer(customer_id)
+    assert service.get_customer_by_id(customer_id)[3] == "customer0@example.com"
+    assert service.get_customer_count() == 25
+
+
+def test_deleted_email_can_register_again(service, customer_ids):
+    service.delete_customer(customer_ids[0])
+
+    new_id = service.create_customer("Test", "Again", "customer0@example.com", "+1 555 0000000", "h")
+
+    assert new_id != customer_ids[0]
+    assert service.get_customer_by_email("customer0@example.com")[0] == new_id
+    assert not service.restore_customer(customer_ids[0])
+
+
+def test_purge_only_removes_expired_deletions(service, customer_ids):
+    service.delete_customers(customer_ids[:5])
+    age_deletions(service, 40)
+    service.delete_customers(customer_ids[5:8])
+
+    assert service.purge_deleted_customers(older_than_days=30, pause=0) == 5
+
+    assert stored_rows(service) == 20
+    assert not service.restore_customer(customer_ids[0])
+    assert service.restore_customer(customer_ids[5])
+
+
+def test_purge_runs_in_chunks(service, customer_ids):
+    service.delete_customers(customer_ids[:23])
+
+    assert service.purge_deleted_customers(chunk_size=10, pause=0, max_chunks=2) == 20
+    assert stored_rows(service) == 5
+    assert service.purge_deleted_customers(chunk_size=10, pause=0) == 3
+    assert service.purge_deleted_customers(chunk_size=10, pause=0) == 0
+    assert service.get_customer_count() == 2
+
+
+def test_sharded_purge_covers_every_shard(sharded_service, customer_row):
+    ids = sharded_service.create_customers_bulk([customer_row(i) for i in range(12)]).ids
+    sharded_service.delete_customers(ids[:9])
+
+    assert sharded_service.purge_deleted_customers(chunk_size=2, pause=0) == 9
+    assert sharded_service.get_customer_count() == 3
+
+
+def test_worker_purges_whole_backlog_between_stop_checks(service, customer_ids, monkeypatch):
+    monkeypatch.setattr(PurgeWorker, "CHUNKS_PER_CHECK", 2)
+    service.delete_customers(customer_ids)
+    worker = PurgeWorker(service, retention_days=0, chunk_size=4, pause=0)
+
+    assert worker.purge() == 25
+    assert worker.last_purged == 25
+    assert stored_rows(service) == 0
+
+
+def test_stopped_worker_leaves_rest_of_backlog(service, customer_ids, monkeypatch):
+    monkeypatch.setattr(PurgeWorker, "CHUNKS_PER_CHECK", 2)
+    service.delete_customers(customer_ids)
+    worker = PurgeWorker(service, retention_days=0, chunk_size=4, pause=0)
+    worker._stop.set()
+
+    assert worker.purge() == 8
+    assert stored_rows(service) == 17
+
+
+def test_worker_thread_stops_on_request(service, customer_ids):
+    service.delete_customers(customer_ids[:3])
+    worker = PurgeWorker(service, retention_days=0, interval=3600, pause=0)
+
+    worker.start()
+    worker.stop()
+
+    assert worker._thread is None
+    assert worker.last_error is None
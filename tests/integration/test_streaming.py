@@ -0,0 +1,53 @@
+"""Streaming iter_customers / iter_search generators"""
+
+import pytest
+
+from cms.services.database.database_service import DatabaseService
+
+
+def test_iter_customers_streams_every_row_newest_first(service, customer_row):
+    rows = [customer_row(i, created_at=f"2024-01-{i + 1:02d} 12:00:00") for i in range(7)]
+    service.create_customers_bulk(rows)
+
+    streamed = list(service.iter_customers(batch_size=3))
+
+    assert streamed == service.get_all_customers()
+    assert [row[3] for row in streamed] == [f"customer{i}@example.com" for i in reversed(range(7))]
+
+
+def test_iter_search_matches_search(service, customer_row):
+    service.create_customers_bulk([customer_row(i, first_name="Match" if i % 2 else "Other")
+                                   for i in range(6)])
+
+    assert list(service.iter_search("match", batch_size=2)) == service.search_customers("match")
+    assert len(list(service.iter_search(""))) == 6
+
+
+def test_generator_sees_one_snapshot(service, customer_row):
+    service.create_customers_bulk([customer_row(i) for i in range(4)])
+    rows = service.iter_customers(batch_size=1)
+    first = next(rows)
+
+    service.create_customer("Late", "Customer", "late@example.com", "+1 555 1234567", "h")
+
+    assert len([first] + list(rows)) == 4
+
+
+def test_closed_generator_returns_its_connection(tmp_path, customer_row):
+    service = DatabaseService(str(tmp_path / "one-reader.db"), read_pool_size=1, busy_timeout=500)
+    try:
+        service.create_customers_bulk([customer_row(i) for i in range(3)])
+        rows = service.iter_customers(batch_size=1)
+        next(rows)
+        rows.close()
+
+        # The single pooled reader is free again
+        assert service.get_customer_count() == 3
+    finally:
+        service.close()
+
+
+def test_errors_surface_while_iterating(service):
+    service.close()
+    with pytest.raises(Exception, match="Failed to get customers"):
+        list(service.iter_customers())
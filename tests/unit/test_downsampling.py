@@ -0,0 +1,56 @@
+"""Largest-Triangle-Three-Buckets downsampling of chart series"""
+
+import math
+
+import pytest
+
+from cms.utils.helpers.downsampling import lttb
+
+
+def series(count):
+    return [(float(x), math.sin(x / 10.0)) for x in range(count)]
+
+
+@pytest.mark.parametrize("count, threshold", [(10, 10), (10, 50), (10, 2), (0, 5), (2, 3)])
+def test_short_series_or_small_threshold_is_returned_whole(count, threshold):
+    points = series(count)
+
+    sampled = lttb(points, threshold)
+
+    assert sampled == points
+    assert sampled is not points
+
+
+@pytest.mark.parametrize("count, threshold", [(1000, 100), (1000, 3), (101, 50), (7, 6)])
+def test_sample_is_ordered_subset_with_endpoints(count, threshold):
+    points = series(count)
+
+    sampled = lttb(points, threshold)
+
+    assert len(sampled) == threshold
+    assert sampled[0] == points[0]
+    assert sampled[-1] == points[-1]
+    assert all(point in points for point in sampled)
+    xs = [x for x, _ in sampled]
+    assert xs == sorted(set(xs))
+
+
+def test_spikes_survive_downsampling():
+    points = [(float(x), 0.0) for x in range(1000)]
+    points[333] = (333.0, 50.0)
+    points[777] = (777.0, -40.0)
+
+    sampled = lttb(points, 20)
+
+    assert (333.0, 50.0) in sampled
+    assert (777.0, -40.0) in sampled
+
+
+def test_one_point_per_bucket():
+    points = series(98)
+
+    sampled = lttb(points, 10)
+
+    # 96 inner points over 8 buckets of 12
+    buckets = [int((x - 1) // 12) for x, _ in sampled[1:-1]]
+    assert buckets == list(range(8))
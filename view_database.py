@@ -4,15 +4,32 @@ Database Viewer Script
 Simple script to view the customers database
 """
 
-import sqlite3
+import os
 import sys
 from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from cms.config.settings import AppSettings
+from cms.services.database.backup import open_read_only
+from cms.services.database.sharded_backend import create_storage_backend
+from cms.services.exporter.export_service import ExportService
+
+
+def open_database():
+    """Open the live database read-only.
+
+    In WAL mode a read-only connection reads a snapshot without holding up
+    the application's writer, so no copy of the database is needed.
+    """
+    if not os.path.exists('customers.db'):
+        raise FileNotFoundError('customers.db')
+    return open_read_only('customers.db')
 
 def view_database():
     """View the customers database"""
     try:
         # Connect to database
-        conn = sqlite3.connect('customers.db')
+        conn = open_database()
         cursor = conn.cursor()
         
         print("=" * 60)
@@ -29,7 +46,7 @@ def view_database():
             print(f"Column: {col[1]} ({col[2]}) - {'NOT NULL' if col[3] else 'NULL'} - {'PRIMARY KEY' if col[5] else ''}")
         
         # Get total records
-        cursor.execute("SELECT COUNT(*) FROM customers")
+        cursor.execute("SELECT COUNT(*) FROM customers WHERE deleted_at IS NULL")
         total_records = cursor.fetchone()[0]
         print(f"\n📊 TOTAL RECORDS: {total_records}")
         
@@ -43,11 +60,12 @@ def view_database():
             cursor.execute('''
                 SELECT id, first_name, last_name, email, phone, created_at 
                 FROM customers 
+                WHERE deleted_at IS NULL
                 ORDER BY created_at DESC
             ''')
             
-            customers = cursor.fetchall()
-            for customer in customers:
+            # Iterate the cursor so rows are streamed rather than loaded at once
+            for customer in cursor:
                 created_date = customer[5][:10] if customer[5] else "N/A"
                 print(f"{customer[0]:<5} {customer[1]:<15} {customer[2]:<15} {customer[3]:<25} {customer[4]:<15} {created_date}")
             
@@ -58,18 +76,17 @@ def view_database():
             # Recent registrations (last 7 days)
             cursor.execute('''
                 SELECT COUNT(*) FROM customers 
-                WHERE created_at >= date('now', '-7 days')
+                WHERE created_at >= date('now', '-7 days') AND deleted_at IS NULL
             ''')
             recent = cursor.fetchone()[0]
             print(f"Registrations in last 7 days: {recent}")
             
-            # Most common email domains
+            # Most common email domains, from the email_domain index
             cursor.execute('''
-                SELECT 
-                    SUBSTR(email, INSTR(email, '@') + 1) as domain,
-                    COUNT(*) as count
+                SELECT email_domain, COUNT(*) as count
                 FROM customers 
-                GROUP BY domain 
+                WHERE deleted_at IS NULL
+                GROUP BY email_domain 
                 ORDER BY count DESC 
                 LIMIT 5
             ''')
@@ -96,28 +113,31 @@ def export_to_csv():
     try:
         import csv
         
-        conn = sqlite3.connect('customers.db')
+        conn = open_database()
         cursor = conn.cursor()
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"database_export_{timestamp}.csv"
         
-        # Fetch all customers
+        # Stream customers straight from the cursor
         cursor.execute('''
             SELECT id, first_name, last_name, email, phone, created_at 
             FROM customers 
+            WHERE deleted_at IS NULL
             ORDER BY created_at DESC
         ''')
-        customers = cursor.fetchall()
         
         # Write to CSV file
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(['ID', 'First Name', 'Last Name', 'Email', 'Phone', 'Created At'])
             
-            for customer in customers:
-                writer.writerow(customer)
+            while True:
+                customers = cursor.fetchmany(1000)
+                if not customers:
+                    break
+                writer.writerows(customers)
         
         print(f"\n✅ Database exported to: {filename}")
         conn.close()
@@ -125,6 +145,52 @@ def export_to_csv():
     except Exception as e:
         print(f"❌ Error exporting database: {str(e)}")
 
+def open_change_log_exporter():
+    """Open the live database and this script's change-export consumer.
+
+    The change log is read from the primary, the same database it is
+    pruned on; the watermark is kept apart from the application's.
+    """
+    settings = AppSettings()
+    if not os.path.exists(settings.DATABASE_PATH):
+        raise FileNotFoundError(settings.DATABASE_PATH)
+    backend = create_storage_backend(settings.DATABASE_PATH, shards=settings.DB_SHARDS,
+                                     storage_profile=settings.storage_profile)
+    return backend, ExportService(backend, settings.CHANGE_EXPORT_STATE_DIR, consumer="view_database")
+
+def export_changes_to_csv():
+    """Export only the changes made since this script's last changes export"""
+    try:
+        backend, export_service = open_change_log_exporter()
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            result = export_service.export_changes(f"database_changes_{timestamp}.csv")
+        finally:
+            backend.close()
+        
+        if result.changes:
+            print(f"\n✅ {result.changes} changes exported to: {result.path}")
+        else:
+            print("\n✅ No changes since the last export.")
+        
+    except Exception as e:
+        print(f"❌ Error exporting changes: {str(e)}")
+
+def prune_exported_changes():
+    """Drop the changes every export consumer has already exported"""
+    try:
+        backend, export_service = open_change_log_exporter()
+        try:
+            consumers = export_service.consumer_watermarks()
+            pruned = export_service.prune()
+        finally:
+            backend.close()
+        
+        print(f"\n✅ {pruned} exported changes pruned ({len(consumers)} consumers: {', '.join(consumers) or 'none'})")
+        
+    except Exception as e:
+        print(f"❌ Error pruning changes: {str(e)}")
+
 if __name__ == "__main__":
     print("Database Viewer for Customer Management System")
     print("=" * 50)
@@ -133,16 +199,22 @@ if __name__ == "__main__":
         print("\nOptions:")
         print("1. View Database")
         print("2. Export to CSV")
-        print("3. Exit")
+        print("3. Export changes since last export")
+        print("4. Prune changes every consumer has exported")
+        print("5. Exit")
         
-        choice = input("\nEnter your choice (1-3): ").strip()
+        choice = input("\nEnter your choice (1-5): ").strip()
         
         if choice == "1":
             view_database()
         elif choice == "2":
             export_to_csv()
         elif choice == "3":
+            export_changes_to_csv()
+        elif choice == "4":
+            prune_exported_changes()
+        elif choice == "5":
             print("Goodbye!")
             break
         else:
-            print("Invalid choice. Please enter 1, 2, or 3.")
+            print("Invalid choice. Please enter 1, 2, 3, 4, or 5.")